@@ -61,17 +61,28 @@ def build_windows():
                 "--add-data",
                 "src;src/",
                 "--paths=./src",
+                "--hidden-import=_lazy",
                 "--hidden-import=api.openrouter",
+                "--hidden-import=api.async_openrouter",
+                "--hidden-import=api.resilience",
+                "--hidden-import=api.transport",
                 "--hidden-import=pages.starting_page",
                 "--hidden-import=pages.registration_page",
                 "--hidden-import=pages.entrance_page",
                 "--hidden-import=pages.interface_page",
                 "--hidden-import=ui.app_style",
                 "--hidden-import=ui.components",
+                "--hidden-import=ui.model_search",
+                "--hidden-import=ui.updates",
                 "--hidden-import=utils.app_analytics",
+                "--hidden-import=utils.app_balance",
                 "--hidden-import=utils.app_cache",
+                "--hidden-import=utils.app_context",
                 "--hidden-import=utils.app_logger",
                 "--hidden-import=utils.app_monitor",
+                "--hidden-import=utils.app_session",
+                "--hidden-import=utils.app_sketch",
+                "--hidden-import=utils.app_startup",
                 "--hidden-import=utils.app_tools",
                 "main.py",
             ],
@@ -130,17 +141,28 @@ def build_linux():
                 "--add-data=assets:assets",
                 "--add-data=src:src",
                 "--paths=./src",
+                "--hidden-import=_lazy",
                 "--hidden-import=api.openrouter",
+                "--hidden-import=api.async_openrouter",
+                "--hidden-import=api.resilience",
+                "--hidden-import=api.transport",
                 "--hidden-import=pages.starting_page",
                 "--hidden-import=pages.registration_page",
                 "--hidden-import=pages.entrance_page",
                 "--hidden-import=pages.interface_page",
                 "--hidden-import=ui.app_style",
                 "--hidden-import=ui.components",
+                "--hidden-import=ui.model_search",
+                "--hidden-import=ui.updates",
                 "--hidden-import=utils.app_analytics",
+                "--hidden-import=utils.app_balance",
                 "--hidden-import=utils.app_cache",
+                "--hidden-import=utils.app_context",
                 "--hidden-import=utils.app_logger",
                 "--hidden-import=utils.app_monitor",
+                "--hidden-import=utils.app_session",
+                "--hidden-import=utils.app_sketch",
+                "--hidden-import=utils.app_startup",
                 "--hidden-import=utils.app_tools",
                 "main.py",
             ],
@@ -1,11 +1,17 @@
+# Замер времени запуска начинается до импорта flet и остальных модулей
+from src.utils.app_startup import AppStartup
+
+AppStartup.begin()
+
+import sys  # Проверка, загружены ли HTTP-клиенты, при закрытии окна
+
 import flet as ft  # Импорт библиотеки Flet для GUI
 
 from router import Router  # Импорт класса Router из локального модуля
-import src.api
-import src.pages
-import src.ui
-import src.utils
-from src.ui.app_style import AppStyles
+from src.utils.app_logger import AppLogger  # Логгер приложения
+
+AppStartup.mark("imports")  # Модули, нужные до открытия окна, загружены
+
 
 async def main(page: ft.Page):
     """
@@ -14,13 +20,36 @@ async def main(page: ft.Page):
     Args:
         page (ft.Page): Объект страницы Flet.
     """
+    AppStartup.mark("window")  # Окно Flet открыто и подключено
+    page.on_disconnect = on_disconnect  # Освобождение соединений окна
     try:
-        Router(page)  # Инициализация маршрутизатора
+        Router(page)  # Инициализация маршрутизатора (открывает первую страницу)
     except Exception as e:
         print(f"Ошибка инициализации: {e}")  # Логирование ошибок
+        return
+    finally:
+        # Оператор import восстанавливается при любом исходе запуска
+        AppStartup.finish()
+
+    # Первая страница отрисована: отчет о запуске - в лог
+    AppStartup.mark("first_view")
+    AppStartup.log_report(AppLogger())
+
+
+async def on_disconnect(e):
+    """
+    Закрытие асинхронных HTTP-клиентов цикла событий окна.
+
+    Общие синхронные сессии закрываются при завершении процесса
+    (atexit в src.api.transport).
+    """
+    transport = sys.modules.get("src.api.transport")
+    if transport is not None:  # Модуль загружается только страницей чата
+        await transport.close_async_clients()
 
 
 if __name__ == "__main__":
+    AppLogger.configure_from_env()  # CHAT_APP_LOG_LEVEL и CHAT_APP_LOG_JSON
     ft.app(
         target=main, assets_dir="assets"
     )  # Запуск приложения с указанием директории ресурсов
@@ -2,11 +2,22 @@ from flet_route import Routing, path  # Импорт классов для ма
 import flet as ft  # Основной импорт библиотеки Flet для создания UI
 from typing import List  # Для аннотации типов (списки маршрутов)
 
-# Импорт страниц приложения
-from src.pages.starting_page import StartingPage  # Главная страница
-from src.pages.registration_page import RegistrationPage  # Страница регистрации
-from src.pages.entrance_page import EntrancePage  # Страница входа
-from src.pages.interface_page import InterfacePage
+from src.utils.app_startup import (
+    AppStartup,
+)  # Загрузка модулей страниц с замером времени
+
+# Страницы приложения: URL -> (модуль, класс страницы).
+# Модули загружаются при первом переходе на страницу, а не при запуске:
+# например, клиенты API (requests, httpx) нужны только странице интерфейса.
+PAGES = {
+    "/": ("src.pages.starting_page", "StartingPage"),  # Главная страница
+    "/registration": (
+        "src.pages.registration_page",
+        "RegistrationPage",
+    ),  # Страница регистрации
+    "/entrance": ("src.pages.entrance_page", "EntrancePage"),  # Страница входа
+    "/interface": ("src.pages.interface_page", "InterfacePage"),  # Интерфейс чата
+}
 
 
 class Router:
@@ -23,42 +34,86 @@ class Router:
             page (ft.Page): Экземпляр страницы Flet, на которой будет происходить маршрутизация.
         """
         self.page = page
+        self.page_classes = {}  # Загруженные классы страниц по URL
+        self.page_objects = {}  # Созданные объекты страниц по URL (переиспользуются)
+        self.current_url = None  # URL открытой страницы
 
         # Список маршрутов приложения.
         # Каждый маршрут определяется как объект `path` с URL, флагом очистки и обработчиком.
         self.app_routes: List[path] = [
-            path(
-                url="/",
-                clear=True,
-                view=lambda page, params, basket: StartingPage().view(
-                    page, params, basket
-                ),
-            ),
-            path(
-                url="/registration",
-                clear=True,
-                view=lambda page, params, basket: RegistrationPage().view(
-                    page, params, basket
-                ),
-            ),
-            path(
-                url="/entrance",
-                clear=True,
-                view=lambda page, params, basket: EntrancePage().view(
-                    page, params, basket
-                ),
-            ),
-            path(
-                url="/interface",
-                clear=True,
-                view=lambda page, params, basket: InterfacePage().view(
-                    page, params, basket
-                ),
-            ),
+            path(url=url, clear=True, view=self._lazy_view(url)) for url in PAGES
         ]
 
-        # Инициализация маршрутизации с передачей страницы и списка маршрутов
-        Routing(page=self.page, app_routes=self.app_routes)
+        # Инициализация маршрутизации с передачей страницы и списка маршрутов;
+        # промежуточный обработчик вызывается при каждой смене маршрута
+        Routing(
+            page=self.page, app_routes=self.app_routes, middleware=self._on_route_change
+        )
 
         # Переход на текущий маршрут (или на начальный, если его нет)
         self.page.go(self.page.route)
+
+    def _on_route_change(self, page: ft.Page, params, basket):
+        """
+        Уход с предыдущей страницы при смене маршрута.
+
+        Если у объекта покидаемой страницы есть метод leave(), он вызывается
+        до построения новой страницы (например, страница чата останавливает
+        свои фоновые задачи).
+        """
+        url = page.route
+        if url == self.current_url:
+            return
+        previous = self.page_objects.get(self.current_url)
+        self.current_url = url
+        leave = getattr(previous, "leave", None)
+        if leave is not None:
+            leave()
+
+    def _lazy_view(self, url: str):
+        """
+        Обработчик маршрута, загружающий модуль страницы при первом вызове.
+
+        Args:
+            url (str): URL маршрута
+
+        Returns:
+            callable: Функция (page, params, basket) -> ft.View
+        """
+        return lambda page, params, basket: self.get_page(url).view(
+            page, params, basket
+        )
+
+    def get_page(self, url: str):
+        """
+        Объект страницы для URL (создается при первом переходе и затем
+        переиспользуется: состояние между переходами хранится в корзине
+        и в сессии пользователя, а не в объекте страницы).
+
+        Args:
+            url (str): URL маршрута
+
+        Returns:
+            object: Объект страницы с методом view(page, params, basket)
+        """
+        page_object = self.page_objects.get(url)
+        if page_object is None:
+            page_object = self.page_objects[url] = self.get_page_class(url)()
+        return page_object
+
+    def get_page_class(self, url: str) -> type:
+        """
+        Класс страницы для URL (модуль загружается один раз).
+
+        Args:
+            url (str): URL маршрута
+
+        Returns:
+            type: Класс страницы
+        """
+        page_class = self.page_classes.get(url)
+        if page_class is None:
+            module_name, class_name = PAGES[url]
+            module = AppStartup.import_module(module_name)  # С замером времени
+            page_class = self.page_classes[url] = getattr(module, class_name)
+        return page_class
@@ -0,0 +1,30 @@
+import importlib  # Загрузка модулей пакета при первом обращении
+import sys  # Доступ к объекту пакета для кэширования загруженных имен
+
+
+def make_lazy_getattr(package: str, exports: dict):
+    """
+    Создание функции __getattr__ уровня модуля (PEP 562) для пакета.
+
+    Импорт пакета не загружает его модули (и их зависимости), поэтому
+    импорт одного модуля пакета не тянет за собой остальные. Экспортируемое
+    имя загружается из своего модуля при первом обращении и сохраняется
+    в пакете, так что последующие обращения не вызывают __getattr__.
+
+    Args:
+        package (str): Имя пакета (__name__ в его __init__.py)
+        exports (dict): Экспортируемое имя -> относительное имя модуля пакета
+
+    Returns:
+        callable: Функция __getattr__(name) для пакета
+    """
+
+    def __getattr__(name: str):
+        module_name = exports.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_name, package), name)
+        setattr(sys.modules[package], name, value)  # Без повторного __getattr__
+        return value
+
+    return __getattr__
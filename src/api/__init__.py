@@ -1,5 +1,20 @@
-from .openrouter import OpenRouterClient
+from src._lazy import make_lazy_getattr  # Ленивая загрузка экспортов пакета
 
-__all__ = [
-    "OpenRouterClient",
-]
+# Экспортируемое имя -> модуль пакета (клиенты загружают requests и httpx)
+_EXPORTS = {
+    "OpenRouterClient": ".openrouter",
+    "AsyncOpenRouterClient": ".async_openrouter",
+    "APIError": ".resilience",
+    "RetryPolicy": ".resilience",
+    "CircuitBreaker": ".resilience",
+    "get_circuit_breaker": ".resilience",
+    "get_session": ".transport",
+    "close_sessions": ".transport",
+    "get_async_client": ".transport",
+    "close_async_clients": ".transport",
+}
+
+# Имена загружаются из модулей пакета при первом обращении (PEP 562)
+__getattr__ = make_lazy_getattr(__name__, _EXPORTS)
+
+__all__ = list(_EXPORTS)
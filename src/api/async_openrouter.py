@@ -0,0 +1,470 @@
+import asyncio  # Библиотека для асинхронного программирования
+import time  # Библиотека для работы с временными метками
+import httpx  # Асинхронный HTTP-клиент
+from src.api.openrouter import (
+    API_BASE_URL,
+    DEFAULT_MODELS,
+    MODELS_TTL,
+    STREAM_DONE,
+    catalog_headers,
+    parse_models,
+    parse_sse_line,
+)  # Общие константы и разбор ответов с синхронным клиентом
+from src.api.resilience import (
+    ERROR_UNKNOWN,
+    APIError,
+    RetryPolicy,
+    classify_error,
+    error_from_body,
+    error_from_response,
+    get_circuit_breaker,
+)  # Классификация ошибок, повторы и автоматические выключатели моделей
+from src.api.transport import (
+    DEFAULT_ASYNC_POOL_SIZE,
+    DEFAULT_TIMEOUTS,
+    get_async_client,
+)  # Общий асинхронный HTTP-клиент с пулом соединений
+from src.utils.app_logger import (
+    AppLogger,
+    new_request_id,
+    request_id_var,
+)  # Импорт собственного логгера для отслеживания работы
+
+
+class AsyncOpenRouterClient:
+    """
+    Асинхронный клиент для взаимодействия с OpenRouter API.
+
+    Повторяет интерфейс OpenRouterClient (модели, сообщения, поток, баланс),
+    но все методы являются корутинами и выполняются в цикле событий без
+    использования пула потоков.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        pool_size: int = DEFAULT_ASYNC_POOL_SIZE,
+        timeouts: dict | None = None,
+        cache=None,
+        models_ttl: float = MODELS_TTL,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker=get_circuit_breaker,
+    ):
+        """
+        Инициализация асинхронного клиента OpenRouter.
+
+        В отличие от OpenRouterClient, список моделей при создании не
+        загружается: для этого нужно вызвать `await get_models()`.
+
+        Args:
+            api_key (str): Ключ API OpenRouter
+            pool_size (int): Максимальное количество одновременных соединений
+            timeouts (dict | None): Переопределение таймаутов по типам запросов
+                ("models", "chat", "stream", "balance"), значения -
+                (подключение, чтение) в секундах
+            cache (AppCache | None): Кэш для хранения каталога моделей на диске
+            models_ttl (float): Время жизни сохраненного каталога в секундах
+            retry_policy (RetryPolicy | None): Политика повторов запросов к модели
+            circuit_breaker (callable): Функция model -> CircuitBreaker
+                (по умолчанию - выключатели, общие с синхронным клиентом)
+
+        Raises:
+            ValueError: Если API ключ не передан
+        """
+        # Инициализация логгера для отслеживания работы клиента
+        self.logger = AppLogger()
+
+        self.api_key = api_key  # API ключ для авторизации
+        self.base_url = API_BASE_URL  # Базовый URL API
+        self.pool_size = pool_size  # Размер пула соединений
+
+        # Проверка наличия API ключа
+        if not self.api_key:
+            self.logger.error("Ключ API OpenRouter не найден.")
+            raise ValueError("Ключ API OpenRouter не найден.")
+
+        # Настройка заголовков для всех API запросов
+        self.headers = {
+            "Authorization": f"Bearer {self.api_key}",  # Токен для авторизации запросов
+            "Content-Type": "application/json",  # Указание формата данных
+        }
+
+        # Таймауты запросов в формате httpx
+        self.timeouts = {
+            name: httpx.Timeout(read, connect=connect)
+            for name, (connect, read) in {
+                **DEFAULT_TIMEOUTS,
+                **(timeouts or {}),
+            }.items()
+        }
+
+        # Дисковый кэш каталога моделей
+        self.cache = cache
+        self.models_ttl = models_ttl
+        self._refresh_task = None  # Текущее фоновое обновление каталога
+
+        # Устойчивость к временным ошибкам: повторы и выключатели по моделям
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker
+
+        self.logger.info("AsyncOpenRouterClient успешно инициализирован.")
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Общий асинхронный HTTP-клиент текущего цикла событий.
+        """
+        return get_async_client(self.pool_size)
+
+    async def get_models(self):
+        """
+        Получение списка доступных языковых моделей.
+
+        Если задан кэш, список берется из сохраненного каталога без обращения
+        к сети; устаревший каталог обновляется в фоновой задаче.
+
+        Returns:
+            list: Список словарей с информацией о моделях:
+                 [{"id": "model-id", "name": "Model Name"}, ...]
+
+        Note:
+            При ошибке запроса возвращает список базовых моделей по умолчанию
+        """
+        self.logger.debug("Получение списка доступных моделей...")
+
+        catalog = self.cache.get_model_catalog() if self.cache else None
+        if catalog:
+            if time.time() - catalog["fetched_at"] > self.models_ttl:
+                self.refresh_models_in_background()
+            self.logger.info(f"Получено {len(catalog['models'])} моделей из кэша.")
+            return catalog["models"]
+
+        models = await self.refresh_models()
+        if models is not None:
+            return models
+
+        models_default = list(DEFAULT_MODELS)
+        self.logger.info(f"Получено {len(models_default)} моделей по умолчанию.")
+        return models_default
+
+    async def refresh_models(self):
+        """
+        Загрузка каталога моделей из API с условной ревалидацией.
+
+        Returns:
+            list | None: Актуальный список моделей или None при ошибке
+        """
+        catalog = self.cache.get_model_catalog() if self.cache else None
+
+        try:
+            response = await self.client.get(
+                f"{self.base_url}/models",
+                headers={**self.headers, **catalog_headers(catalog)},
+                timeout=self.timeouts["models"],
+            )
+
+            # Каталог не изменился с последней проверки
+            if response.status_code == 304 and catalog:
+                self.cache.touch_model_catalog()
+                self.logger.info("Каталог моделей не изменился.")
+                return catalog["models"]
+
+            response.raise_for_status()
+            models = parse_models(response.json())
+
+            self.logger.info(f"Получено {len(models)} моделей.")
+
+            if self.cache:
+                self.cache.save_model_catalog(
+                    models,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                )
+            return models
+        except Exception as e:
+            self.logger.error(f"Ошибка загрузки списка моделей: {e}")
+            return None
+
+    def refresh_models_in_background(self):
+        """
+        Запуск обновления каталога моделей фоновой задачей.
+
+        Повторный вызов во время уже идущего обновления игнорируется.
+        """
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.refresh_models())
+
+    async def send_message(
+        self,
+        message: str,
+        model: str,
+        history: list | None = None,
+        request_id: str | None = None,
+    ):
+        """
+        Отправка сообщения выбранной языковой модели.
+
+        Временные ошибки (429, 5xx, таймауты, сеть) повторяются согласно
+        retry_policy; при разомкнутом выключателе модели запрос не
+        выполняется.
+
+        Args:
+            message (str): Текст сообщения для отправки
+            model (str): Идентификатор выбранной модели
+            history (list | None): Предыдущие сообщения диалога в формате API
+            request_id (str | None): Идентификатор запроса для корреляции логов;
+                по умолчанию берется из текущего контекста или генерируется
+
+        Returns:
+            dict: Ответ от API или ошибка в формате APIError.to_result():
+                 {"error": "описание", "error_type": "rate_limit", ...}
+        """
+        # Идентификатор запроса для связи записей лога
+        request_id = request_id or request_id_var.get() or new_request_id()
+        self.logger.debug(
+            f"Отправка сообщения модели: {model}", request_id=request_id, model=model
+        )
+
+        data = {
+            "model": model,  # Идентификатор выбранной модели
+            "messages": [
+                *(history or []),  # Контекст предыдущих сообщений
+                {"role": "user", "content": message},
+            ],  # Сообщения в формате API
+        }
+
+        start_time = time.perf_counter()
+        breaker = self.circuit_breaker(model)  # Выключатель выбранной модели
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                # Модель недоступна: ошибка сразу, без запроса и ожидания
+                error = breaker.open_error()
+                break
+            try:
+                response = await self.client.post(
+                    f"{self.base_url}/chat/completions",  # Эндпоинт для чата
+                    headers={**self.headers, "X-Request-Id": request_id},  # Заголовки
+                    json=data,  # Данные запроса
+                    timeout=self.timeouts["chat"],  # Ограничение времени ожидания
+                )
+                response.raise_for_status()
+                result = response.json()
+
+                # Ошибка провайдера может прийти и в ответе с кодом 200
+                if result.get("error"):
+                    raise error_from_body(result["error"], response.status_code)
+                breaker.record_success()
+
+                self.logger.info(
+                    "Ответ от API успешно получен.",
+                    event="chat_completion",
+                    request_id=request_id,
+                    model=model,
+                    latency_ms=round((time.perf_counter() - start_time) * 1000, 1),
+                    tokens=(result.get("usage") or {}).get("total_tokens", 0),
+                    attempts=attempt + 1,
+                    status="ok",
+                )
+                return result
+
+            except Exception as e:
+                error = classify_error(e)
+                breaker.record_failure(error)
+                delay = self.retry_policy.get_delay(attempt, error)
+                if delay is None:
+                    break
+                # Временная ошибка: повтор после задержки (цикл событий свободен)
+                self.logger.warning(
+                    f"Повтор запроса через {delay:.1f} с: {error.message}",
+                    request_id=request_id,
+                    model=model,
+                    error_type=error.kind,
+                    attempt=attempt,
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
+
+        self.logger.error(
+            f"API-запрос не удался: {error.message}",
+            exc_info=error if error.kind == ERROR_UNKNOWN else None,
+            event="chat_completion",
+            request_id=request_id,
+            model=model,
+            latency_ms=round((time.perf_counter() - start_time) * 1000, 1),
+            attempts=attempt + 1,
+            status="error",
+            error=error.message,
+            error_type=error.kind,
+        )
+        return error.to_result()
+
+    async def stream_message(
+        self,
+        message: str,
+        model: str,
+        history: list | None = None,
+        request_id: str | None = None,
+    ):
+        """
+        Потоковая отправка сообщения выбранной языковой модели.
+        Временные ошибки повторяются только до первого фрагмента ответа.
+
+        Args:
+            message (str): Текст сообщения для отправки
+            model (str): Идентификатор выбранной модели
+            history (list | None): Предыдущие сообщения диалога в формате API
+            request_id (str | None): Идентификатор запроса для корреляции логов;
+                по умолчанию берется из текущего контекста или генерируется
+
+        Yields:
+            dict: Фрагменты ответа в формате API, при ошибке -
+                 словарь APIError.to_result() ({"error": "описание", ...})
+        """
+        # Идентификатор запроса для связи записей лога
+        request_id = request_id or request_id_var.get() or new_request_id()
+        self.logger.debug(
+            f"Потоковая отправка сообщения модели: {model}",
+            request_id=request_id,
+            model=model,
+        )
+
+        data = {
+            "model": model,  # Идентификатор выбранной модели
+            "messages": [
+                *(history or []),  # Контекст предыдущих сообщений
+                {"role": "user", "content": message},
+            ],  # Сообщения в формате API
+            "stream": True,  # Включение потокового режима (SSE)
+            "usage": {"include": True},  # Статистика токенов в последнем фрагменте
+        }
+
+        start_time = time.perf_counter()
+        first_token_ms = None  # Время до первого фрагмента
+        tokens = 0  # Токены из итоговой статистики потока
+        breaker = self.circuit_breaker(model)  # Выключатель выбранной модели
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                # Модель недоступна: ошибка сразу, без запроса и ожидания
+                error = breaker.open_error()
+                break
+            try:
+                async with self.client.stream(
+                    "POST",
+                    f"{self.base_url}/chat/completions",  # Эндпоинт для чата
+                    headers={**self.headers, "X-Request-Id": request_id},  # Заголовки
+                    json=data,  # Данные запроса
+                    timeout=self.timeouts["stream"],  # Ограничение паузы в потоке
+                ) as response:
+                    if response.is_error:
+                        await response.aread()  # Тело с описанием ошибки от API
+                        raise error_from_response(response)
+                    breaker.record_success()  # Модель приняла запрос
+
+                    async for line in response.aiter_lines():
+                        chunk = parse_sse_line(line)
+                        if chunk is None:
+                            continue
+                        if chunk is STREAM_DONE:
+                            break
+                        if "error" in chunk:
+                            # Ошибка провайдера посреди потока
+                            raise APIError(
+                                chunk["error_type"], chunk["error"], chunk["status"]
+                            )
+                        if first_token_ms is None:
+                            first_token_ms = round(
+                                (time.perf_counter() - start_time) * 1000, 1
+                            )
+                        if chunk.get("usage"):
+                            tokens = chunk["usage"].get("total_tokens", 0)
+                        yield chunk
+
+                self.logger.info(
+                    "Потоковый ответ от API успешно получен.",
+                    event="chat_stream",
+                    request_id=request_id,
+                    model=model,
+                    latency_ms=round((time.perf_counter() - start_time) * 1000, 1),
+                    ttft_ms=first_token_ms,
+                    tokens=tokens,
+                    attempts=attempt + 1,
+                    status="ok",
+                )
+                return
+
+            except Exception as e:
+                error = classify_error(e)
+                breaker.record_failure(error)
+                # После первого фрагмента повтор невозможен: часть ответа уже отдана
+                delay = (
+                    self.retry_policy.get_delay(attempt, error)
+                    if first_token_ms is None
+                    else None
+                )
+                if delay is None:
+                    break
+                # Временная ошибка до начала ответа: повтор после задержки
+                self.logger.warning(
+                    f"Повтор потокового запроса через {delay:.1f} с: {error.message}",
+                    request_id=request_id,
+                    model=model,
+                    error_type=error.kind,
+                    attempt=attempt,
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
+
+        self.logger.error(
+            f"Потоковый API-запрос не удался: {error.message}",
+            exc_info=error if error.kind == ERROR_UNKNOWN else None,
+            event="chat_stream",
+            request_id=request_id,
+            model=model,
+            latency_ms=round((time.perf_counter() - start_time) * 1000, 1),
+            ttft_ms=first_token_ms,
+            attempts=attempt + 1,
+            status="error",
+            error=error.message,
+            error_type=error.kind,
+        )
+        yield error.to_result()
+
+    async def fetch_balance(self) -> str:
+        """
+        Запрос текущего баланса аккаунта с передачей ошибок вызывающему коду
+        (используется фоновым обновлением баланса для повторов с задержкой).
+
+        Returns:
+            str: Строка с балансом в формате '$X.XX'
+
+        Raises:
+            httpx.HTTPError: При сетевой ошибке или ответе с кодом ошибки
+            ValueError: Если ответ не содержит данных о балансе
+        """
+        response = await self.client.get(
+            f"{self.base_url}/credits",  # Эндпоинт для проверки баланса
+            headers=self.headers,  # Заголовки с авторизацией
+            timeout=self.timeouts["balance"],  # Ограничение времени ожидания
+        )
+        response.raise_for_status()
+        data = (response.json() or {}).get("data")
+        if not data:
+            raise ValueError("Ответ API не содержит данных о балансе")
+        # Вычисление доступного баланса (всего кредитов минус использовано)
+        return f"${(data.get('total_credits', 0)-data.get('total_usage', 0)):.2f}"
+
+    async def get_balance(self):
+        """
+        Получение текущего баланса аккаунта.
+
+        Returns:
+            str: Строка с балансом в формате '$X.XX' или 'Ошибка' при неудаче
+        """
+        try:
+            return await self.fetch_balance()
+        except Exception as e:
+            error_msg = f"API-запрос не удался: {str(e)}"
+            self.logger.error(error_msg, exc_info=True)
+            return "Ошибка"
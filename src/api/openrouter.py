@@ -1,9 +1,114 @@
-import requests  # Библиотека для выполнения HTTP-запросов к API
+import json  # Библиотека для разбора событий потокового ответа
+import threading  # Библиотека для фонового обновления каталога моделей
+import time  # Библиотека для работы с временными метками
+from src.api.transport import (
+    DEFAULT_POOL_SIZE,
+    DEFAULT_TIMEOUTS,
+    get_session,
+)  # Общая HTTP-сессия с пулом соединений и таймауты по умолчанию
+from src.api.resilience import (
+    ERROR_UNKNOWN,
+    APIError,
+    RetryPolicy,
+    classify_error,
+    error_from_body,
+    error_from_response,
+    get_circuit_breaker,
+)  # Классификация ошибок, повторы и автоматические выключатели моделей
 from src.utils.app_logger import (
     AppLogger,
+    new_request_id,
+    request_id_var,
 )  # Импорт собственного логгера для отслеживания работы
 
 
+# Базовый URL API OpenRouter
+API_BASE_URL = "https://openrouter.ai/api/v1"
+
+# Список моделей по умолчанию при ошибке API
+DEFAULT_MODELS = [
+    {"id": "deepseek-coder", "name": "DeepSeek"},
+    {"id": "claude-3-sonnet", "name": "Claude 3.5 Sonnet"},
+    {"id": "gpt-3.5-turbo", "name": "GPT-3.5 Turbo"},
+]
+
+# Время жизни сохраненного каталога моделей (секунды)
+MODELS_TTL = 6 * 60 * 60
+
+# Маркер завершения потока ("data: [DONE]")
+STREAM_DONE = object()
+
+
+def parse_sse_line(line: str):
+    """
+    Разбор одной строки потока Server-Sent Events от OpenRouter.
+
+    Args:
+        line (str): Строка потока без завершающего перевода строки
+
+    Returns:
+        dict | object | None: Разобранный фрагмент ответа (ошибка - в
+            формате APIError.to_result()), маркер STREAM_DONE для "[DONE]"
+            или None для пустых строк и комментариев
+            (например, ": OPENROUTER PROCESSING")
+    """
+    # Пустые строки разделяют события, строки с ":" - комментарии сервера
+    if not line or line.startswith(":") or not line.startswith("data:"):
+        return None
+
+    payload = line[len("data:"):].strip()
+    if payload == "[DONE]":
+        return STREAM_DONE
+
+    try:
+        chunk = json.loads(payload)
+    except json.JSONDecodeError:
+        return None
+
+    # Ошибка посреди потока приходит отдельным событием
+    if "error" in chunk:
+        return error_from_body(chunk["error"]).to_result()
+    return chunk
+
+
+def parse_models(models_data: dict) -> list:
+    """
+    Преобразование ответа /models в список моделей приложения.
+
+    Args:
+        models_data (dict): Ответ API в формате {"data": [...]}
+
+    Returns:
+        list: Список словарей [{"id": "model-id", "name": "Model Name"}, ...]
+    """
+    return [
+        {
+            "id": model["id"],  # Идентификатор модели для API
+            "name": model["name"],  # Человекочитаемое название модели
+        }
+        for model in models_data["data"]
+    ]
+
+
+def catalog_headers(catalog: dict | None) -> dict:
+    """
+    Заголовки условного запроса каталога моделей.
+
+    Args:
+        catalog (dict | None): Сохраненный каталог из AppCache.get_model_catalog()
+
+    Returns:
+        dict: Заголовки If-None-Match / If-Modified-Since (или пустой словарь)
+    """
+    headers = {}
+    if catalog:
+        if catalog.get("etag"):
+            headers["If-None-Match"] = catalog["etag"]
+        if catalog.get("last_modified"):
+            headers["If-Modified-Since"] = catalog["last_modified"]
+    return headers
+
+
 class OpenRouterClient:
     """
     Клиент для взаимодействия с OpenRouter API.
@@ -12,7 +117,16 @@ class OpenRouterClient:
     языковым моделям (GPT, Claude и др.) через единый API интерфейс.
     """
 
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeouts: dict | None = None,
+        cache=None,
+        models_ttl: float = MODELS_TTL,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker=get_circuit_breaker,
+    ):
         """
         Инициализация клиента OpenRouter.
 
@@ -20,8 +134,21 @@ class OpenRouterClient:
         - Систему логирования
         - API ключ и базовый URL из переменных окружения
         - Заголовки для HTTP запросов
+        - Общую HTTP-сессию с пулом keep-alive соединений
+        - Таймауты запросов
         - Список доступных моделей
 
+        Args:
+            api_key (str): Ключ API OpenRouter
+            pool_size (int): Размер пула соединений
+            timeouts (dict | None): Переопределение таймаутов по типам запросов
+                ("models", "chat", "stream", "balance"), значения -
+                (подключение, чтение) в секундах
+            cache (AppCache | None): Кэш для хранения каталога моделей на диске
+            models_ttl (float): Время жизни сохраненного каталога в секундах
+            retry_policy (RetryPolicy | None): Политика повторов запросов к модели
+            circuit_breaker (callable): Функция model -> CircuitBreaker
+
         Raises:
             ValueError: Если API ключ не найден в переменных окружения
         """
@@ -30,7 +157,7 @@ class OpenRouterClient:
 
         # Получение необходимых параметров из переменных окружения
         self.api_key = api_key  # API ключ для авторизации
-        self.base_url = "https://openrouter.ai/api/v1"  # Базовый URL API
+        self.base_url = API_BASE_URL  # Базовый URL API
 
         # Проверка наличия API ключа
         if not self.api_key:
@@ -45,6 +172,21 @@ class OpenRouterClient:
             "Content-Type": "application/json",  # Указание формата данных
         }
 
+        # Общая сессия с пулом соединений (одна на процесс)
+        self.session = get_session(pool_size)
+
+        # Таймауты запросов: без них зависший сокет блокирует поток навсегда
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+
+        # Дисковый кэш каталога моделей
+        self.cache = cache
+        self.models_ttl = models_ttl
+        self._refresh_lock = threading.Lock()  # Не более одного фонового обновления
+
+        # Устойчивость к временным ошибкам: повторы и выключатели по моделям
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker
+
         # Логирование успешной инициализации клиента
         self.logger.info("OpenRouterClient успешно инициализирован.")
 
@@ -55,6 +197,10 @@ class OpenRouterClient:
         """
         Получение списка доступных языковых моделей.
 
+        Если задан кэш, список берется из сохраненного каталога без обращения
+        к сети. Устаревший каталог (старше models_ttl) отдается сразу, а его
+        обновление запускается в фоновом потоке.
+
         Returns:
             list: Список словарей с информацией о моделях:
                  [{"id": "model-id", "name": "Model Name"}, ...]
@@ -65,83 +211,355 @@ class OpenRouterClient:
         # Логирование начала запроса списка моделей
         self.logger.debug("Получение списка доступных моделей...")
 
+        catalog = self.cache.get_model_catalog() if self.cache else None
+        if catalog:
+            # Фоновая проверка устаревшего каталога
+            if time.time() - catalog["fetched_at"] > self.models_ttl:
+                self.refresh_models_in_background()
+            self.logger.info(f"Получено {len(catalog['models'])} моделей из кэша.")
+            return catalog["models"]
+
+        models = self.refresh_models()
+        if models is not None:
+            return models
+
+        # Список моделей по умолчанию при ошибке API
+        models_default = list(DEFAULT_MODELS)
+        # Логирование возврата списка по умолчанию
+        self.logger.info(f"Получено {len(models_default)} моделей по умолчанию.")
+        return models_default
+
+    def refresh_models(self):
+        """
+        Загрузка каталога моделей из API с условной ревалидацией.
+
+        Отправляет If-None-Match / If-Modified-Since по данным сохраненного
+        каталога; при ответе 304 каталог только продлевается.
+
+        Returns:
+            list | None: Актуальный список моделей или None при ошибке
+        """
+        catalog = self.cache.get_model_catalog() if self.cache else None
+
         try:
             # Выполнение GET запроса к API для получения списка моделей
-            response = requests.get(f"{self.base_url}/models", headers=self.headers)
-            # Преобразование ответа из JSON в словарь Python
-            models_data = response.json()
+            response = self.session.get(
+                f"{self.base_url}/models",
+                headers={**self.headers, **catalog_headers(catalog)},
+                timeout=self.timeouts["models"],
+            )
+
+            # Каталог не изменился с последней проверки
+            if response.status_code == 304 and catalog:
+                self.cache.touch_model_catalog()
+                self.logger.info("Каталог моделей не изменился.")
+                return catalog["models"]
+
+            response.raise_for_status()
+            # Преобразование ответа из JSON в список моделей
+            models = parse_models(response.json())
 
             # Логирование успешного получения списка моделей
-            self.logger.info(f"Получено {len(models_data['data'])} моделей.")
-
-            # Преобразование данных в нужный формат
-            return [
-                {
-                    "id": model["id"],  # Идентификатор модели для API
-                    "name": model["name"],  # Человекочитаемое название модели
-                }
-                for model in models_data["data"]
-            ]
+            self.logger.info(f"Получено {len(models)} моделей.")
+
+            if self.cache:
+                self.cache.save_model_catalog(
+                    models,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                )
+            return models
         except Exception as e:
-            # Список моделей по умолчанию при ошибке API
-            models_default = [
-                {"id": "deepseek-coder", "name": "DeepSeek"},
-                {"id": "claude-3-sonnet", "name": "Claude 3.5 Sonnet"},
-                {"id": "gpt-3.5-turbo", "name": "GPT-3.5 Turbo"},
-            ]
-            # Логирование ошибки и возврата списка по умолчанию
-            self.logger.info(f"Получено {len(models_default)} моделей с ошибкой: {e}")
-            return models_default
-
-    def send_message(self, message: str, model: str):
+            # Логирование ошибки загрузки каталога
+            self.logger.error(f"Ошибка загрузки списка моделей: {e}")
+            return None
+
+    def refresh_models_in_background(self):
+        """
+        Запуск обновления каталога моделей в фоновом потоке.
+
+        Повторный вызов во время уже идущего обновления игнорируется.
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+
+        def worker():
+            try:
+                self.refresh_models()
+            finally:
+                # Соединение SQLite потока закрывается вместе с потоком
+                if self.cache:
+                    self.cache.release_connection()
+                self._refresh_lock.release()
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def send_message(
+        self,
+        message: str,
+        model: str,
+        history: list | None = None,
+        request_id: str | None = None,
+    ):
         """
         Отправка сообщения выбранной языковой модели.
 
+        Временные ошибки (429, 5xx, таймауты, сеть) повторяются согласно
+        retry_policy; при разомкнутом выключателе модели запрос не
+        выполняется.
+
         Args:
             message (str): Текст сообщения для отправки
             model (str): Идентификатор выбранной модели
+            history (list | None): Предыдущие сообщения диалога в формате API
+            request_id (str | None): Идентификатор запроса для корреляции логов;
+                по умолчанию берется из текущего контекста или генерируется
 
         Returns:
-            dict: Ответ от API, содержащий либо ответ модели, либо информацию об ошибке
+            dict: Ответ от API или ошибка в формате APIError.to_result():
+                 {"error": "описание", "error_type": "rate_limit", ...}
         """
+        # Идентификатор запроса для связи записей лога
+        request_id = request_id or request_id_var.get() or new_request_id()
+
         # Логирование отправки сообщения
-        self.logger.debug(f"Отправка сообщения модели: {model}")
+        self.logger.debug(
+            f"Отправка сообщения модели: {model}", request_id=request_id, model=model
+        )
 
         # Формирование данных для отправки в API
         data = {
             "model": model,  # Идентификатор выбранной модели
             "messages": [
-                {"role": "user", "content": message}
-            ],  # Сообщение в формате API
+                *(history or []),  # Контекст предыдущих сообщений
+                {"role": "user", "content": message},
+            ],  # Сообщения в формате API
         }
 
-        try:
-            # Логирование начала выполнения запроса
-            self.logger.debug("Выполнение API-запроса...")
+        start_time = time.perf_counter()
+        breaker = self.circuit_breaker(model)  # Выключатель выбранной модели
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                # Модель недоступна: ошибка сразу, без запроса и ожидания
+                error = breaker.open_error()
+                break
+            try:
+                # Логирование начала выполнения запроса
+                self.logger.debug(
+                    "Выполнение API-запроса...", request_id=request_id, attempt=attempt
+                )
 
-            # Отправка POST запроса к API
-            response = requests.post(
-                f"{self.base_url}/chat/completions",  # Эндпоинт для чата
-                headers=self.headers,  # Заголовки с авторизацией
-                json=data,  # Данные запроса
-            )
+                # Отправка POST запроса к API
+                response = self.session.post(
+                    f"{self.base_url}/chat/completions",  # Эндпоинт для чата
+                    headers={**self.headers, "X-Request-Id": request_id},  # Заголовки
+                    json=data,  # Данные запроса
+                    timeout=self.timeouts["chat"],  # Ограничение времени ожидания
+                )
 
-            # Проверка на ошибки HTTP
-            response.raise_for_status()
+                # Проверка на ошибки HTTP
+                response.raise_for_status()
+                result = response.json()
 
-            # Логирование успешного получения ответа
-            self.logger.info("Ответ от API успешно получен.")
+                # Ошибка провайдера может прийти и в ответе с кодом 200
+                if result.get("error"):
+                    raise error_from_body(result["error"], response.status_code)
+                breaker.record_success()
 
-            # Возврат данных ответа
-            return response.json()
+                # Логирование успешного получения ответа
+                self.logger.info(
+                    "Ответ от API успешно получен.",
+                    event="chat_completion",
+                    request_id=request_id,
+                    model=model,
+                    latency_ms=round((time.perf_counter() - start_time) * 1000, 1),
+                    tokens=(result.get("usage") or {}).get("total_tokens", 0),
+                    attempts=attempt + 1,
+                    status="ok",
+                )
 
-        except Exception as e:
-            # Формирование информативного сообщения об ошибке
-            error_msg = f"API-запрос не удался: {str(e)}"
-            # Логирование ошибки с полным стектрейсом для отладки
-            self.logger.error(error_msg, exc_info=True)
-            # Возврат сообщения об ошибке в формате ответа API
-            return {"Ошибка": str(e)}
+                # Возврат данных ответа
+                return result
+
+            except Exception as e:
+                error = classify_error(e)
+                breaker.record_failure(error)
+                delay = self.retry_policy.get_delay(attempt, error)
+                if delay is None:
+                    break
+                # Временная ошибка: повтор после задержки
+                self.logger.warning(
+                    f"Повтор запроса через {delay:.1f} с: {error.message}",
+                    request_id=request_id,
+                    model=model,
+                    error_type=error.kind,
+                    attempt=attempt,
+                )
+                time.sleep(delay)
+                attempt += 1
+
+        # Логирование ошибки (стектрейс - только для неклассифицированных)
+        self.logger.error(
+            f"API-запрос не удался: {error.message}",
+            exc_info=error if error.kind == ERROR_UNKNOWN else None,
+            event="chat_completion",
+            request_id=request_id,
+            model=model,
+            latency_ms=round((time.perf_counter() - start_time) * 1000, 1),
+            attempts=attempt + 1,
+            status="error",
+            error=error.message,
+            error_type=error.kind,
+        )
+        # Возврат ошибки в едином формате ({"error": ..., "error_type": ...})
+        return error.to_result()
+
+    def stream_message(
+        self,
+        message: str,
+        model: str,
+        history: list | None = None,
+        request_id: str | None = None,
+    ):
+        """
+        Потоковая отправка сообщения выбранной языковой модели.
+
+        Запрос выполняется с параметром `stream: true`, ответ приходит в формате
+        Server-Sent Events и отдается по частям по мере генерации.
+        Временные ошибки повторяются только до первого фрагмента ответа.
+
+        Args:
+            message (str): Текст сообщения для отправки
+            model (str): Идентификатор выбранной модели
+            history (list | None): Предыдущие сообщения диалога в формате API
+            request_id (str | None): Идентификатор запроса для корреляции логов;
+                по умолчанию берется из текущего контекста или генерируется
+
+        Yields:
+            dict: Фрагменты ответа в формате API:
+                 {"choices": [{"delta": {"content": "..."}}], "usage": {...}}
+                 При ошибке отдается словарь APIError.to_result():
+                 {"error": "описание ошибки", "error_type": ..., ...}
+        """
+        # Идентификатор запроса для связи записей лога
+        request_id = request_id or request_id_var.get() or new_request_id()
+
+        # Логирование начала потоковой отправки
+        self.logger.debug(
+            f"Потоковая отправка сообщения модели: {model}",
+            request_id=request_id,
+            model=model,
+        )
+
+        # Формирование данных для отправки в API
+        data = {
+            "model": model,  # Идентификатор выбранной модели
+            "messages": [
+                *(history or []),  # Контекст предыдущих сообщений
+                {"role": "user", "content": message},
+            ],  # Сообщения в формате API
+            "stream": True,  # Включение потокового режима (SSE)
+            "usage": {"include": True},  # Статистика токенов в последнем фрагменте
+        }
+
+        start_time = time.perf_counter()
+        first_token_ms = None  # Время до первого фрагмента
+        tokens = 0  # Токены из итоговой статистики потока
+        breaker = self.circuit_breaker(model)  # Выключатель выбранной модели
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                # Модель недоступна: ошибка сразу, без запроса и ожидания
+                error = breaker.open_error()
+                break
+            try:
+                # Отправка POST запроса с потоковым чтением тела ответа
+                with self.session.post(
+                    f"{self.base_url}/chat/completions",  # Эндпоинт для чата
+                    headers={**self.headers, "X-Request-Id": request_id},  # Заголовки
+                    json=data,  # Данные запроса
+                    timeout=self.timeouts["stream"],  # Ограничение паузы в потоке
+                    stream=True,  # Чтение ответа по мере поступления
+                ) as response:
+                    # Проверка на ошибки HTTP (тело читается до закрытия ответа)
+                    if not response.ok:
+                        raise error_from_response(response)
+                    breaker.record_success()  # Модель приняла запрос
+                    # Сервер не всегда указывает кодировку для text/event-stream
+                    response.encoding = "utf-8"
+
+                    for line in response.iter_lines(decode_unicode=True):
+                        chunk = parse_sse_line(line)
+                        if chunk is None:
+                            continue
+                        if chunk is STREAM_DONE:
+                            break
+                        if "error" in chunk:
+                            # Ошибка провайдера посреди потока
+                            raise APIError(
+                                chunk["error_type"], chunk["error"], chunk["status"]
+                            )
+                        if first_token_ms is None:
+                            first_token_ms = round(
+                                (time.perf_counter() - start_time) * 1000, 1
+                            )
+                        if chunk.get("usage"):
+                            tokens = chunk["usage"].get("total_tokens", 0)
+                        yield chunk
+
+                # Логирование успешного завершения потока
+                self.logger.info(
+                    "Потоковый ответ от API успешно получен.",
+                    event="chat_stream",
+                    request_id=request_id,
+                    model=model,
+                    latency_ms=round((time.perf_counter() - start_time) * 1000, 1),
+                    ttft_ms=first_token_ms,
+                    tokens=tokens,
+                    attempts=attempt + 1,
+                    status="ok",
+                )
+                return
+
+            except Exception as e:
+                error = classify_error(e)
+                breaker.record_failure(error)
+                # После первого фрагмента повтор невозможен: часть ответа уже отдана
+                delay = (
+                    self.retry_policy.get_delay(attempt, error)
+                    if first_token_ms is None
+                    else None
+                )
+                if delay is None:
+                    break
+                # Временная ошибка до начала ответа: повтор после задержки
+                self.logger.warning(
+                    f"Повтор потокового запроса через {delay:.1f} с: {error.message}",
+                    request_id=request_id,
+                    model=model,
+                    error_type=error.kind,
+                    attempt=attempt,
+                )
+                time.sleep(delay)
+                attempt += 1
+
+        # Логирование ошибки (стектрейс - только для неклассифицированных)
+        self.logger.error(
+            f"Потоковый API-запрос не удался: {error.message}",
+            exc_info=error if error.kind == ERROR_UNKNOWN else None,
+            event="chat_stream",
+            request_id=request_id,
+            model=model,
+            latency_ms=round((time.perf_counter() - start_time) * 1000, 1),
+            ttft_ms=first_token_ms,
+            attempts=attempt + 1,
+            status="error",
+            error=error.message,
+            error_type=error.kind,
+        )
+        # Возврат ошибки в виде последнего фрагмента потока (в едином формате)
+        yield error.to_result()
 
     def get_balance(self):
         """
@@ -152,9 +570,10 @@ class OpenRouterClient:
         """
         try:
             # Запрос баланса через API
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/credits",  # Эндпоинт для проверки баланса
                 headers=self.headers,  # Заголовки с авторизацией
+                timeout=self.timeouts["balance"],  # Ограничение времени ожидания
             )
             # Получение данных из ответа
             data = response.json()
@@ -0,0 +1,395 @@
+import random  # Случайная составляющая задержки между повторами
+import threading  # Защита состояния автоматических выключателей
+import time  # Библиотека для работы с временными метками
+from email.utils import parsedate_to_datetime  # Разбор Retry-After в формате даты
+
+import httpx  # Ошибки асинхронного HTTP-клиента
+import requests  # Ошибки синхронного HTTP-клиента
+
+# Типы ошибок API
+ERROR_RATE_LIMIT = "rate_limit"  # 429: превышен лимит запросов провайдера
+ERROR_SERVER = "server"  # 5xx и 408: временная ошибка на стороне сервера
+ERROR_TIMEOUT = "timeout"  # Истекло время подключения или ожидания ответа
+ERROR_NETWORK = "network"  # Сетевая ошибка (нет соединения, разрыв)
+ERROR_AUTH = "auth"  # 401/403: неверный ключ или нет доступа
+ERROR_PAYMENT = "payment"  # 402: недостаточно средств
+ERROR_REQUEST = "request"  # Прочие 4xx: ошибка в запросе (модель, параметры)
+ERROR_PROVIDER = "provider"  # Ошибка, переданная провайдером в теле ответа
+ERROR_CIRCUIT_OPEN = "circuit_open"  # Запросы к модели временно не выполняются
+ERROR_UNKNOWN = "unknown"  # Неклассифицированная ошибка
+
+# Временные ошибки: повтор запроса может быть успешным
+RETRYABLE_ERRORS = {ERROR_RATE_LIMIT, ERROR_SERVER, ERROR_TIMEOUT, ERROR_NETWORK}
+
+# Параметры повторов по умолчанию
+RETRY_MAX_ATTEMPTS = 3  # Всего попыток (первая + повторы)
+RETRY_BASE_DELAY = 1.0  # Базовая задержка перед первым повтором (секунды)
+RETRY_MAX_DELAY = 20.0  # Максимальная задержка (секунды)
+
+# Параметры автоматического выключателя по умолчанию
+BREAKER_FAILURE_THRESHOLD = 5  # Временных ошибок подряд до размыкания
+BREAKER_RESET_TIMEOUT = 30.0  # Время до пробного запроса (секунды)
+BREAKER_MIN_RETRY_IN = 1.0  # Минимальная пауза, сообщаемая пользователю (секунды)
+
+
+class APIError(Exception):
+    """
+    Классифицированная ошибка запроса к API.
+
+    Attributes:
+        kind (str): Тип ошибки (константа ERROR_*)
+        message (str): Описание ошибки
+        status (int | None): HTTP-код ответа, если он был получен
+        retry_after (float | None): Рекомендованная сервером пауза (секунды)
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        message: str,
+        status: int | None = None,
+        retry_after: float | None = None,
+    ):
+        super().__init__(message)
+        self.kind = kind
+        self.message = message
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        """
+        Временная ошибка, после которой имеет смысл повторить запрос.
+        """
+        return self.kind in RETRYABLE_ERRORS
+
+    def to_result(self) -> dict:
+        """
+        Результат с ошибкой в едином для клиентов формате.
+
+        Returns:
+            dict: Словарь {"error": описание, "error_type": тип,
+                 "status": HTTP-код, "retry_after": пауза}; ключ "error"
+                 совпадает с ключом ошибки во фрагментах потока
+        """
+        return {
+            "error": self.message,
+            "error_type": self.kind,
+            "status": self.status,
+            "retry_after": self.retry_after,
+        }
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Разбор заголовка Retry-After.
+
+    Args:
+        value (str | None): Количество секунд или HTTP-дата
+
+    Returns:
+        float | None: Пауза в секундах или None, если заголовка нет
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def kind_for_status(status: int) -> str:
+    """
+    Тип ошибки по HTTP-коду ответа.
+    """
+    if status == 429:
+        return ERROR_RATE_LIMIT
+    if status == 408 or status >= 500:
+        return ERROR_SERVER
+    if status in (401, 403):
+        return ERROR_AUTH
+    if status == 402:
+        return ERROR_PAYMENT
+    return ERROR_REQUEST
+
+
+def error_from_body(error, status: int | None = None) -> APIError:
+    """
+    Ошибка из тела ответа OpenRouter ({"error": {"code": ..., "message": ...}}).
+
+    Args:
+        error (dict | str): Значение ключа "error" ответа
+        status (int | None): HTTP-код ответа
+
+    Returns:
+        APIError: Классифицированная ошибка
+    """
+    code = status
+    message = error
+    if isinstance(error, dict):
+        message = error.get("message") or str(error)
+        if isinstance(error.get("code"), int):
+            code = error["code"]
+    kind = kind_for_status(code) if code and code >= 400 else ERROR_PROVIDER
+    return APIError(kind, str(message), status=code)
+
+
+def error_from_response(response, exc: Exception | None = None) -> APIError:
+    """
+    Ошибка по HTTP-ответу с кодом ошибки (requests или httpx).
+
+    Для потокового ответа тело должно быть прочитано до вызова, иначе
+    в ошибке останется только HTTP-код.
+
+    Args:
+        response (requests.Response | httpx.Response): Ответ с кодом ошибки
+        exc (Exception | None): Исключение raise_for_status, если было
+
+    Returns:
+        APIError: Ошибка с типом по коду, описанием от API и Retry-After
+    """
+    status = response.status_code
+    message = str(exc) if exc is not None else f"HTTP {status}"
+    try:
+        # Описание ошибки от OpenRouter информативнее текста исключения
+        body = response.json()
+        if isinstance(body, dict) and body.get("error"):
+            message = error_from_body(body["error"], status).message
+    except Exception:
+        pass  # Тело не прочитано (потоковый ответ) или не является JSON
+    return APIError(
+        kind_for_status(status),
+        message,
+        status=status,
+        retry_after=parse_retry_after(response.headers.get("Retry-After")),
+    )
+
+
+def classify_error(exc: Exception) -> APIError:
+    """
+    Классификация исключения HTTP-клиента.
+
+    Args:
+        exc (Exception): Исключение requests, httpx или APIError
+
+    Returns:
+        APIError: Ошибка с типом, HTTP-кодом и паузой Retry-After
+    """
+    if isinstance(exc, APIError):
+        return exc
+
+    response = getattr(exc, "response", None)
+    if isinstance(exc, (requests.HTTPError, httpx.HTTPStatusError)) and (
+        response is not None
+    ):
+        # Ответ с кодом ошибки (raise_for_status)
+        error = error_from_response(response, exc)
+    elif isinstance(exc, (requests.Timeout, httpx.TimeoutException)):
+        error = APIError(ERROR_TIMEOUT, str(exc) or "Превышено время ожидания")
+    elif isinstance(exc, (requests.ConnectionError, httpx.TransportError)):
+        error = APIError(ERROR_NETWORK, str(exc) or "Ошибка соединения")
+    else:
+        error = APIError(ERROR_UNKNOWN, str(exc) or type(exc).__name__)
+    error.__cause__ = exc  # Исходное исключение (стектрейс в логе)
+    return error
+
+
+class RetryPolicy:
+    """
+    Политика повторов запросов с экспоненциальной задержкой.
+
+    Повторяются только временные ошибки (лимит запросов, ошибки сервера,
+    таймауты, сетевые ошибки). Задержка перед повтором n (с нуля) выбирается
+    случайно из [0, min(max_delay, base_delay * 2^n)] ("full jitter"), чтобы
+    клиенты, получившие ошибку одновременно, не повторяли запросы синхронно.
+    Если сервер указал Retry-After, задержка не меньше указанной; если
+    указанная пауза больше max_delay, запрос не повторяется - ошибка сразу
+    возвращается пользователю.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = RETRY_MAX_ATTEMPTS,
+        base_delay: float = RETRY_BASE_DELAY,
+        max_delay: float = RETRY_MAX_DELAY,
+    ):
+        """
+        Args:
+            max_attempts (int): Всего попыток (1 - без повторов)
+            base_delay (float): Базовая задержка в секундах
+            max_delay (float): Максимальная задержка в секундах
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def get_delay(self, attempt: int, error: APIError) -> float | None:
+        """
+        Задержка перед следующей попыткой.
+
+        Args:
+            attempt (int): Номер завершившейся неудачей попытки (с нуля)
+            error (APIError): Ошибка этой попытки
+
+        Returns:
+            float | None: Задержка в секундах или None, если повторять не нужно
+        """
+        if not error.retryable or attempt + 1 >= self.max_attempts:
+            return None
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+        if error.retry_after is not None:
+            if error.retry_after > self.max_delay:
+                return None
+            delay = max(delay, error.retry_after)
+        return delay
+
+
+class CircuitBreaker:
+    """
+    Автоматический выключатель запросов к одной модели.
+
+    Состояния:
+    - closed: запросы выполняются, временные ошибки подряд считаются
+    - open: после failure_threshold ошибок подряд запросы не выполняются
+      reset_timeout секунд (или дольше, если сервер указал Retry-After) -
+      пользователь сразу получает ошибку вместо ожидания повторов
+    - half_open: по истечении паузы пропускается один пробный запрос;
+      успех замыкает выключатель, ошибка снова размыкает его (если
+      пробный запрос не завершился за reset_timeout, например, был
+      отменен, пропускается следующий)
+
+    Ошибки запроса (неверная модель, ключ, баланс) не говорят о
+    недоступности модели и не учитываются.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+        clock=time.monotonic,
+    ):
+        """
+        Args:
+            failure_threshold (int): Временных ошибок подряд до размыкания
+            reset_timeout (float): Пауза до пробного запроса в секундах
+            clock (callable): Источник монотонного времени в секундах
+                (подменяется в тестах)
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0  # Временных ошибок подряд
+        self.opened_until = 0.0  # Время окончания паузы (по clock)
+        self._trial_started = None  # Начало пробного запроса в состоянии half_open
+        self._lock = threading.Lock()
+
+    def retry_in(self) -> float:
+        """
+        Оставшееся время паузы разомкнутого выключателя (секунды).
+        """
+        return max(0.0, self.opened_until - self.clock())
+
+    def allow(self) -> bool:
+        """
+        Проверка, можно ли выполнить запрос.
+
+        Returns:
+            bool: True, если запрос разрешен (в состоянии half_open -
+                 только один пробный запрос)
+        """
+        now = self.clock()
+        with self._lock:
+            if self.state == self.OPEN and now >= self.opened_until:
+                self.state = self.HALF_OPEN
+                self._trial_started = None
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and (
+                self._trial_started is None
+                or now - self._trial_started >= self.reset_timeout
+            ):
+                self._trial_started = now
+                return True
+            return False
+
+    def record_success(self):
+        """
+        Учет успешного запроса (выключатель замыкается).
+        """
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_started = None
+
+    def record_failure(self, error: APIError):
+        """
+        Учет неудачного запроса.
+
+        Args:
+            error (APIError): Ошибка запроса
+        """
+        with self._lock:
+            if not error.retryable:
+                # Модель ответила: ошибка в запросе, а не в доступности
+                if self.state == self.HALF_OPEN:
+                    self.state = self.CLOSED
+                self.failures = 0
+                self._trial_started = None
+                return
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                pause = max(self.reset_timeout, error.retry_after or 0.0)
+                self.state = self.OPEN
+                self.opened_until = self.clock() + pause
+                self._trial_started = None
+
+    def open_error(self) -> APIError:
+        """
+        Ошибка для запроса, отклоненного выключателем.
+
+        В состоянии half_open запрос отклоняется, пока выполняется пробный
+        запрос: пауза до ответа неизвестна, поэтому сообщается отдельным
+        текстом. Пауза не бывает меньше BREAKER_MIN_RETRY_IN ("повторите
+        через 0 с" не имеет смысла).
+        """
+        with self._lock:
+            trial_running = (
+                self.state == self.HALF_OPEN and self._trial_started is not None
+            )
+        retry_in = max(BREAKER_MIN_RETRY_IN, self.retry_in())
+        if trial_running:
+            message = "Модель проверяется пробным запросом, повторите позже"
+        else:
+            message = f"Модель временно недоступна, повторите через {retry_in:.0f} с"
+        return APIError(ERROR_CIRCUIT_OPEN, message, retry_after=retry_in)
+
+
+# Выключатели процесса по моделям: общие для синхронного и асинхронного клиентов
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(model: str) -> CircuitBreaker:
+    """
+    Общий автоматический выключатель модели (создается при первом обращении).
+
+    Args:
+        model (str): Идентификатор модели
+
+    Returns:
+        CircuitBreaker: Выключатель модели
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(model)
+        if breaker is None:
+            breaker = _breakers[model] = CircuitBreaker()
+        return breaker
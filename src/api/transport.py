@@ -0,0 +1,120 @@
+import asyncio  # Библиотека для асинхронного программирования
+import atexit  # Закрытие сессий при завершении процесса
+import threading  # Библиотека для синхронизации доступа к общим сессиям
+import httpx  # Асинхронный HTTP-клиент
+import requests  # Библиотека для выполнения HTTP-запросов к API
+from requests.adapters import HTTPAdapter  # Адаптер с пулом соединений
+
+# Размер пула соединений по умолчанию (на один хост)
+DEFAULT_POOL_SIZE = 10
+
+# Размер пула асинхронного клиента: соединения не занимают потоки,
+# поэтому одновременно могут выполняться сотни запросов
+DEFAULT_ASYNC_POOL_SIZE = 200
+
+# Таймауты по умолчанию для разных типов запросов: (подключение, чтение) в секундах
+DEFAULT_TIMEOUTS = {
+    "models": (5, 30),  # Загрузка списка моделей
+    "chat": (5, 120),  # Обычный (не потоковый) ответ модели
+    "stream": (5, 60),  # Максимальная пауза между фрагментами потока
+    "balance": (5, 15),  # Запрос баланса
+}
+
+# Общие сессии процесса, по одной на размер пула
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+# Общие асинхронные клиенты, по одному на (цикл событий, размер пула).
+# Записи закрытых циклов удаляются при следующем вызове get_async_client
+_async_clients = {}
+
+
+def get_session(pool_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
+    """
+    Получение общей HTTP-сессии с пулом keep-alive соединений.
+
+    Сессия создается один раз на процесс (для каждого размера пула) и
+    переиспользуется всеми клиентами, поэтому TCP- и TLS-рукопожатие
+    выполняется только при первом обращении к хосту.
+
+    Args:
+        pool_size (int): Максимальное количество соединений в пуле
+
+    Returns:
+        requests.Session: Настроенная сессия
+    """
+    with _sessions_lock:
+        session = _sessions.get(pool_size)
+        if session is None:
+            session = requests.Session()
+
+            # Адаптер с пулом соединений; повторы запросов здесь не выполняются
+            adapter = HTTPAdapter(
+                pool_connections=pool_size,  # Количество пулов (по хостам)
+                pool_maxsize=pool_size,  # Соединений в одном пуле
+                max_retries=0,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+
+            # Явное удержание соединения открытым между запросами
+            session.headers["Connection"] = "keep-alive"
+
+            _sessions[pool_size] = session
+        return session
+
+
+def close_sessions():
+    """
+    Закрытие всех общих сессий и их пулов соединений.
+    """
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+atexit.register(close_sessions)
+
+
+def get_async_client(pool_size: int = DEFAULT_ASYNC_POOL_SIZE) -> httpx.AsyncClient:
+    """
+    Получение общего асинхронного HTTP-клиента с пулом keep-alive соединений.
+
+    Клиент привязан к циклу событий, поэтому создается один раз на каждый
+    работающий цикл (и размер пула). Вызывается только из корутины.
+
+    Args:
+        pool_size (int): Максимальное количество одновременных соединений
+
+    Returns:
+        httpx.AsyncClient: Настроенный клиент
+    """
+    loop = asyncio.get_running_loop()
+    key = (loop, pool_size)
+
+    # Клиенты завершившихся циклов событий больше не могут быть использованы
+    # или закрыты: удаление, чтобы они не удерживали цикл и пул соединений
+    for stale in [k for k in _async_clients if k[0].is_closed()]:
+        del _async_clients[stale]
+
+    client = _async_clients.get(key)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=pool_size,  # Всего соединений
+                max_keepalive_connections=pool_size,  # Удерживаемых открытыми
+            ),
+        )
+        _async_clients[key] = client
+    return client
+
+
+async def close_async_clients():
+    """
+    Закрытие асинхронных клиентов текущего цикла событий
+    (вызывается при отключении окна приложения, см. main.py).
+    """
+    loop = asyncio.get_running_loop()
+    for key in [key for key in _async_clients if key[0] is loop]:
+        await _async_clients.pop(key).aclose()
@@ -1,11 +1,14 @@
-from .starting_page import StartingPage
-from .registration_page import RegistrationPage
-from .entrance_page import EntrancePage
-from .interface_page import InterfacePage
+from src._lazy import make_lazy_getattr  # Ленивая загрузка экспортов пакета
 
-__all__ = [
-    "StartingPage",
-    "RegistrationPage",
-    "EntrancePage",
-    "InterfacePage",
-]
+# Экспортируемое имя -> модуль пакета
+_EXPORTS = {
+    "StartingPage": ".starting_page",
+    "RegistrationPage": ".registration_page",
+    "EntrancePage": ".entrance_page",
+    "InterfacePage": ".interface_page",
+}
+
+# Имена загружаются из модулей пакета при первом обращении (PEP 562)
+__getattr__ = make_lazy_getattr(__name__, _EXPORTS)
+
+__all__ = list(_EXPORTS)
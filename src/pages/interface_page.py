@@ -1,28 +1,41 @@
+import asyncio  # Периодическое обновление панели мониторинга
 import os  # Библиотека для работы с операционной системой
 import time  # Библиотека для работы с временными метками
 import json  # Библиотека для работы с JSON-данными
-import asyncio  # Библиотека для асинхронного программирования
 from datetime import datetime  # Класс для работы с датой и временем
 import flet as ft
 from flet_route import Params, Basket
-from src.api.openrouter import (
-    OpenRouterClient,
-)  # Клиент для взаимодействия с AI через API OpenRouter
 from src.ui.app_style import AppStyles  # Модуль с настройками стилей интерфейса
 from src.ui.components import (
-    MessageBubble,
+    ChatView,
     ModelSelector,
 )  # Компоненты пользовательского интерфейса
-from src.utils.app_cache import AppCache  # Модуль для кэширования истории чата
-from src.utils.app_logger import AppLogger  # Модуль для логирования работы приложения
-from src.utils.app_analytics import (
-    AppAnalytics,
-)  # Модуль для сбора и анализа статистики использования
-#from src.utils.app_monitor import AppMonitor  # Модуль для мониторинга производительности
+from src.ui.updates import UpdateBatcher  # Объединение обновлений интерфейса
+from src.utils.app_logger import (
+    LOG_LEVELS,
+    AppLogger,
+    request_context,
+)  # Уровни логирования и идентификаторы запросов для логов
+from src.utils.app_session import (
+    AppSession,
+)  # Службы приложения, общие для всех переходов на страницу
+
+# Количество сообщений в одной странице истории чата
+HISTORY_PAGE_SIZE = 25
 
 
 class InterfacePage:
 
+    def leave(self):
+        """
+        Уход со страницы чата (вызывается маршрутизатором при смене маршрута).
+
+        Задачи представления (обновление панели мониторинга) завершаются,
+        обновление баланса останавливается до следующего открытия чата.
+        """
+        if AppSession.current is not None:
+            AppSession.current.end_view()
+
     def view(
         self,
         page: ft.Page,  # Объект текущей страницы
@@ -30,16 +43,19 @@ class InterfacePage:
         basket: Basket,  # Корзина для хранения данных между страницами
     ) -> ft.View:
 
-        # Инициализация основных компонентов
+        # Службы пользователя создаются при первом входе и переживают переходы:
+        # повторное открытие чата не повторяет сетевые запросы и чтение базы
         api_key = basket.get("key") # Получение ключа из корзины
         basket.delete("key") # Удаление ключа из корзины
-        api_client = OpenRouterClient(api_key)  # Создание клиента для работы с AI API
-        cache = AppCache()  # Инициализация системы кэширования
-        logger = AppLogger()  # Инициализация системы логирования
-        analytics = AppAnalytics(
-            cache
-        )  # Инициализация системы аналитики с передачей кэша
-        #monitor = AppMonitor()  # Инициализация системы мониторинга
+        session = AppSession.get(api_key)  # Без ключа - сессия текущего пользователя
+        cache = session.cache  # Система кэширования
+        api_client = session.api_client  # Клиент для работы с AI API
+        async_client = session.async_client  # Клиент для асинхронных обработчиков
+        logger = session.logger  # Система логирования
+        context = session.context  # Окно истории диалога для многоходового чата
+        analytics = session.analytics  # Система аналитики
+        monitor = session.monitor  # Система мониторинга
+        updates = UpdateBatcher(page)  # Объединение обновлений интерфейса со счетчиками
 
         models = api_client.available_models # Получение списока доступных моделей
 
@@ -60,99 +76,199 @@ class InterfacePage:
                 background.height = basket.get("height")
                 page_body.width = basket.get("width") * 0.8
                 page_body.height = basket.get("height") * 0.8
-                page.update()
+                # События изменения размера идут сериями: одно обновление за итерацию
+                updates.schedule(background, page_body)
 
             page.on_resized = on_resize
         
         # --- Функции ---
-        def update_balance():
-            try:
-                balance = api_client.get_balance()  # Запрос баланса через API
-                balance_text.value = (
-                    f"Баланс: {balance}"  # Обновление текста с балансом
-                )
-                balance_text.color = (
-                    ft.Colors.GREEN_400
-                )  # Установка зеленого цвета для успешного получения
-            except Exception as e:
-                # Обработка ошибки получения баланса
-                balance_text.value = "Баланс: н/д"  # Установка текста ошибки
-                balance_text.color = (
-                    ft.Colors.RED_400
-                )  # Установка красного цвета для ошибки
-                logger.error(f"Ошибка обновления баланса: {e}")
+        def show_balance(balance):
+            """
+            Отображение баланса после очередного фонового запроса
+            (вызывается AppBalance в цикле событий).
 
-        def load_chat_history():
+            Args:
+                balance (AppBalance): Состояние обновления баланса
             """
-            Загрузка истории чата из кэша и отображение её в интерфейсе.
-            Сообщения добавляются в обратном порядке для правильной хронологии.
+            if balance.value is None and balance.error is None:
+                return  # Баланс еще не запрошен: остается "Загрузка..."
+            if balance.value is None:
+                # Ошибка получения баланса, известного значения нет
+                balance_text.value = "Баланс: н/д"  # Установка текста ошибки
+                balance_text.color = ft.Colors.RED_400
+            elif balance.is_stale:
+                # Последний запрос не удался: показ последнего известного значения
+                balance_text.value = f"Баланс: {balance.value} (не обновлен)"
+                balance_text.color = ft.Colors.ORANGE_400
+            else:
+                balance_text.value = f"Баланс: {balance.value}"
+                balance_text.color = ft.Colors.GREEN_400
+            if balance_text.page is not None:
+                updates.schedule(balance_text)
+
+        # Состояние постраничной загрузки истории
+        oldest_message_id = None  # ID самого старого загруженного сообщения
+        history_exhausted = False  # Более старых сообщений нет
+
+        def load_older_messages() -> list:
+            """
+            Загрузка очередной (более старой) страницы истории чата из кэша.
+            Вызывается ChatView при прокрутке к началу загруженных сообщений.
+
+            Returns:
+                list: Сообщения [(текст, is_user), ...] в хронологическом
+                     порядке или пустой список, если старых сообщений нет
             """
+            nonlocal oldest_message_id, history_exhausted
+            if history_exhausted:
+                return []
             try:
-                history = cache.get_chat_history()  # Получение истории из кэша
+                history = cache.get_chat_history(  # Получение страницы из кэша
+                    page_size=HISTORY_PAGE_SIZE, before_id=oldest_message_id
+                )
+                if len(history) < HISTORY_PAGE_SIZE:
+                    history_exhausted = True
+                if not history:
+                    return []
+                oldest_message_id = history[-1][0]
+
+                messages = []
                 for msg in reversed(history):  # Перебор сообщений в обратном порядке
                     # Распаковка данных сообщения в отдельные переменные
                     _, model, user_message, ai_response, timestamp, tokens = msg
-                    # Добавление пары сообщений (пользователь + AI) в интерфейс
-                    chat_history.controls.extend(
-                        [
-                            MessageBubble(  # Создание пузырька сообщения пользователя
-                                message=user_message, is_user=True
-                            ),
-                            MessageBubble(  # Создание пузырька ответа AI
-                                message=ai_response, is_user=False
-                            ),
-                        ]
-                    )
+                    # Пара сообщений (пользователь + AI) хранится как данные,
+                    # пузырьки создаются только для видимого окна
+                    messages.append((user_message, True))
+                    messages.append((ai_response, False))
+                return messages
             except Exception as e:
                 # Логирование ошибки при загрузке истории
                 logger.error(f"Ошибка загрузки истории чата: {e}")
+                return []
 
         async def send_message_click(e):
             """
             Асинхронная функция отправки сообщения.
+
+            Пока ответ поступает, поле ввода и кнопки отправки и очистки
+            отключены: история чата дописывает по частям только последнее
+            сообщение, и второй одновременный ответ смешался бы с первым.
             """
-            if not message_input.value:
+            if not message_input.value or message_input.disabled:
                 return
 
+            # Все записи лога отправки (страница, клиент, повторы запроса)
+            # получают один идентификатор запроса
+            with request_context() as request_id:
+                await send_message(request_id)
+
+        async def send_message(request_id: str):
+            """
+            Отправка сообщения и потоковое получение ответа.
+
+            Args:
+                request_id (str): Идентификатор запроса для записей лога
+            """
+            # Блокировка повторной отправки до завершения ответа
+            set_sending(True)
             try:
                 # Визуальная индикация процесса
                 message_input.border_color = ft.Colors.BLUE_400
-                page.update()
 
                 # Сохранение данных сообщения
                 start_time = time.time()
                 user_message = message_input.value
                 message_input.value = ""
-                page.update()
 
                 # Добавление сообщения пользователя
-                chat_history.controls.append(
-                    MessageBubble(message=user_message, is_user=True)
-                )
+                chat_history.add_message(user_message, is_user=True)
 
                 # Индикатор загрузки
-                loading = ft.ProgressRing()
-                chat_history.controls.append(loading)
-                page.update()
-
-                # Асинхронная отправка запроса
-                loop = asyncio.get_event_loop()
-                response = await loop.run_in_executor(
-                    None,
-                    lambda: api_client.send_message(user_message, model_dropdown.value),
-                )
-
-                # Удаление индикатора загрузки
-                chat_history.controls.remove(loading)
-
-                # Обработка ответа
-                if "error" in response:
-                    response_text = f"Ошибка: {response['error']}"
+                chat_history.show_progress()
+
+                # Поле ввода и история чата обновляются одним вызовом
+                updates.schedule(message_input, chat_history)
+
+                # Пузырек ответа, который растет по мере поступления токенов
+                ai_bubble = None
+                response_text = ""
+                tokens_used = 0
+                error_text = None
+                error_type = None
+                first_token_time = None
+
+                # Потоковое получение ответа асинхронным клиентом
+                # прямо в цикле событий, без пула потоков
+                async for chunk in async_client.stream_message(
+                    user_message,
+                    model_dropdown.value,
+                    history=context.get_history(user_message),
+                    request_id=request_id,
+                ):
+                    if "error" in chunk:
+                        # Ошибка после повторов клиента (или выключатель модели)
+                        error_text = chunk["error"]
+                        error_type = chunk.get("error_type")
+                        # Текст ошибки выключателя уже содержит паузу
+                        if chunk.get("retry_after") and error_type == "rate_limit":
+                            error_text += (
+                                f" (повторите через {max(1, chunk['retry_after']):.0f} с)"
+                            )
+                        break
+
+                    if chunk.get("usage"):
+                        tokens_used = chunk["usage"].get("total_tokens", 0)
+
+                    choices = chunk.get("choices") or [{}]
+                    delta = choices[0].get("delta", {}).get("content")
+                    if not delta:
+                        continue
+
+                    if first_token_time is None:
+                        # Первый токен: замена индикатора загрузки пузырьком ответа
+                        first_token_time = time.time() - start_time
+                        logger.info(
+                            f"Время до первого токена: {first_token_time:.3f} с",
+                            event="first_token",
+                            request_id=request_id,
+                            model=model_dropdown.value,
+                            latency_ms=round(first_token_time * 1000, 1),
+                        )
+                        chat_history.hide_progress()
+                        ai_bubble = chat_history.add_message(
+                            "", is_user=False, streaming=True
+                        )
+                        updates.schedule(chat_history)
+
+                    # Фрагменты, пришедшие за одну итерацию цикла событий,
+                    # отправляются клиенту одним обновлением текста
+                    response_text += delta
+                    ai_bubble.append_text(delta, update=False)
+                    updates.schedule(ai_bubble.message_text)
+
+                # Удаление индикатора загрузки, если ответ так и не начался
+                if ai_bubble is None:
+                    chat_history.hide_progress()
+                    chat_history.add_message("", is_user=False)
+
+                # Обработка ошибки
+                if error_text is not None:
+                    logger.error(
+                        f"Ошибка API: {error_text}",
+                        request_id=request_id,
+                        model=model_dropdown.value,
+                        status="error",
+                        error_type=error_type,
+                    )
+                    response_text += f"\nОшибка: {error_text}"
+                    response_text = response_text.strip()
                     tokens_used = 0
-                    logger.error(f"Ошибка API: {response['error']}")
                 else:
-                    response_text = response["choices"][0]["message"]["content"]
-                    tokens_used = response.get("usage", {}).get("total_tokens", 0)
+                    # Успешный ответ становится частью контекста диалога
+                    context.add_turn(user_message, response_text)
+
+                # Итоговый текст ответа сохраняется в данных истории чата
+                chat_history.update_last_message(response_text)
 
                 # Сохранение в кэш
                 cache.save_message(
@@ -162,11 +278,6 @@ class InterfacePage:
                     tokens_used=tokens_used,
                 )
 
-                # Добавление ответа в чат
-                chat_history.controls.append(
-                    MessageBubble(message=response_text, is_user=False)
-                )
-
                 # Обновление аналитики
                 response_time = time.time() - start_time
                 analytics.track_message(
@@ -176,13 +287,19 @@ class InterfacePage:
                     tokens_used=tokens_used,
                 )
 
+                # Итоговое состояние ответа (текст ошибки или пустой ответ)
+                updates.schedule(chat_history)
+
+                # Запрос на обновление баланса после ответа (выполняется в фоне)
+                session.balance.refresh()
+
                 # Логирование метрик
-                #monitor.log_metrics(logger)
-                page.update()
+                monitor.log_metrics(logger)
 
             except Exception as e:
                 logger.error(f"Ошибка отправки сообщения: {e}")
                 message_input.border_color = ft.Colors.RED_500
+                updates.schedule(message_input)
 
                 # Показ уведомления об ошибке
                 snack = ft.SnackBar(
@@ -192,10 +309,20 @@ class InterfacePage:
                     bgcolor=ft.Colors.GREY_900,
                     duration=5000,
                 )
-                page.overlay.append(snack)
-                snack.open = True
-                page.update()
-                
+                page.open(snack)  # Показ в слое поверх страницы (обновляется только он)
+
+            finally:
+                set_sending(False)  # Ответ получен: ввод снова доступен
+
+        def set_sending(sending: bool):
+            """
+            Отключение (или включение) ввода на время получения ответа.
+            """
+            message_input.disabled = sending
+            send_button.disabled = sending
+            clear_button.disabled = sending
+            updates.schedule(message_input, send_button, clear_button)
+
         def show_error_snack(page, message: str):
             """Показ уведомления об ошибке"""
             snack = ft.SnackBar(  # Создание уведомления
@@ -203,13 +330,87 @@ class InterfacePage:
                 bgcolor=ft.Colors.GREY_900,
                 duration=5000,
             )
-            page.overlay.append(snack)  # Добавление уведомления
-            snack.open = True  # Открытие уведомления
-            page.update()  # Обновление страницы
+            page.open(snack)  # Показ в слое поверх страницы (обновляется только он)
 
         async def show_analytics(e):
             """Показ статистики использования"""
             stats = analytics.get_statistics()  # Получение статистики
+            latency = stats["latency"]  # Квантили и гистограмма времени ответа
+
+            # Квантили времени ответа по моделям
+            latency_rows = [
+                ft.Text(
+                    f"{model or 'н/д'}: p50 {values['p50']:.2f} с · "
+                    f"p90 {values['p90']:.2f} с · p99 {values['p99']:.2f} с "
+                    f"({values['count']})",
+                    size=12,
+                )
+                for model, values in sorted(latency["models"].items())
+            ]
+
+            # Гистограмма времени ответа по всем моделям
+            max_count = max((count for _, count in latency["histogram"]), default=0)
+            histogram_rows = [
+                ft.Row(
+                    [
+                        ft.Text(label, width=80, size=12),
+                        ft.Container(
+                            width=200 * count / max_count if max_count else 0,
+                            height=12,
+                            bgcolor=ft.Colors.GREEN_400,
+                        ),
+                        ft.Text(str(count), size=12),
+                    ]
+                )
+                for label, count in latency["histogram"]
+            ]
+
+            overall = latency["overall"]
+
+            # Статистика за выбранное окно времени (агрегируется в SQLite)
+            window_column = ft.Column(tight=True)
+
+            def fill_window(window: str):
+                window_stats = analytics.get_window_statistics(window)
+                window_column.controls = [
+                    ft.Text(
+                        f"Сообщений: {window_stats['total_messages']} · "
+                        f"токенов: {window_stats['total_tokens']}"
+                    ),
+                    ft.Text(
+                        f"В минуту: {window_stats['messages_per_minute']:.2f} сообщ. · "
+                        f"{window_stats['tokens_per_minute']:.0f} токенов"
+                    ),
+                    ft.Text(
+                        f"Среднее время ответа: {window_stats['avg_response_time']:.2f} с"
+                    ),
+                    *[
+                        ft.Text(
+                            f"{model or 'н/д'}: {values['count']} сообщ. · "
+                            f"{values['tokens']} токенов · "
+                            f"{values['avg_response_time']:.2f} с",
+                            size=12,
+                        )
+                        for model, values in window_stats["models"].items()
+                    ],
+                ]
+
+            def change_window(e):
+                fill_window(e.control.value)
+                window_column.update()  # Обновление только блока окна
+
+            fill_window("day")
+            window_selector = ft.Dropdown(
+                value="day",
+                options=[
+                    ft.dropdown.Option(key="hour", text="Последний час"),
+                    ft.dropdown.Option(key="day", text="Последний день"),
+                    ft.dropdown.Option(key="week", text="Последняя неделя"),
+                    ft.dropdown.Option(key="all", text="Все время"),
+                ],
+                on_change=change_window,
+                width=250,
+            )
 
             # Создание диалога статистики
             dialog = ft.AlertDialog(
@@ -222,27 +423,91 @@ class InterfacePage:
                             f"Среднее токенов/сообщение: {stats['tokens_per_message']:.2f}"
                         ),
                         ft.Text(
-                            f"Сообщений в минуту: {stats['messages_per_minute']:.2f}"
+                            f"Сообщений в минуту (сессия): {stats['messages_per_minute']:.2f}"
                         ),
-                    ]
+                        ft.Divider(),
+                        window_selector,
+                        window_column,
+                        ft.Divider(),
+                        ft.Text(
+                            f"Время ответа: p50 {overall['p50']:.2f} с · "
+                            f"p90 {overall['p90']:.2f} с · p99 {overall['p99']:.2f} с"
+                        ),
+                        *latency_rows,
+                        ft.Divider(),
+                        ft.Text("Распределение времени ответа:"),
+                        *histogram_rows,
+                    ],
+                    scroll=ft.ScrollMode.AUTO,
+                    tight=True,
                 ),
                 actions=[
                     ft.TextButton("Закрыть", on_click=lambda e: close_dialog(dialog)),
                 ],
             )
 
-            page.overlay.append(dialog)  # Добавление диалога
-            dialog.open = True  # Открытие диалога
-            page.update()  # Обновление страницы
+            page.open(dialog)  # Показ в слое поверх страницы (обновляется только он)
+
+        async def search_history(e):
+            """Поиск по истории чата и показ найденных сообщений"""
+            query = history_search.value or ""
+            if not query.strip():
+                return
+
+            try:
+                results = cache.search_history(query, limit=50)  # Полнотекстовый поиск
+            except Exception as e:
+                logger.error(f"Ошибка поиска по истории: {e}")
+                show_error_snack(page, f"Ошибка поиска: {str(e)}")
+                return
+
+            # Список найденных сообщений с фрагментами текста
+            if results:
+                found = ft.ListView(
+                    controls=[
+                        ft.Column(
+                            [
+                                ft.Text(
+                                    f"{result['timestamp']} · {result['model']}",
+                                    size=12,
+                                    color=ft.Colors.GREY_400,
+                                ),
+                                ft.Text(result["snippet"], selectable=True),
+                                ft.Divider(),
+                            ],
+                            tight=True,
+                        )
+                        for result in results
+                    ],
+                    width=500,
+                    height=400,
+                )
+            else:
+                found = ft.Text("Ничего не найдено")
+
+            # Создание диалога с результатами поиска
+            dialog = ft.AlertDialog(
+                title=ft.Text(f"Поиск: {query}"),
+                content=found,
+                actions=[
+                    ft.TextButton("Закрыть", on_click=lambda e: close_dialog(dialog)),
+                ],
+            )
+
+            page.open(dialog)  # Показ в слое поверх страницы (обновляется только он)
 
         async def clear_history(e):
             """
             Очистка истории чата.
             """
+            nonlocal oldest_message_id, history_exhausted
             try:
                 cache.clear_history()  # Очистка кэша
                 analytics.clear_data()  # Очистка аналитики
-                chat_history.controls.clear()  # Очистка истории чата
+                context.clear()  # Очистка контекста диалога
+                chat_history.clear()  # Очистка истории чата
+                oldest_message_id, history_exhausted = None, True
+                updates.schedule(chat_history)
 
             except Exception as e:
                 logger.error(f"Ошибка очистки истории: {e}")
@@ -270,14 +535,11 @@ class InterfacePage:
                 actions_alignment=ft.MainAxisAlignment.END,
             )
 
-            page.overlay.append(dialog)
-            dialog.open = True
-            page.update()
+            page.open(dialog)  # Показ в слое поверх страницы (обновляется только он)
 
         def close_dialog(dialog):
             """Закрытие диалогового окна"""
-            dialog.open = False  # Закрытие диалога
-            page.update()  # Обновление страницы
+            page.close(dialog)  # Закрытие диалога (обновляется только диалог)
 
             if dialog in page.overlay:  # Удаление из overlay
                 page.overlay.remove(dialog)
@@ -334,18 +596,64 @@ class InterfacePage:
                     ],
                 )
 
-                page.overlay.append(dialog)
-                dialog.open = True
-                page.update()
+                page.open(dialog)  # Показ в слое поверх страницы (обновляется только он)
 
             except Exception as e:
                 logger.error(f"Ошибка сохранения: {e}")
                 show_error_snack(page, f"Ошибка сохранения: {str(e)}")
 
+        def format_metrics(metrics: dict) -> str:
+            """Строка метрик производительности для панели мониторинга"""
+            open_files = metrics["open_files"]
+            return (
+                f"CPU: {metrics['cpu_percent']:.1f}% · "
+                f"RAM: {metrics['memory_mb']:.0f} МБ · "
+                f"Потоки: {metrics['threads']} · "
+                f"Файлы: {open_files if open_files is not None else 'н/д'} · "
+                f"Задержка UI: {metrics['loop_lag_ms']:.0f} мс"
+            )
+
+        def format_update_stats() -> str:
+            """Строка счетчиков обновлений интерфейса для панели мониторинга"""
+            stats = updates.get_stats()
+            return (
+                f"Обновления: {stats['flushes']} (запрошено {stats['requested']}) · "
+                f"Элементов: {stats['controls_updated']}"
+            )
+
+        def toggle_monitor_panel(e):
+            """Показ или скрытие панели мониторинга"""
+            monitor_panel.visible = not monitor_panel.visible
+            if monitor_panel.visible:
+                monitor_text.value = format_metrics(monitor.get_metrics())
+                update_stats_text.value = format_update_stats()
+            monitor_panel.update()
+
+        def change_log_level(e):
+            """Изменение уровня логирования без перезапуска приложения"""
+            AppLogger.set_level(e.control.value)
+            logger.info(
+                f"Уровень логирования изменен на {e.control.value}",
+                event="log_level",
+            )
+
+        async def refresh_monitor_panel():
+            """Периодическое обновление открытой панели мониторинга"""
+            while session.is_current_view(view_generation):
+                await asyncio.sleep(monitor.interval)
+                if not session.is_current_view(view_generation):
+                    break  # Переход на другую страницу во время ожидания
+                if monitor_panel.visible and monitor_panel.page:
+                    monitor_text.value = format_metrics(monitor.get_metrics())
+                    update_stats_text.value = format_update_stats()
+                    updates.schedule(monitor_text, update_stats_text)
+
         # --- Внешний вид ---
         
         # Инициализация выпадающего списка для выбора модели AI
-        model_dropdown = ModelSelector(models)
+        model_dropdown = ModelSelector(
+            models, search_index=session.get_search_index(models)
+        )  # Индекс поиска моделей берется из сессии
         model_dropdown.value = models[0] if models else None
         
         # Создание компонента для отображения баланса API
@@ -355,7 +663,29 @@ class InterfacePage:
             color=ft.Colors.GREEN_400,
             weight=ft.FontWeight.BOLD,
         )
-        update_balance()  # Первичное обновление баланса
+        # Баланс запрашивается в фоне (представление не ждет запроса);
+        # при повторном входе сразу показывается последнее известное значение
+        show_balance(session.balance)
+        session.balance.on_change = show_balance
+
+        # Панель мониторинга производительности (скрыта по умолчанию)
+        monitor_text = ft.Text(size=12, color=ft.Colors.GREY_400)
+        update_stats_text = ft.Text(size=12, color=ft.Colors.GREY_400)
+        log_level_selector = ft.Dropdown(
+            label="Уровень лога",
+            value=AppLogger.get_level(),
+            options=[ft.dropdown.Option(key=level, text=level) for level in LOG_LEVELS],
+            on_change=change_log_level,
+            dense=True,
+            width=180,
+        )  # Уровень логирования во время работы
+        monitor_panel = ft.Container(
+            content=ft.Column(
+                [monitor_text, update_stats_text, log_level_selector], tight=True
+            ),
+            visible=False,
+            **AppStyles.BALANCE_CONTAINER,  # Оформление как у блока баланса
+        )
 
         # Создание компонентов интерфейса
         message_input = ft.TextField(
@@ -363,11 +693,21 @@ class InterfacePage:
             on_submit=send_message_click,
         )  # Поле ввода
         
-        # История чата
-        chat_history = ft.ListView(**AppStyles.chat_history)
+        # Поле поиска по истории чата
+        history_search = ft.TextField(
+            **AppStyles.history_search_field,
+            on_submit=search_history,
+        )
+
+        # История чата: отображается только окно сообщений,
+        # старые страницы подгружаются при прокрутке к началу
+        chat_history = ChatView(
+            load_older=load_older_messages,
+            **AppStyles.chat_history,
+        )
 
-        # Загрузка существующей истории
-        load_chat_history()
+        # Загрузка последней страницы истории
+        chat_history.set_messages(load_older_messages())
 
         # Создание кнопок управления
         save_button = ft.ElevatedButton(
@@ -391,6 +731,11 @@ class InterfacePage:
             **AppStyles.ANALYTICS_BUTTON,  # Применение стилей
         )
 
+        monitor_button = ft.ElevatedButton(
+            on_click=toggle_monitor_panel,  # Показ панели мониторинга
+            **AppStyles.MONITOR_BUTTON,  # Применение стилей
+        )
+
         # Создание layout компонентов
 
         # Создание ряда кнопок управления
@@ -398,6 +743,7 @@ class InterfacePage:
             controls=[  # Размещение кнопок в ряд
                 save_button,
                 analytics_button,
+                monitor_button,
                 clear_button,
             ],
             **AppStyles.CONTROL_BUTTONS_ROW,  # Применение стилей к ряду
@@ -428,6 +774,7 @@ class InterfacePage:
                 model_dropdown.search_field,
                 model_dropdown,
                 balance_container,
+                monitor_panel,
             ],
             **AppStyles.MODEL_SELECTION_COLUMN,  # Применение стилей к колонке
         )
@@ -436,6 +783,7 @@ class InterfacePage:
         main_column = ft.Column(
             controls=[  # Размещение основных элементов
                 model_selection,
+                history_search,
                 chat_history,
                 controls_column,
             ],
@@ -468,8 +816,11 @@ class InterfacePage:
         )
 
         
-        # Запуск монитора
-        #monitor.get_metrics()
+        # Запуск монитора: метрики процесса в фоновом потоке и задержка
+        # цикла событий запускаются сессией один раз, живая панель - задачей
+        # этого представления (завершается при замене представления)
+        view_generation = session.begin_view(page)
+        page.run_task(refresh_monitor_panel)
 
         # Логирование запуска
         logger.info("Приложение запущено")
@@ -1,8 +1,16 @@
-from .app_style import AppStyles
-from .components import ModelSelector, MessageBubble
+from src._lazy import make_lazy_getattr  # Ленивая загрузка экспортов пакета
 
-__all__ = [
-    "AppStyles",
-    "ModelSelector",
-    "MessageBubble",
-]
+# Экспортируемое имя -> модуль пакета
+_EXPORTS = {
+    "AppStyles": ".app_style",
+    "ModelSelector": ".components",
+    "MessageBubble": ".components",
+    "ChatView": ".components",
+    "ModelSearchIndex": ".model_search",
+    "UpdateBatcher": ".updates",
+}
+
+# Имена загружаются из модулей пакета при первом обращении (PEP 562)
+__getattr__ = make_lazy_getattr(__name__, _EXPORTS)
+
+__all__ = list(_EXPORTS)
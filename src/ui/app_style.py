@@ -180,6 +180,19 @@ class AppStyles:
         "width": 130,  # Ширина кнопки
     }
     
+    # Настройки кнопки панели мониторинга
+    MONITOR_BUTTON = {
+        "text": "Монитор",  # Текст на кнопке
+        "icon": ft.Icons.MONITOR_HEART,  # Иконка мониторинга
+        "style": ft.ButtonStyle(  # Стиль оформления кнопки
+            color=ft.Colors.WHITE,  # Цвет текста
+            bgcolor=ft.Colors.BLUE_GREY_700,  # Серо-синий цвет фона
+            padding=ft.padding.only(top=22, left=5, right=5, bottom=22),  # Внутренние отступы
+        ),
+        "tooltip": "Показать или скрыть метрики производительности",  # Подсказка
+        "width": 130,  # Ширина кнопки
+    }
+
     # Настройки строки с кнопками управления
     CONTROL_BUTTONS_ROW = {
         "spacing": 20,  # Отступ между кнопками
@@ -248,6 +261,21 @@ class AppStyles:
         "text_align": ft.alignment.center, # центровать содержимое
     }
     
+    # Настройки поля поиска по истории чата
+    history_search_field = {
+        "width": 400,  # Ширина поля в пикселях
+        "height": 50,  # Высота поля в пикселях
+        "text_size": 16,  # Размер шрифта текста
+        "color": ft.Colors.WHITE,  # Цвет вводимого текста
+        "bgcolor": ft.Colors.GREY_800,  # Цвет фона поля
+        "border_color": ft.Colors.BLUE_400,  # Цвет границы поля
+        "cursor_color": ft.Colors.WHITE,  # Цвет курсора ввода
+        "content_padding": 10,  # Внутренние отступы текста
+        "border_radius": 8,  # Радиус скругления углов
+        "prefix_icon": ft.Icons.MANAGE_SEARCH,  # Иконка поиска слева от поля
+        "hint_text": "Поиск по истории чата...",  # Текст-подсказка в пустом поле
+    }
+
     # Настройки выпадающего списка выбора модели
     model_dropdown = {
         "width": 400,  # Ширина списка
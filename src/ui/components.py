@@ -1,10 +1,23 @@
+import asyncio  # Отложенная фильтрация при вводе поискового запроса
+
 import flet as ft
 from src.ui.app_style import AppStyles
+from src.ui.model_search import ModelSearchIndex  # Индекс поиска моделей
+
+# Пауза после последнего нажатия клавиши перед фильтрацией (секунды)
+SEARCH_DEBOUNCE = 0.15
 
 
 class ModelSelector(ft.Dropdown):
     
-    def __init__(self, models: list):
+    def __init__(self, models: list, search_index: ModelSearchIndex | None = None):
+        """
+        Args:
+            models (list): Список моделей [{"id": ..., "name": ...}, ...]
+            search_index (ModelSearchIndex | None): Готовый индекс поиска по
+                тому же списку моделей (например, из сессии пользователя);
+                без него индекс строится заново
+        """
         # Инициализация родительского класса Dropdown
         super().__init__()
 
@@ -28,6 +41,12 @@ class ModelSelector(ft.Dropdown):
         # Сохранение полного списка опций для фильтрации
         self.all_options = self.options.copy()
 
+        # Индекс поиска строится один раз на каталог; номера моделей
+        # в индексе совпадают с позициями в all_options
+        self.search_index = search_index or ModelSearchIndex(models)
+        self._filter_task = None  # Отложенная фильтрация по последнему запросу
+        self._applied_query = ""  # Запрос, по которому отфильтрован список
+
         # Установка начального значения (первая модель из списка)
         self.value = models[0]["id"] if models else None
 
@@ -48,29 +67,42 @@ class ModelSelector(ft.Dropdown):
             **AppStyles.text_fields_style,
         )
 
-    def filter_options(self, e):
+    async def filter_options(self, e):
         """
         Фильтрация списка моделей на основе введенного текста поиска.
 
+        Фильтрация откладывается до паузы во вводе (SEARCH_DEBOUNCE):
+        каждое нажатие клавиши отменяет ожидающую фильтрацию, поэтому при
+        быстром наборе список перестраивается и отправляется клиенту один раз.
+
         Args:
             e: Событие изменения текста в поле поиска
         """
-        # Получение текста поиска в нижнем регистре
-        search_text = self.search_field.value.lower() if self.search_field.value else ""
+        if self._filter_task is not None and not self._filter_task.done():
+            self._filter_task.cancel()
+        self._filter_task = asyncio.create_task(
+            self._apply_filter(self.search_field.value or "")
+        )
 
-        # Если поле поиска пустое - показываем все модели
-        if not search_text:
-            self.options = self.all_options
-        else:
-            # Фильтрация моделей по тексту поиска
-            # Ищем совпадения в названии или ID модели
-            self.options = [
-                opt
-                for opt in self.all_options
-                if search_text in opt.text.lower() or search_text in opt.key.lower()
-            ]
-        # Обновление интерфейса для отображения отфильтрованного списка
-        e.page.update()
+    async def _apply_filter(self, query: str):
+        """
+        Применение поискового запроса после паузы во вводе.
+
+        Args:
+            query (str): Текст поиска
+        """
+        await asyncio.sleep(SEARCH_DEBOUNCE)
+        if query == self._applied_query:
+            return
+        self._applied_query = query
+
+        # Поиск по индексу: результаты ранжированы и ограничены по количеству,
+        # при пустом запросе показываются все модели
+        self.options = [
+            self.all_options[number] for number in self.search_index.search(query)
+        ]
+        # Обновление только выпадающего списка (без сравнения всей страницы)
+        self.update()
 
 
 class MessageBubble(ft.Container):
@@ -95,6 +127,30 @@ class MessageBubble(ft.Container):
         # Настройка скругления углов пузырька
         self.border_radius = 10
 
+        # Текст сообщения с настройками отображения
+        self.message_text = ft.Text(
+            value=message,  # Текст сообщения
+            color=ft.Colors.WHITE,  # Белый цвет текста
+            size=16,  # Размер шрифта
+            selectable=True,  # Возможность выделения текста
+            weight=ft.FontWeight.W_400,  # Нормальная толщина шрифта
+        )
+
+        # Создание содержимого пузырька
+        self.content = ft.Column(
+            controls=[self.message_text],
+            tight=True,  # Плотное расположение элементов в колонке
+        )
+
+        # Оформление в зависимости от отправителя
+        self._apply_sender_style(is_user)
+
+    def _apply_sender_style(self, is_user: bool):
+        """
+        Оформление пузырька в зависимости от отправителя.
+        """
+        self.is_user = is_user
+
         # Установка цвета фона в зависимости от отправителя:
         # - Синий для сообщений пользователя
         # - Серый для сообщений AI
@@ -118,17 +174,281 @@ class MessageBubble(ft.Container):
             bottom=5,  # Отступ снизу
         )
 
-        # Создание содержимого пузырька
-        self.content = ft.Column(
-            controls=[
-                # Текст сообщения с настройками отображения
-                ft.Text(
-                    value=message,  # Текст сообщения
-                    color=ft.Colors.WHITE,  # Белый цвет текста
-                    size=16,  # Размер шрифта
-                    selectable=True,  # Возможность выделения текста
-                    weight=ft.FontWeight.W_400,  # Нормальная толщина шрифта
-                )
-            ],
-            tight=True,  # Плотное расположение элементов в колонке
-        )
+    def set_message(self, message: str, is_user: bool):
+        """
+        Повторное использование пузырька для другого сообщения.
+
+        Меняются только текст и оформление, дерево элементов сохраняется.
+
+        Args:
+            message (str): Текст сообщения
+            is_user (bool): Флаг сообщения пользователя
+        """
+        self.message_text.value = message
+        if is_user != self.is_user:
+            self._apply_sender_style(is_user)
+
+    def append_text(self, chunk: str, update: bool = True):
+        """
+        Дописывание фрагмента текста в конец сообщения.
+
+        Используется при потоковом получении ответа: пузырек растет
+        по мере поступления токенов, обновляется только текст сообщения.
+
+        Args:
+            chunk (str): Очередной фрагмент текста
+            update (bool): Немедленно отправить изменение; False - обновление
+                выполняет вызывающий код (например, через UpdateBatcher)
+        """
+        self.message_text.value = (self.message_text.value or "") + chunk
+        if update:
+            self.message_text.update()
+
+
+# Максимальное количество одновременно отображаемых сообщений
+CHAT_WINDOW_SIZE = 60
+
+# Количество сообщений, на которое сдвигается окно при прокрутке
+CHAT_WINDOW_STEP = 20
+
+# Расстояние до края списка (пиксели), при котором сдвигается окно
+CHAT_SCROLL_THRESHOLD = 100
+
+
+class ChatView(ft.ListView):
+    """
+    Виртуализированная история чата.
+
+    Все сообщения хранятся как данные - кортежи (текст, is_user), а
+    элементами интерфейса являются только сообщения текущего окна
+    (не более window_size). При прокрутке к краю окно сдвигается на step
+    сообщений: недостающие пузырьки добавляются с одной стороны, лишние
+    удаляются с другой и повторно используются. Поэтому размер дерева
+    элементов и стоимость обновления не зависят от длины диалога.
+
+    Args:
+        load_older (callable | None): Функция без аргументов, возвращающая
+            список более старых сообщений [(текст, is_user), ...] в
+            хронологическом порядке или пустой список, если их больше нет
+        window_size (int): Максимальное количество отображаемых сообщений
+        step (int): Шаг сдвига окна
+        **kwargs: Параметры ft.ListView (см. AppStyles.chat_history)
+    """
+
+    def __init__(
+        self,
+        load_older=None,
+        window_size: int = CHAT_WINDOW_SIZE,
+        step: int = CHAT_WINDOW_STEP,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.load_older = load_older
+        self.window_size = window_size
+        self.step = step
+
+        self.messages = []  # Все сообщения диалога: (текст, is_user)
+        self.start = 0  # Индекс первого отображаемого сообщения
+        self.bubbles = []  # Отображаемые пузырьки (окно сообщений)
+        self._pool = []  # Отсоединенные пузырьки для повторного использования
+        self._progress = ft.ProgressRing()  # Индикатор ожидания ответа
+        self._older_exhausted = load_older is None  # Старых сообщений больше нет
+        self._shifting = False  # Идет сдвиг окна
+        # Край списка ("top"/"bottom"), у которого окно уже было сдвинуто:
+        # после сдвига позиция прокрутки остается в пределах порога от края,
+        # поэтому повторный сдвиг выполняется только после того, как
+        # пользователь отойдет от края и вернется к нему
+        self._shifted_edge = None
+        self._streaming = False  # Последнее сообщение дописывается по частям
+
+        self.on_scroll = self._on_scroll
+        self.on_scroll_interval = 100  # Не чаще одного события в 100 мс
+
+    @property
+    def end(self) -> int:
+        """
+        Индекс сообщения, следующего за последним отображаемым.
+        """
+        return self.start + len(self.bubbles)
+
+    def _bubble(self, message: str, is_user: bool) -> MessageBubble:
+        """
+        Пузырек для сообщения: из пула свободных или новый.
+        """
+        if self._pool:
+            bubble = self._pool.pop()
+            bubble.set_message(message, is_user)
+            return bubble
+        return MessageBubble(message=message, is_user=is_user)
+
+    def _release(self, bubbles: list):
+        """
+        Возврат отсоединенных пузырьков в пул (размер пула ограничен).
+        """
+        self._pool.extend(bubbles[: max(0, self.step - len(self._pool))])
+
+    def _sync_controls(self):
+        """
+        Синхронизация элементов списка с окном сообщений.
+        """
+        progress = [self._progress] if self._progress in self.controls else []
+        self.controls = [*self.bubbles, *progress]
+        # Автопрокрутка к концу только когда окно показывает последние сообщения
+        self.auto_scroll = self.end == len(self.messages)
+
+    def _render(self, start: int, end: int):
+        """
+        Отображение сообщений [start, end) с повторным использованием пузырьков.
+        """
+        old = {index: bubble for index, bubble in enumerate(self.bubbles, self.start)}
+        bubbles = [old.pop(index, None) for index in range(start, end)]
+        free = list(old.values())  # Пузырьки, вышедшие из окна
+        for offset, bubble in enumerate(bubbles):
+            if bubble is None:
+                message, is_user = self.messages[start + offset]
+                if free:
+                    bubble = free.pop()
+                    bubble.set_message(message, is_user)
+                else:
+                    bubble = self._bubble(message, is_user)
+                bubbles[offset] = bubble
+        self._release(free)
+        self.start, self.bubbles = start, bubbles
+        self._sync_controls()
+
+    def set_messages(self, messages: list, exhausted: bool = False):
+        """
+        Замена всех сообщений (например, при первой загрузке истории).
+
+        Args:
+            messages (list): Сообщения [(текст, is_user), ...] по времени
+            exhausted (bool): Более старых сообщений нет
+        """
+        self.messages = list(messages)
+        self._older_exhausted = exhausted or self.load_older is None
+        self._shifted_edge = None
+        end = len(self.messages)
+        self._render(max(0, end - self.window_size), end)
+
+    def add_message(
+        self, message: str, is_user: bool, streaming: bool = False
+    ) -> MessageBubble:
+        """
+        Добавление нового сообщения в конец диалога.
+
+        Окно переносится к концу диалога, самые старые пузырьки окна
+        отсоединяются и используются повторно.
+
+        Args:
+            message (str): Текст сообщения
+            is_user (bool): Флаг сообщения пользователя
+            streaming (bool): Сообщение будет дописываться по частям; до вызова
+                update_last_message окно не сдвигается, чтобы пузырек
+                не был отсоединен или использован повторно (одновременно
+                дописывается только одно сообщение - последнее)
+
+        Returns:
+            MessageBubble: Пузырек нового сообщения (для потокового дописывания)
+        """
+        self._streaming = streaming
+        self.messages.append((message, is_user))
+        end = len(self.messages)
+        if self.end == end - 1:  # Окно уже в конце: сдвиг на одно сообщение
+            self.bubbles.append(self._bubble(message, is_user))
+            if len(self.bubbles) > self.window_size:
+                dropped = len(self.bubbles) - self.window_size
+                self._release(self.bubbles[:dropped])
+                self.bubbles = self.bubbles[dropped:]
+                self.start += dropped
+            self._sync_controls()
+        else:  # Пользователь просматривал старые сообщения
+            self._render(max(0, end - self.window_size), end)
+        return self.bubbles[-1]
+
+    def update_last_message(self, message: str):
+        """
+        Сохранение итогового текста последнего сообщения
+        (после потокового получения ответа).
+        """
+        self._streaming = False
+        if self.messages:
+            _, is_user = self.messages[-1]
+            self.messages[-1] = (message, is_user)
+            if self.end == len(self.messages):
+                self.bubbles[-1].set_message(message, is_user)
+
+    def show_progress(self):
+        """
+        Показ индикатора ожидания ответа в конце списка.
+        """
+        if self._progress not in self.controls:
+            self.controls.append(self._progress)
+
+    def hide_progress(self):
+        """
+        Скрытие индикатора ожидания ответа.
+        """
+        if self._progress in self.controls:
+            self.controls.remove(self._progress)
+
+    def clear(self):
+        """
+        Удаление всех сообщений.
+        """
+        self._release(self.bubbles)
+        self.messages, self.bubbles, self.start = [], [], 0
+        self._streaming = False
+        self._older_exhausted = True
+        self._shifted_edge = None
+        self.controls.clear()
+        self.auto_scroll = True
+
+    def _on_scroll(self, e: ft.OnScrollEvent):
+        """
+        Сдвиг окна при прокрутке к началу или концу отображаемых сообщений.
+
+        Окно сдвигается один раз при подходе к краю: следующие события у того
+        же края игнорируются, пока пользователь не прокрутит список от него.
+        Иначе после добавления сообщений в начало каждое событие прокрутки
+        сдвигало бы окно еще на step сообщений и подгружало новую порцию.
+        """
+        if self._shifting or self._streaming:
+            return
+
+        if e.pixels <= e.min_scroll_extent + CHAT_SCROLL_THRESHOLD:
+            edge = "top"
+        elif e.pixels >= e.max_scroll_extent - CHAT_SCROLL_THRESHOLD:
+            edge = "bottom"
+        else:
+            self._shifted_edge = None  # Пользователь отошел от края
+            return
+        if edge == self._shifted_edge:
+            return
+
+        if edge == "top":
+            start = self.start
+            if start == 0 and not self._older_exhausted:
+                # Подгрузка более старых сообщений через обратный вызов
+                older = self.load_older()
+                if not older:
+                    self._older_exhausted = True
+                self.messages[0:0] = older
+                start = len(older)
+                self.start += start
+            if start == 0:
+                return
+            new_start = max(0, start - self.step)
+            new_end = min(self.end, new_start + self.window_size)
+        else:
+            if self.end == len(self.messages):
+                return
+            new_end = min(len(self.messages), self.end + self.step)
+            new_start = max(self.start, new_end - self.window_size)
+
+        self._shifted_edge = edge
+        self._shifting = True
+        try:
+            self._render(new_start, new_end)
+            self.update()
+        finally:
+            self._shifting = False
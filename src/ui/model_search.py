@@ -0,0 +1,283 @@
+import re  # Разбиение названий моделей на слова
+import unicodedata  # Удаление диакритических знаков при нормализации
+
+# Максимальное количество моделей в результатах поиска
+MAX_RESULTS = 50
+
+# Максимальная длина индексируемого префикса слова
+MAX_PREFIX_LENGTH = 16
+
+# Количество запоминаемых результатов запросов
+QUERY_CACHE_SIZE = 256
+
+# Веса совпадений при ранжировании (чем больше, тем выше в списке)
+SCORE_EXACT = 100  # Запрос совпадает с ID, названием или словом целиком
+SCORE_PROVIDER = 40  # Запрос - начало имени провайдера ("openai/...")
+SCORE_NAME_START = 30  # Запрос - начало названия модели
+SCORE_WORD_PREFIX = 20  # Запрос - начало одного из слов
+SCORE_SUBSTRING = 10  # Запрос содержится внутри слова
+SCORE_FUZZY = 5  # Начало слова совпадает с точностью до опечатки
+
+# Максимум слов, для которых вычисляется расстояние при нечетком поиске
+FUZZY_MAX_CANDIDATES = 32
+
+_WORD_SPLIT = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text: str) -> str:
+    """
+    Нормализация текста для поиска: нижний регистр, без диакритики.
+
+    Args:
+        text (str): Исходный текст
+
+    Returns:
+        str: Нормализованный текст
+    """
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def split_words(text: str) -> list:
+    """
+    Разбиение нормализованного текста на слова из латинских букв и цифр.
+    """
+    return [word for word in _WORD_SPLIT.split(text) if word]
+
+
+def edit_distance(a: str, b: str, limit: int, prefix: bool = False) -> int:
+    """
+    Расстояние Дамерау-Левенштейна (с перестановкой соседних символов).
+
+    Вычисление прекращается, как только расстояние превышает limit.
+
+    Args:
+        a (str): Первая строка
+        b (str): Вторая строка
+        limit (int): Максимальное интересующее расстояние
+        prefix (bool): Расстояние от a до ближайшего начала строки b
+            (для "sonet" и "sonnet" - 1, хотя "sonne" отличается на 2)
+
+    Returns:
+        int: Расстояние или limit + 1, если оно больше limit
+    """
+    if prefix:
+        b = b[: len(a) + limit]  # Более длинные начала заведомо дальше limit
+        if len(b) < len(a) - limit:
+            return limit + 1
+    elif abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (
+                previous2 is not None
+                and i > 1
+                and j > 1
+                and a[i - 1] == b[j - 2]
+                and a[i - 2] == b[j - 1]
+            ):
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(min(previous), limit + 1) if prefix else previous[-1]
+
+
+def trigrams(text: str) -> set:
+    """
+    Множество триграмм строки (для поиска подстрок и опечаток).
+    """
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class ModelSearchIndex:
+    """
+    Предварительно построенный индекс для поиска моделей по ID и названию.
+
+    При построении для каждой модели вычисляются:
+    - нормализованные слова ID и названия ("openai", "gpt", "4o", "mini")
+    - слитная строка без разделителей ("openaigpt4omini") для поиска "gpt4o"
+    - провайдер (часть ID до "/")
+
+    Индексы:
+    - префиксный: префикс слова -> множество номеров моделей, поиск по
+      началу слова выполняется одним обращением к словарю
+    - триграммный: триграмма слитной строки -> множество номеров моделей,
+      используется для поиска подстрок
+    - словарь слов по первой букве: для нечеткого поиска сравниваются
+      только слова с той же первой буквой (опечатка не дальше одной-двух
+      правок от начала слова); перед вычислением расстояния слова
+      отсеиваются по набору букв (каждая правка добавляет не больше одной
+      недостающей буквы), а число сравнений ограничено FUZZY_MAX_CANDIDATES
+
+    Каждое слово запроса должно совпасть (логическое И); результаты
+    ранжируются по силе совпадения, затем по длине названия. Результаты
+    запросов кэшируются (стирание символа возвращает готовый результат).
+    """
+
+    def __init__(self, models: list, max_results: int = MAX_RESULTS):
+        """
+        Построение индекса.
+
+        Args:
+            models (list): Список моделей [{"id": ..., "name": ...}, ...]
+            max_results (int): Максимальное количество результатов поиска
+        """
+        self.models = models
+        self.max_results = max_results
+
+        self.words = []  # Слова каждой модели
+        self.compact = []  # Слитные строки моделей
+        self.providers = []  # Провайдеры моделей
+        self.names = []  # Нормализованные названия
+        self.prefixes = {}  # Префикс слова -> номера моделей
+        self.trigram_index = {}  # Триграмма -> номера моделей
+        self.vocabulary = {}  # Первая буква -> {слово: номера моделей}
+        self.word_letters = {}  # Слово -> набор букв его начала (для отсева)
+
+        for number, model in enumerate(models):
+            model_id = normalize(model.get("id", ""))
+            name = normalize(model.get("name", ""))
+            words = split_words(f"{model_id} {name}")
+
+            self.words.append(set(words))
+            self.compact.append(
+                "".join(split_words(model_id)) + " " + "".join(split_words(name))
+            )
+            self.providers.append(model_id.split("/", 1)[0] if "/" in model_id else "")
+            self.names.append(name)
+
+            for word in words:
+                for length in range(1, min(len(word), MAX_PREFIX_LENGTH) + 1):
+                    self.prefixes.setdefault(word[:length], set()).add(number)
+                self.vocabulary.setdefault(word[0], {}).setdefault(word, set()).add(
+                    number
+                )
+                if word not in self.word_letters:
+                    self.word_letters[word] = frozenset(word[:MAX_PREFIX_LENGTH])
+            for trigram in trigrams(self.compact[number]):
+                self.trigram_index.setdefault(trigram, set()).add(number)
+
+        self._cache = {}  # Запрос -> отсортированные номера моделей (все совпадения)
+
+    def _match_term(self, term: str, candidates: set | None) -> dict:
+        """
+        Поиск моделей по одному слову запроса.
+
+        Args:
+            term (str): Нормализованное слово запроса
+            candidates (set | None): Ограничение множества моделей
+
+        Returns:
+            dict: Номер модели -> оценка совпадения
+        """
+        scores = {}
+
+        # Начало слова: одно обращение к префиксному индексу
+        for number in self.prefixes.get(term[:MAX_PREFIX_LENGTH], ()):
+            if candidates is not None and number not in candidates:
+                continue
+            if len(term) > MAX_PREFIX_LENGTH and not any(
+                word.startswith(term) for word in self.words[number]
+            ):
+                continue
+            if term in self.words[number]:
+                score = SCORE_EXACT
+            elif self.providers[number].startswith(term):
+                score = SCORE_PROVIDER
+            elif self.names[number].startswith(term):
+                score = SCORE_NAME_START
+            else:
+                score = SCORE_WORD_PREFIX
+            scores[number] = score
+        if scores or len(term) < 3:
+            return scores
+
+        # Подстрока (в том числе через разделители: "gpt4o")
+        grams = trigrams(term)
+        postings = sorted(
+            (self.trigram_index.get(gram, set()) for gram in grams), key=len
+        )
+        found = set.intersection(*postings) if postings and postings[0] else set()
+        for number in found:
+            if candidates is not None and number not in candidates:
+                continue
+            if term in self.compact[number]:
+                scores[number] = SCORE_SUBSTRING
+        if scores:
+            return scores
+
+        # Нечеткое совпадение начала слова (опечатки, пропуски, перестановки)
+        limit = 1 if len(term) <= 5 else 2
+        letters = set(term)
+        compared = 0
+        for word, numbers in self.vocabulary.get(term[0], {}).items():
+            # Дешевый отсев: короткое слово или больше limit недостающих букв
+            if len(word) < len(term) - limit:
+                continue
+            if len(letters - self.word_letters[word]) > limit:
+                continue
+            compared += 1
+            if compared > FUZZY_MAX_CANDIDATES:
+                break
+            distance = edit_distance(term, word, limit, prefix=True)
+            if distance > limit:
+                continue
+            for number in numbers:
+                if candidates is None or number in candidates:
+                    score = SCORE_FUZZY - distance
+                    scores[number] = max(scores.get(number, score), score)
+        return scores
+
+    def _search_all(self, query: str) -> list:
+        """
+        Все совпадения запроса в порядке ранжирования (с кэшированием).
+        """
+        if query in self._cache:
+            return self._cache[query]
+
+        candidates = None  # Модели, совпавшие со всеми предыдущими словами
+        total = {}
+        for position, term in enumerate(split_words(query)):
+            scores = self._match_term(term, candidates)
+            if position == 0:
+                total = scores
+            else:
+                total = {
+                    number: total[number] + score
+                    for number, score in scores.items()
+                    if number in total
+                }
+            candidates = set(total)
+            if not total:
+                break
+
+        result = sorted(
+            total, key=lambda number: (-total[number], len(self.names[number]), number)
+        )
+        if len(self._cache) >= QUERY_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[query] = result
+        return result
+
+    def search(self, query: str) -> list:
+        """
+        Поиск моделей.
+
+        Args:
+            query (str): Текст запроса
+
+        Returns:
+            list: Номера моделей (позиции в исходном списке) в порядке
+                 ранжирования, не более max_results; для пустого запроса -
+                 все модели в исходном порядке
+        """
+        query = " ".join(split_words(normalize(query)))
+        if not query:
+            return list(range(len(self.models)))
+        return self._search_all(query)[: self.max_results]
@@ -0,0 +1,90 @@
+import asyncio  # Отложенный сброс изменений в следующей итерации цикла событий
+import threading  # Защита очереди изменений
+
+import flet as ft
+
+
+class UpdateBatcher:
+    """
+    Объединение обновлений элементов интерфейса.
+
+    Вместо page.update() (сравнение всего дерева элементов) изменяемые
+    элементы регистрируются через schedule(); в следующей итерации цикла
+    событий все они отправляются одним вызовом page.update(*controls).
+    Несколько изменений одного элемента за итерацию (например, поток
+    токенов) дают одно обновление.
+
+    Счетчики:
+    - requested: сколько раз элементы передавались в schedule()
+    - flushes: сколько раз фактически вызывался page.update
+    - controls_updated: сколько элементов было обновлено
+    """
+
+    def __init__(self, page: ft.Page):
+        """
+        Args:
+            page (ft.Page): Страница, элементы которой обновляются
+        """
+        self.page = page
+        self._pending = {}  # Элементы, ожидающие обновления (в порядке добавления)
+        self._scheduled = False  # Сброс уже запланирован
+        self._lock = threading.Lock()
+
+        # Счетчики обновлений
+        self.requested = 0
+        self.flushes = 0
+        self.controls_updated = 0
+
+    def schedule(self, *controls: ft.Control):
+        """
+        Регистрация измененных элементов для обновления в конце итерации.
+
+        Может вызываться как из цикла событий, так и из других потоков
+        (синхронные обработчики Flet выполняются в пуле потоков).
+
+        Args:
+            *controls (ft.Control): Измененные элементы
+        """
+        with self._lock:
+            for control in controls:
+                self._pending[id(control)] = control
+            self.requested += len(controls)
+            if self._scheduled:
+                return
+            self._scheduled = True
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not None and loop is self.page.loop:
+            loop.call_soon(self.flush)
+        else:
+            self.page.loop.call_soon_threadsafe(self.flush)
+
+    def flush(self):
+        """
+        Отправка всех зарегистрированных изменений одним обновлением.
+        """
+        with self._lock:
+            controls = [c for c in self._pending.values() if c.page is not None]
+            self._pending.clear()
+            self._scheduled = False
+        if not controls:
+            return
+        self.page.update(*controls)
+        self.flushes += 1
+        self.controls_updated += len(controls)
+
+    def get_stats(self) -> dict:
+        """
+        Значения счетчиков обновлений.
+
+        Returns:
+            dict: Словарь с ключами requested, flushes, controls_updated
+        """
+        return {
+            "requested": self.requested,  # Запрошено обновлений элементов
+            "flushes": self.flushes,  # Фактических вызовов page.update
+            "controls_updated": self.controls_updated,  # Обновлено элементов
+        }
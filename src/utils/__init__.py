@@ -1,14 +1,25 @@
-from .app_analytics import AppAnalytics
-from .app_cache import AppCache
-from .app_logger import AppLogger
+from src._lazy import make_lazy_getattr  # Ленивая загрузка экспортов пакета
 
-from .app_tools import Validator, restore_basket, generate_password
+# Экспортируемое имя -> модуль пакета
+_EXPORTS = {
+    "AppAnalytics": ".app_analytics",
+    "AppBalance": ".app_balance",
+    "AppCache": ".app_cache",
+    "AppContext": ".app_context",
+    "estimate_tokens": ".app_context",
+    "AppLogger": ".app_logger",
+    "new_request_id": ".app_logger",
+    "request_context": ".app_logger",
+    "AppMonitor": ".app_monitor",
+    "AppSession": ".app_session",
+    "LatencySketch": ".app_sketch",
+    "AppStartup": ".app_startup",
+    "Validator": ".app_tools",
+    "restore_basket": ".app_tools",
+    "generate_password": ".app_tools",
+}
 
-__all__ = [
-    "AppAnalytics",
-    "AppCache",
-    "AppLogger",
-    "Validator",
-    "restore_basket",
-    "generate_password",
-]
+# Имена загружаются из модулей пакета при первом обращении (PEP 562)
+__getattr__ = make_lazy_getattr(__name__, _EXPORTS)
+
+__all__ = list(_EXPORTS)
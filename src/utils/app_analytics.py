@@ -1,8 +1,109 @@
 # Импорт необходимых библиотек
 import time  # Библиотека для работы с временными метками и измерения интервалов
+from array import array  # Типизированные массивы для колоночного хранения
 from datetime import (
     datetime,
+    timedelta,
 )  # Библиотека для работы с датой и временем в удобном формате
+from src.utils.app_sketch import (
+    LatencySketch,
+)  # Скетч квантилей времени ответа
+
+# Окна статистики: название -> длительность (None - за все время)
+WINDOWS = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+    "all": None,
+}
+
+
+class SessionStore:
+    """
+    Колоночное хранилище подробных данных о сообщениях сессии.
+
+    Вместо списка словарей каждое поле хранится в отдельном типизированном
+    массиве (array), а идентификаторы моделей заменяются небольшими целыми
+    числами. Одна запись занимает ~36 байт вместо 500+ байт у словаря с
+    datetime, добавление выполняется за амортизированное O(1), а агрегаты
+    считаются проходом по массиву на уровне C. Массивы поддерживают
+    протокол буфера, поэтому при необходимости их можно без копирования
+    передать в NumPy (numpy.frombuffer).
+    """
+
+    def __init__(self):
+        self.timestamps = array("d")  # Время сообщения (секунды epoch)
+        self.model_ids = array("I")  # Номер модели в self.models
+        self.message_lengths = array("q")  # Длина сообщения в символах
+        self.response_times = array("d")  # Время ответа в секундах
+        self.tokens = array("q")  # Количество использованных токенов
+        self.models = []  # Идентификаторы моделей по номеру
+        self.model_index = {}  # Номер модели по идентификатору
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def append(
+        self,
+        timestamp: datetime,
+        model: str,
+        message_length: int,
+        response_time: float,
+        tokens_used: int,
+    ):
+        """
+        Добавление записи о сообщении.
+
+        Args:
+            timestamp (datetime): Время отправки сообщения
+            model (str): Идентификатор модели
+            message_length (int): Длина сообщения в символах
+            response_time (float): Время ответа в секундах
+            tokens_used (int): Количество использованных токенов
+        """
+        # Интернирование идентификатора модели
+        model_id = self.model_index.get(model)
+        if model_id is None:
+            model_id = self.model_index[model] = len(self.models)
+            self.models.append(model)
+
+        self.timestamps.append(timestamp.timestamp())
+        self.model_ids.append(model_id)
+        self.message_lengths.append(message_length)
+        self.response_times.append(response_time)
+        self.tokens.append(tokens_used)
+
+    def records(self):
+        """
+        Ленивое преобразование записей в словари.
+
+        Yields:
+            dict: Запись с ключами timestamp, model, message_length,
+                 response_time, tokens_used
+        """
+        for index in range(len(self)):
+            yield {
+                "timestamp": datetime.fromtimestamp(self.timestamps[index]),
+                "model": self.models[self.model_ids[index]],
+                "message_length": self.message_lengths[index],
+                "response_time": self.response_times[index],
+                "tokens_used": self.tokens[index],
+            }
+
+    def clear(self):
+        """
+        Удаление всех записей.
+        """
+        for column in (
+            self.timestamps,
+            self.model_ids,
+            self.message_lengths,
+            self.response_times,
+            self.tokens,
+        ):
+            del column[:]
+        self.models.clear()
+        self.model_index.clear()
 
 
 class AppAnalytics:
@@ -32,7 +133,8 @@ class AppAnalytics:
         self.cache = cache
         self.start_time = time.time()
         self.model_usage = {}
-        self.session_data = []
+        self.session_data = SessionStore()  # Подробные данные текущей сессии
+        self.latency = {}  # Скетчи времени ответа по моделям
 
         # Загрузка исторических данных из базы
         self._load_historical_data()
@@ -40,29 +142,115 @@ class AppAnalytics:
     def _load_historical_data(self):
         """
         Загрузка исторических данных из базы данных.
-        Обновляет статистику использования моделей и сессионные данные.
-        """
-        history = self.cache.get_analytics_history()
 
-        for record in history:
-            timestamp, model, message_length, response_time, tokens_used = record
+        Статистика моделей читается из агрегатов analytics_rollup_model,
+        а скетчи времени ответа - из analytics_latency_histogram. Оба
+        источника база поддерживает при каждой записи аналитики, поэтому
+        загрузка занимает O(количество моделей), а не O(количество сообщений).
+        Подробные данные (session_data) содержат только текущую сессию.
+        """
+        for record in self.cache.get_model_rollups():
+            model, messages, tokens_used, response_time_sum, _ = record
 
             # Обновление статистики моделей
-            if model not in self.model_usage:
-                self.model_usage[model] = {"count": 0, "tokens": 0}
-            self.model_usage[model]["count"] += 1
-            self.model_usage[model]["tokens"] += tokens_used
-
-            # Добавление в сессионные данные
-            self.session_data.append(
-                {
-                    "timestamp": datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S.%f"),
-                    "model": model,
-                    "message_length": message_length,
-                    "response_time": response_time,
-                    "tokens_used": tokens_used,
-                }
+            self.model_usage[model] = {
+                "count": messages,  # Счетчик использований
+                "tokens": tokens_used,  # Счетчик токенов
+                "response_time": response_time_sum,  # Суммарное время ответа
+            }
+
+        # Гистограммы времени ответа по моделям (все сессии)
+        for model, bucket, count in self.cache.get_latency_histograms():
+            self.latency.setdefault(model, LatencySketch()).add_bucket(bucket, count)
+
+    def get_period_usage(self, period: str = "hour", since: str | None = None) -> list:
+        """
+        Статистика использования с разбивкой по часам или дням.
+
+        Args:
+            period (str): "hour" - по часам, "day" - по дням
+            since (str | None): Начальный интервал включительно
+
+        Returns:
+            list: Список словарей с ключами bucket, model, count, tokens,
+                 avg_response_time по возрастанию интервала
+        """
+        return [
+            {
+                "bucket": bucket,  # Начало интервала
+                "model": model,  # Идентификатор модели
+                "count": messages,  # Количество сообщений
+                "tokens": tokens_used,  # Использовано токенов
+                "avg_response_time": response_time_sum / messages if messages else 0,
+            }
+            for bucket, model, messages, tokens_used, response_time_sum, _ in (
+                self.cache.get_period_rollups(period, since)
             )
+        ]
+
+    def get_window_statistics(self, window: str = "day") -> dict:
+        """
+        Статистика за окно времени (последний час, день, неделю или все время).
+
+        Агрегация выполняется в SQLite по индексам (см.
+        AppCache.get_window_statistics), в Python обрабатывается только
+        по одной строке на модель.
+
+        Args:
+            window (str): Название окна из WINDOWS ("hour", "day", "week", "all")
+
+        Returns:
+            dict: Словарь с ключами:
+                - window: название окна
+                - since: начало окна (datetime или None, если данных нет)
+                - total_messages, total_tokens: итоги за окно
+                - avg_response_time: среднее время ответа в секундах
+                - messages_per_minute, tokens_per_minute: пропускная способность
+                - models: {модель: {"count", "tokens", "avg_response_time",
+                  "avg_message_length"}}
+
+        Raises:
+            ValueError: Если окно неизвестно
+        """
+        if window not in WINDOWS:
+            raise ValueError(f"Неизвестное окно статистики: {window}")
+
+        now = datetime.now()
+        duration = WINDOWS[window]
+        since = now - duration if duration else None
+        rows = self.cache.get_window_statistics(since)
+
+        models = {}
+        total_messages = total_tokens = 0
+        total_response_time = 0.0
+        for model, messages, tokens, response_time_sum, message_length_sum in rows:
+            models[model] = {
+                "count": messages,  # Количество сообщений
+                "tokens": tokens,  # Использовано токенов
+                "avg_response_time": response_time_sum / messages if messages else 0,
+                "avg_message_length": message_length_sum / messages if messages else 0,
+            }
+            total_messages += messages
+            total_tokens += tokens
+            total_response_time += response_time_sum
+
+        # Для окна "все время" пропускная способность считается от первой записи
+        if since is None:
+            since = self.cache.get_first_analytics_timestamp()
+        minutes = (now - since).total_seconds() / 60 if since else 0
+
+        return {
+            "window": window,  # Название окна
+            "since": since,  # Начало окна
+            "total_messages": total_messages,  # Сообщений за окно
+            "total_tokens": total_tokens,  # Токенов за окно
+            "avg_response_time": (
+                total_response_time / total_messages if total_messages else 0
+            ),
+            "messages_per_minute": total_messages / minutes if minutes > 0 else 0,
+            "tokens_per_minute": total_tokens / minutes if minutes > 0 else 0,
+            "models": models,  # Статистика по моделям
+        }
 
     def track_message(
         self, model: str, message_length: int, response_time: float, tokens_used: int
@@ -71,7 +259,8 @@ class AppAnalytics:
         Отслеживание метрик отдельного сообщения.
 
         Сохраняет подробную информацию о каждом сообщении и обновляет
-        общую статистику использования моделей.
+        общую статистику использования моделей (в памяти - инкрементально,
+        в базе - агрегаты обновляются триггером при записи).
 
         Args:
             model (str): Идентификатор использованной модели
@@ -86,30 +275,72 @@ class AppAnalytics:
             timestamp, model, message_length, response_time, tokens_used
         )
 
+        # Ключ статистики как в агрегатах базы (COALESCE(model, '')): иначе
+        # сообщения без модели в текущей сессии учитывались бы под None, а
+        # после перезапуска - под пустой строкой
+        key = model or ""
+
         # Инициализация статистики для новой модели при первом использовании
-        if model not in self.model_usage:
-            self.model_usage[model] = {
+        if key not in self.model_usage:
+            self.model_usage[key] = {
                 "count": 0,  # Счетчик использований
                 "tokens": 0,  # Счетчик токенов
+                "response_time": 0.0,  # Суммарное время ответа
             }
 
         # Обновление статистики использования модели
-        self.model_usage[model]["count"] += 1  # Увеличение счетчика сообщений
-        self.model_usage[model][
+        self.model_usage[key]["count"] += 1  # Увеличение счетчика сообщений
+        self.model_usage[key][
             "tokens"
         ] += tokens_used  # Добавление использованных токенов
+        self.model_usage[key][
+            "response_time"
+        ] += response_time  # Добавление времени ответа
+
+        # Учет времени ответа в скетче квантилей модели
+        self.latency.setdefault(key, LatencySketch()).add(response_time)
 
         # Сохранение подробной информации о сообщении
         self.session_data.append(
-            {
-                "timestamp": timestamp,  # Время отправки сообщения
-                "model": model,  # Использованная модель
-                "message_length": message_length,  # Длина сообщения
-                "response_time": response_time,  # Время ответа
-                "tokens_used": tokens_used,  # Количество токенов
-            }
+            timestamp,  # Время отправки сообщения
+            model,  # Использованная модель
+            message_length,  # Длина сообщения
+            response_time,  # Время ответа
+            tokens_used,  # Количество токенов
         )
 
+    def get_latency_statistics(self) -> dict:
+        """
+        Квантили времени ответа по моделям и в целом.
+
+        Returns:
+            dict: Словарь с ключами:
+                - models: {модель: {"count", "p50", "p90", "p99"}}
+                - overall: {"count", "p50", "p90", "p99"} по всем моделям
+                - histogram: список пар (интервал, количество) по всем моделям
+        """
+
+        def summary(sketch: LatencySketch) -> dict:
+            return {
+                "count": sketch.count,  # Количество ответов
+                "p50": sketch.quantile(0.5),  # Медиана
+                "p90": sketch.quantile(0.9),  # 90-й перцентиль
+                "p99": sketch.quantile(0.99),  # 99-й перцентиль
+            }
+
+        # Скетчи сливаются без потери точности
+        overall = LatencySketch()
+        for sketch in self.latency.values():
+            overall.merge(sketch)
+
+        return {
+            "models": {
+                model: summary(sketch) for model, sketch in self.latency.items()
+            },
+            "overall": summary(overall),
+            "histogram": overall.histogram(),
+        }
+
     def get_statistics(self) -> dict:
         """
         Получение общей статистики использования.
@@ -123,8 +354,13 @@ class AppAnalytics:
                 - total_tokens: общее количество использованных токенов
                 - session_duration: длительность сессии в секундах
                 - messages_per_minute: среднее количество сообщений в минуту
+                  за текущую сессию
                 - tokens_per_message: среднее количество токенов на сообщение
                 - model_usage: статистика использования каждой модели
+                - session_messages: количество сообщений текущей сессии
+                - session_avg_response_time: среднее время ответа в сессии
+                - latency: квантили и гистограмма времени ответа
+                  (см. get_latency_statistics)
         """
         # Расчет общей длительности сессии
         total_time = time.time() - self.start_time
@@ -135,16 +371,22 @@ class AppAnalytics:
         # Подсчет общего количества сообщений по всем моделям
         total_messages = sum(model["count"] for model in self.model_usage.values())
 
+        # Агрегаты текущей сессии считаются по колонкам целиком
+        session_messages = len(self.session_data)
+        session_response_time = sum(self.session_data.response_times)
+
         # Формирование и возврат статистики
         return {
             "total_messages": total_messages,  # Общее количество сообщений
             "total_tokens": total_tokens,  # Общее количество токенов
             "session_duration": total_time,  # Длительность сессии в секундах
-            # Расчет среднего количества сообщений в минуту
+            # Расчет среднего количества сообщений в минуту за сессию
+            # (исторические сообщения не относятся к времени работы процесса,
+            # для них используется get_window_statistics)
             # Если сессия только началась (total_time близко к 0),
             # возвращаем 0 чтобы избежать деления на очень маленькое число
             "messages_per_minute": (
-                (total_messages * 60) / total_time if total_time > 0 else 0
+                (session_messages * 60) / total_time if total_time > 0 else 0
             ),
             # Расчет среднего количества токенов на сообщение
             # Если сообщений нет, возвращаем 0 чтобы избежать деления на ноль
@@ -153,17 +395,25 @@ class AppAnalytics:
             ),
             # Полная статистика использования моделей
             "model_usage": self.model_usage,
+            # Статистика текущей сессии
+            "session_messages": session_messages,
+            "session_avg_response_time": (
+                session_response_time / session_messages if session_messages else 0
+            ),
+            # Квантили и гистограмма времени ответа
+            "latency": self.get_latency_statistics(),
         }
 
-    def export_data(self) -> list:
+    def export_data(self):
         """
         Экспорт всех собранных данных сессии.
 
         Returns:
-            list: Список словарей с подробной информацией о каждом сообщении
-                 включая временные метки, использованные модели и метрики.
+            Iterator[dict]: Генератор словарей с подробной информацией о каждом
+                 сообщении, включая временные метки, использованные модели и
+                 метрики. Словари создаются по мере чтения.
         """
-        return self.session_data
+        return self.session_data.records()
 
     def clear_data(self):
         """
@@ -176,3 +426,4 @@ class AppAnalytics:
         """
         self.model_usage.clear()  # Очистка статистики по моделям
         self.session_data.clear()  # Очистка истории сообщений
+        self.latency.clear()  # Очистка скетчей времени ответа
@@ -0,0 +1,162 @@
+# Импорт необходимых библиотек
+import asyncio  # Фоновая задача обновления баланса в цикле событий
+import time  # Библиотека для работы с временными метками
+
+# Интервал планового обновления баланса (секунды)
+BALANCE_REFRESH_INTERVAL = 300.0
+
+# Задержка перед первым повтором после ошибки (секунды)
+BALANCE_RETRY_DELAY = 5.0
+
+# Максимальная задержка между повторами после ошибок (секунды)
+BALANCE_MAX_RETRY_DELAY = 300.0
+
+
+class AppBalance:
+    """
+    Фоновое обновление баланса аккаунта.
+
+    Баланс запрашивается асинхронным клиентом в задаче цикла событий,
+    поэтому построение страницы не ждет HTTP-запроса к /credits.
+    Обновление выполняется:
+    - сразу после запуска задачи
+    - периодически с интервалом interval
+    - по запросу refresh() (например, после каждого ответа модели)
+
+    При ошибке повторы выполняются с экспоненциально растущей задержкой
+    (retry_delay, 2 * retry_delay, ... до max_retry_delay); запросы
+    refresh() в это время не сокращают задержку. Последнее успешно
+    полученное значение сохраняется и показывается, пока запросы не
+    проходят. Об изменениях сообщается через обратный вызов on_change.
+    """
+
+    def __init__(
+        self,
+        client,
+        interval: float = BALANCE_REFRESH_INTERVAL,
+        retry_delay: float = BALANCE_RETRY_DELAY,
+        max_retry_delay: float = BALANCE_MAX_RETRY_DELAY,
+        logger=None,
+    ):
+        """
+        Инициализация обновления баланса.
+
+        Args:
+            client (AsyncOpenRouterClient): Клиент с корутиной fetch_balance()
+            interval (float): Интервал планового обновления в секундах
+            retry_delay (float): Задержка перед первым повтором после ошибки
+            max_retry_delay (float): Максимальная задержка между повторами
+            logger (AppLogger | None): Логгер для записи ошибок
+        """
+        self.client = client
+        self.interval = interval
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.logger = logger
+
+        self.value = None  # Последний полученный баланс ('$X.XX')
+        self.updated_at = None  # Время последнего успешного обновления
+        self.error = None  # Текст ошибки последнего запроса (None - успех)
+        self.failures = 0  # Количество ошибок подряд
+        self.on_change = None  # Обратный вызов on_change(self) после каждого запроса
+
+        self._task = None  # Фоновая задача обновления
+        self._wake = None  # Событие внепланового обновления (создается в цикле)
+        self._retry_at = 0.0  # Время, раньше которого повтор не выполняется
+
+    @property
+    def is_stale(self) -> bool:
+        """
+        Последний запрос завершился ошибкой (показывается старое значение).
+        """
+        return self.error is not None
+
+    def start(self, page):
+        """
+        Запуск фоновой задачи в цикле событий страницы
+        (повторный вызов игнорируется).
+
+        Args:
+            page (ft.Page): Страница Flet, в цикле событий которой
+                выполняется задача
+        """
+        if self._task is not None and not self._task.done():
+            return
+        self._task = page.run_task(self.run)
+
+    def stop(self):
+        """
+        Остановка фоновой задачи.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def refresh(self):
+        """
+        Запрос внепланового обновления (например, после ответа модели).
+
+        Вызывается из цикла событий; во время задержки после ошибки
+        обновление выполняется только по ее истечении.
+        """
+        if self._wake is not None:
+            self._wake.set()
+
+    async def run(self):
+        """
+        Цикл обновления баланса: запрос, затем ожидание интервала,
+        задержки после ошибки или вызова refresh().
+        """
+        self._wake = asyncio.Event()
+        while True:
+            self._wake.clear()
+            await self.update()
+
+            if self.error is None:
+                delay = self.interval
+                self._retry_at = 0.0
+            else:
+                # Экспоненциальная задержка: 5, 10, 20, ... секунд
+                delay = min(
+                    self.retry_delay * 2 ** (self.failures - 1), self.max_retry_delay
+                )
+                self._retry_at = time.monotonic() + delay
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                continue
+
+            # Внеплановый запрос во время задержки после ошибки ждет ее окончания
+            remaining = self._retry_at - time.monotonic()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+
+    async def update(self):
+        """
+        Однократный запрос баланса с сохранением результата.
+        """
+        try:
+            self.value = await self.client.fetch_balance()
+            self.updated_at = time.time()
+            self.error = None
+            self.failures = 0
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.error = str(e) or type(e).__name__
+            self.failures += 1
+            if self.logger is not None:
+                self.logger.warning(
+                    f"Ошибка обновления баланса: {self.error}",
+                    event="balance",
+                    status="error",
+                    failures=self.failures,
+                )
+
+        if self.on_change is not None:
+            try:
+                self.on_change(self)
+            except Exception as e:
+                if self.logger is not None:
+                    self.logger.error(f"Ошибка отображения баланса: {e}")
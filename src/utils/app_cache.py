@@ -1,7 +1,635 @@
+import atexit  # Закрытие соединений при завершении процесса
+import logging  # Запись ошибок фоновой записи в лог приложения
+import queue  # Очередь отложенной записи
 import sqlite3
 import threading
+from itertools import groupby  # Группировка одинаковых запросов в пакеты
 import json  # Библиотека для работы с JSON форматом
-from datetime import datetime  # Библиотека для работы с датой и временем
+import re  # Разбор поискового запроса на слова
+import time  # Библиотека для работы с временными метками
+from datetime import datetime, timedelta  # Библиотека для работы с датой и временем
+from src.utils.app_sketch import (
+    LatencySketch,
+)  # Логарифмические корзины гистограммы времени ответа
+
+# Скетч, задающий разбиение времени ответа на корзины гистограммы
+LATENCY_BUCKETS = LatencySketch()
+
+# Настройки, применяемые к каждому новому соединению SQLite
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",  # Читатели не блокируют писателя
+    "PRAGMA synchronous=NORMAL",  # Без fsync на каждый коммит (безопасно в WAL)
+    "PRAGMA mmap_size=268435456",  # Отображение до 256 МБ файла в память
+    "PRAGMA cache_size=-16000",  # Кэш страниц ~16 МБ на соединение
+    "PRAGMA temp_store=MEMORY",  # Временные таблицы и индексы в памяти
+    "PRAGMA busy_timeout=5000",  # Ожидание блокировки вместо ошибки
+)
+
+# Параметры отложенной записи (write-behind)
+WRITE_BATCH_SIZE = 200  # Максимум запросов в одной транзакции
+WRITE_FLUSH_INTERVAL = 0.5  # Максимальная задержка записи, секунды
+WRITE_QUEUE_LIMIT = 10000  # Предел очереди: при переполнении запись ждет диск
+WRITE_RETRY_ATTEMPTS = 3  # Попытки записи пакета при блокировке базы
+WRITE_RETRY_DELAY = 0.1  # Задержка перед первым повтором, секунды (удваивается)
+
+# Запросы, план выполнения которых проверяется тестами (tests/test_app_cache.py)
+
+# Последняя страница истории чата: обход первичного ключа с конца до LIMIT
+HISTORY_LATEST_QUERY = """
+    SELECT * FROM messages
+    ORDER BY id DESC
+    LIMIT ?
+"""
+
+# Более старая страница истории (keyset): поиск по первичному ключу
+HISTORY_PAGE_QUERY = """
+    SELECT * FROM messages
+    WHERE id < ?
+    ORDER BY id DESC
+    LIMIT ?
+"""
+
+# Вся история по времени (экспорт): порядок индекса idx_messages_timestamp
+FORMATTED_HISTORY_QUERY = """
+    SELECT id, model, user_message, ai_response, timestamp, tokens_used
+    FROM messages
+    ORDER BY timestamp ASC
+"""
+
+# Вся история аналитики: читается целиком из покрывающего индекса
+ANALYTICS_HISTORY_QUERY = """
+    SELECT timestamp, model, message_length, response_time, tokens_used
+    FROM analytics_messages
+    ORDER BY timestamp ASC
+"""
+
+# Статистика за окно: сырые записи неполного первого часа (диапазон по
+# покрывающему индексу) плюс почасовые агрегаты полных часов
+WINDOW_STATISTICS_QUERY = """
+    SELECT model, SUM(messages), SUM(tokens_used),
+           SUM(response_time_sum), SUM(message_length_sum)
+    FROM (
+        SELECT COALESCE(model, '') AS model,
+               COUNT(*) AS messages,
+               COALESCE(SUM(tokens_used), 0) AS tokens_used,
+               COALESCE(SUM(response_time), 0) AS response_time_sum,
+               COALESCE(SUM(message_length), 0) AS message_length_sum
+        FROM analytics_messages
+        WHERE timestamp >= ? AND timestamp < ?
+        GROUP BY 1
+        UNION ALL
+        SELECT model, messages, tokens_used,
+               response_time_sum, message_length_sum
+        FROM analytics_rollup_hourly
+        WHERE bucket >= ?
+    )
+    GROUP BY model
+    ORDER BY 2 DESC
+"""
+
+
+def backfill_latency_histogram(conn: sqlite3.Connection):
+    """
+    Заполнение гистограммы времени ответа по уже накопленной аналитике.
+
+    Номер корзины вычисляется в Python (логарифм), поэтому миграция
+    выполняется одним проходом по таблице, а не SQL запросом.
+    """
+    counts = {}
+    cursor = conn.execute("SELECT model, response_time FROM analytics_messages")
+    for model, response_time in cursor:
+        key = (model or "", LATENCY_BUCKETS.bucket_index(response_time or 0))
+        counts[key] = counts.get(key, 0) + 1
+    conn.executemany(
+        """
+        INSERT INTO analytics_latency_histogram (model, bucket, count)
+        VALUES (?, ?, ?)
+        """,
+        [(model, bucket, count) for (model, bucket), count in counts.items()],
+    )
+
+
+def add_latency_bucket_column(conn: sqlite3.Connection):
+    """
+    Добавление столбца latency_bucket в analytics_messages.
+
+    ALTER TABLE ... ADD COLUMN не поддерживает IF NOT EXISTS, поэтому
+    наличие столбца проверяется через PRAGMA table_info: повторный запуск
+    миграции (например, после сбоя) не завершается ошибкой.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(analytics_messages)")}
+    if "latency_bucket" not in columns:
+        conn.execute("ALTER TABLE analytics_messages ADD COLUMN latency_bucket INTEGER")
+
+
+# Миграции схемы: (версия, список SQL запросов или функций от соединения).
+# Текущая версия хранится в PRAGMA user_version, применяются только новые.
+MIGRATIONS = [
+    (
+        1,
+        [
+            # Последние сообщения: ORDER BY timestamp DESC LIMIT ? без сортировки
+            """
+            CREATE INDEX IF NOT EXISTS idx_messages_timestamp
+            ON messages (timestamp)
+            """,
+            # Покрывающий индекс для истории аналитики: запрос читается
+            # целиком из индекса, без обращения к таблице и без сортировки
+            """
+            CREATE INDEX IF NOT EXISTS idx_analytics_timestamp_model
+            ON analytics_messages (
+                timestamp, model, message_length, response_time, tokens_used
+            )
+            """,
+        ],
+    ),
+    (
+        2,
+        [
+            # Полнотекстовый индекс по истории чата (внешнее содержимое:
+            # тексты хранятся только в messages, индекс - в messages_fts)
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5 (
+                user_message,
+                ai_response,
+                content = 'messages',
+                content_rowid = 'id',
+                tokenize = 'unicode61 remove_diacritics 2'
+            )
+            """,
+            # Триггеры синхронизации индекса с таблицей messages
+            """
+            CREATE TRIGGER IF NOT EXISTS messages_fts_insert
+            AFTER INSERT ON messages BEGIN
+                INSERT INTO messages_fts (rowid, user_message, ai_response)
+                VALUES (new.id, new.user_message, new.ai_response);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS messages_fts_delete
+            AFTER DELETE ON messages BEGIN
+                INSERT INTO messages_fts (messages_fts, rowid, user_message, ai_response)
+                VALUES ('delete', old.id, old.user_message, old.ai_response);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS messages_fts_update
+            AFTER UPDATE ON messages BEGIN
+                INSERT INTO messages_fts (messages_fts, rowid, user_message, ai_response)
+                VALUES ('delete', old.id, old.user_message, old.ai_response);
+                INSERT INTO messages_fts (rowid, user_message, ai_response)
+                VALUES (new.id, new.user_message, new.ai_response);
+            END
+            """,
+            # Индексация уже существующей истории
+            "INSERT INTO messages_fts (messages_fts) VALUES ('rebuild')",
+        ],
+    ),
+    (
+        3,
+        [
+            # Агрегаты аналитики: по модели, по модели за час и за день.
+            # Поддерживаются триггером при каждой вставке в analytics_messages,
+            # поэтому статистика читается за O(количество моделей)
+            """
+            CREATE TABLE IF NOT EXISTS analytics_rollup_model (
+                model TEXT PRIMARY KEY,               -- Идентификатор модели
+                messages INTEGER NOT NULL,            -- Количество сообщений
+                tokens_used INTEGER NOT NULL,         -- Сумма токенов
+                response_time_sum REAL NOT NULL,      -- Сумма времени ответа
+                message_length_sum INTEGER NOT NULL   -- Сумма длины сообщений
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS analytics_rollup_hourly (
+                bucket TEXT NOT NULL,                 -- Час: YYYY-MM-DD HH:00
+                model TEXT NOT NULL,                  -- Идентификатор модели
+                messages INTEGER NOT NULL,            -- Количество сообщений
+                tokens_used INTEGER NOT NULL,         -- Сумма токенов
+                response_time_sum REAL NOT NULL,      -- Сумма времени ответа
+                message_length_sum INTEGER NOT NULL,  -- Сумма длины сообщений
+                PRIMARY KEY (bucket, model)
+            ) WITHOUT ROWID
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS analytics_rollup_daily (
+                bucket TEXT NOT NULL,                 -- День: YYYY-MM-DD
+                model TEXT NOT NULL,                  -- Идентификатор модели
+                messages INTEGER NOT NULL,            -- Количество сообщений
+                tokens_used INTEGER NOT NULL,         -- Сумма токенов
+                response_time_sum REAL NOT NULL,      -- Сумма времени ответа
+                message_length_sum INTEGER NOT NULL,  -- Сумма длины сообщений
+                PRIMARY KEY (bucket, model)
+            ) WITHOUT ROWID
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS analytics_rollup_insert
+            AFTER INSERT ON analytics_messages BEGIN
+                INSERT INTO analytics_rollup_model (
+                    model, messages, tokens_used,
+                    response_time_sum, message_length_sum
+                )
+                VALUES (
+                    COALESCE(new.model, ''), 1, COALESCE(new.tokens_used, 0),
+                    COALESCE(new.response_time, 0), COALESCE(new.message_length, 0)
+                )
+                ON CONFLICT (model) DO UPDATE SET
+                    messages = messages + 1,
+                    tokens_used = tokens_used + excluded.tokens_used,
+                    response_time_sum = response_time_sum + excluded.response_time_sum,
+                    message_length_sum = message_length_sum + excluded.message_length_sum;
+                INSERT INTO analytics_rollup_hourly (
+                    bucket, model, messages, tokens_used,
+                    response_time_sum, message_length_sum
+                )
+                VALUES (
+                    strftime('%Y-%m-%d %H:00', new.timestamp), COALESCE(new.model, ''),
+                    1, COALESCE(new.tokens_used, 0),
+                    COALESCE(new.response_time, 0), COALESCE(new.message_length, 0)
+                )
+                ON CONFLICT (bucket, model) DO UPDATE SET
+                    messages = messages + 1,
+                    tokens_used = tokens_used + excluded.tokens_used,
+                    response_time_sum = response_time_sum + excluded.response_time_sum,
+                    message_length_sum = message_length_sum + excluded.message_length_sum;
+                INSERT INTO analytics_rollup_daily (
+                    bucket, model, messages, tokens_used,
+                    response_time_sum, message_length_sum
+                )
+                VALUES (
+                    date(new.timestamp), COALESCE(new.model, ''),
+                    1, COALESCE(new.tokens_used, 0),
+                    COALESCE(new.response_time, 0), COALESCE(new.message_length, 0)
+                )
+                ON CONFLICT (bucket, model) DO UPDATE SET
+                    messages = messages + 1,
+                    tokens_used = tokens_used + excluded.tokens_used,
+                    response_time_sum = response_time_sum + excluded.response_time_sum,
+                    message_length_sum = message_length_sum + excluded.message_length_sum;
+            END
+            """,
+            # Заполнение агрегатов по уже накопленной истории
+            """
+            INSERT INTO analytics_rollup_model (
+                model, messages, tokens_used,
+                response_time_sum, message_length_sum
+            )
+            SELECT
+                COALESCE(model, '') AS model, COUNT(*), COALESCE(SUM(tokens_used), 0),
+                COALESCE(SUM(response_time), 0), COALESCE(SUM(message_length), 0)
+            FROM analytics_messages
+            GROUP BY 1
+            """,
+            """
+            INSERT INTO analytics_rollup_hourly (
+                bucket, model, messages, tokens_used,
+                response_time_sum, message_length_sum
+            )
+            SELECT
+                strftime('%Y-%m-%d %H:00', timestamp) AS bucket,
+                COALESCE(model, '') AS model,
+                COUNT(*), COALESCE(SUM(tokens_used), 0),
+                COALESCE(SUM(response_time), 0), COALESCE(SUM(message_length), 0)
+            FROM analytics_messages
+            GROUP BY 1, 2
+            """,
+            """
+            INSERT INTO analytics_rollup_daily (
+                bucket, model, messages, tokens_used,
+                response_time_sum, message_length_sum
+            )
+            SELECT
+                date(timestamp) AS bucket,
+                COALESCE(model, '') AS model,
+                COUNT(*), COALESCE(SUM(tokens_used), 0),
+                COALESCE(SUM(response_time), 0), COALESCE(SUM(message_length), 0)
+            FROM analytics_messages
+            GROUP BY 1, 2
+            """,
+        ],
+    ),
+    (
+        4,
+        [
+            # Номер корзины гистограммы времени ответа для каждой записи
+            add_latency_bucket_column,
+            # Гистограмма времени ответа по моделям (корзины LatencySketch)
+            """
+            CREATE TABLE IF NOT EXISTS analytics_latency_histogram (
+                model TEXT NOT NULL,      -- Идентификатор модели
+                bucket INTEGER NOT NULL,  -- Номер логарифмической корзины
+                count INTEGER NOT NULL,   -- Количество ответов в корзине
+                PRIMARY KEY (model, bucket)
+            ) WITHOUT ROWID
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS analytics_latency_insert
+            AFTER INSERT ON analytics_messages
+            WHEN new.latency_bucket IS NOT NULL BEGIN
+                INSERT INTO analytics_latency_histogram (model, bucket, count)
+                VALUES (COALESCE(new.model, ''), new.latency_bucket, 1)
+                ON CONFLICT (model, bucket) DO UPDATE SET count = count + 1;
+            END
+            """,
+            # Заполнение гистограммы по уже накопленной истории
+            backfill_latency_histogram,
+        ],
+    ),
+]
+
+
+class ConnectionManager:
+    """
+    Менеджер соединений с файлом базы данных SQLite.
+
+    Один экземпляр на файл базы на весь процесс:
+    - Соединения создаются по одному на поток и переиспользуются
+      всеми экземплярами AppCache
+    - Каждое соединение настраивается (WAL, synchronous, mmap, cache)
+    - Создание схемы выполняется один раз за процесс
+    - Все соединения закрываются при завершении процесса
+    """
+
+    _managers = {}  # Менеджеры по имени файла базы
+    _managers_lock = threading.Lock()
+
+    def __init__(self, db_name: str):
+        """
+        Args:
+            db_name (str): Путь к файлу базы данных
+        """
+        self.db_name = db_name
+        self.local = threading.local()  # Соединение текущего потока
+        self.connections = []  # Все открытые соединения
+        self.lock = threading.RLock()  # Повторно входимая: схема создается под ней
+        self.schema_ready = False
+        self.writer = WriteBehindQueue(self)  # Отложенная пакетная запись
+
+    @classmethod
+    def get(cls, db_name: str) -> "ConnectionManager":
+        """
+        Получение менеджера для файла базы данных (создается при первом вызове).
+        """
+        with cls._managers_lock:
+            manager = cls._managers.get(db_name)
+            if manager is None:
+                manager = cls._managers[db_name] = cls(db_name)
+            return manager
+
+    def connection(self) -> sqlite3.Connection:
+        """
+        Возвращает соединение для текущего потока, создавая его при необходимости.
+        """
+        conn = getattr(self.local, "connection", None)
+        if conn is None:
+            # Соединение используется только своим потоком, но закрывается
+            # из основного потока при завершении процесса
+            conn = sqlite3.connect(self.db_name, check_same_thread=False)
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self.local.connection = conn
+            with self.lock:
+                self.connections.append(conn)
+        return conn
+
+    def release(self):
+        """
+        Закрытие соединения текущего потока.
+
+        Вызывается короткоживущими потоками перед завершением: иначе
+        соединение остается в списке менеджера до выхода из процесса.
+        """
+        conn = getattr(self.local, "connection", None)
+        if conn is None:
+            return
+        self.local.connection = None
+        with self.lock:
+            self.connections.remove(conn)
+        conn.close()
+
+    def ensure_schema(self, create_tables):
+        """
+        Однократное создание схемы базы данных за процесс.
+
+        Args:
+            create_tables (callable): Функция создания таблиц
+        """
+        if self.schema_ready:
+            return
+        with self.lock:
+            if not self.schema_ready:
+                create_tables()
+                self.schema_ready = True
+
+    def close(self):
+        """
+        Запись отложенных запросов и закрытие всех соединений менеджера.
+        """
+        self.writer.close()
+        with self.lock:
+            for conn in self.connections:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self.connections.clear()
+            self.local = threading.local()
+
+    @classmethod
+    def close_all(cls):
+        """
+        Закрытие соединений всех менеджеров (вызывается при выходе).
+        """
+        with cls._managers_lock:
+            for manager in cls._managers.values():
+                manager.close()
+
+
+atexit.register(ConnectionManager.close_all)
+
+
+class WriteBehindQueue:
+    """
+    Очередь отложенной записи в базу данных.
+
+    Запросы на вставку ставятся в очередь и сразу возвращают управление.
+    Фоновый поток собирает их в пакеты (по размеру или по времени) и
+    выполняет одной транзакцией через executemany, поэтому поток
+    интерфейса не ждет диск и не выполняет коммит на каждую запись.
+
+    Если пакет не записан (база заблокирована другим процессом), запись
+    повторяется с растущей задержкой; после последней попытки запросы
+    выполняются по одному, чтобы одна ошибочная строка не отменяла весь
+    пакет. Каждый непринятый запрос записывается в лог вместе с
+    параметрами и учитывается в счетчике dropped.
+    """
+
+    _FLUSH = object()  # Маркер принудительной записи
+    _STOP = object()  # Маркер остановки потока
+
+    def __init__(
+        self,
+        manager: ConnectionManager,
+        batch_size: int = WRITE_BATCH_SIZE,
+        flush_interval: float = WRITE_FLUSH_INTERVAL,
+        max_pending: int = WRITE_QUEUE_LIMIT,
+        retry_attempts: int = WRITE_RETRY_ATTEMPTS,
+        retry_delay: float = WRITE_RETRY_DELAY,
+    ):
+        """
+        Args:
+            manager (ConnectionManager): Менеджер соединений с базой
+            batch_size (int): Максимум запросов в одной транзакции
+            flush_interval (float): Максимальная задержка записи в секундах
+            max_pending (int): Предельный размер очереди
+            retry_attempts (int): Попытки записи пакета при блокировке базы
+            retry_delay (float): Задержка перед первым повтором в секундах
+        """
+        self.manager = manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_attempts = retry_attempts
+        self.retry_delay = retry_delay
+        self.dropped = 0  # Количество запросов, которые не удалось записать
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.thread = None
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger("ChatApp")
+
+    def put(self, query: str, params: tuple):
+        """
+        Постановка запроса в очередь записи.
+
+        Args:
+            query (str): SQL запрос
+            params (tuple): Параметры запроса
+        """
+        self._ensure_thread()
+        self.queue.put((query, params))
+
+    def flush(self, timeout: float | None = None):
+        """
+        Ожидание записи всех запросов, поставленных в очередь ранее.
+
+        Args:
+            timeout (float | None): Максимальное время ожидания в секундах
+        """
+        if self.thread is None or not self.queue.unfinished_tasks:
+            return
+        done = threading.Event()
+        self.queue.put((self._FLUSH, done))
+        done.wait(timeout)
+
+    def close(self):
+        """
+        Запись оставшихся запросов и остановка фонового потока.
+        """
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                return
+            done = threading.Event()
+            self.queue.put((self._STOP, done))
+            done.wait()
+            self.thread.join()
+            self.thread = None
+
+    def _ensure_thread(self):
+        """
+        Запуск фонового потока записи при первом обращении.
+        """
+        if self.thread is not None:
+            return
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self._run, name="AppCacheWriter", daemon=True
+                )
+                self.thread.start()
+
+    def _run(self):
+        """
+        Основной цикл фонового потока записи.
+        """
+        conn = self.manager.connection()
+        while True:
+            # Ожидание первого запроса пакета
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+
+            # Добор пакета до размера или до истечения интервала
+            while len(batch) < self.batch_size and batch[-1][0] not in (
+                self._FLUSH,
+                self._STOP,
+            ):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._write(conn, [item for item in batch if isinstance(item[0], str)])
+
+            stop = False
+            for query, params in batch:
+                if query is self._FLUSH or query is self._STOP:
+                    params.set()  # Сигнал ожидающему flush/close
+                    stop = stop or query is self._STOP
+                self.queue.task_done()
+            if stop:
+                return
+
+    def _write(self, conn: sqlite3.Connection, items: list):
+        """
+        Запись пакета запросов одной транзакцией.
+
+        Подряд идущие одинаковые запросы выполняются через executemany.
+        Блокировка базы (OperationalError) повторяется с растущей задержкой;
+        если пакет так и не записан, запросы выполняются по одному.
+        """
+        if not items:
+            return
+        delay = self.retry_delay
+        for attempt in range(1, self.retry_attempts + 1):
+            try:
+                with conn:
+                    for query, group in groupby(items, key=lambda item: item[0]):
+                        conn.executemany(query, [params for _, params in group])
+                return
+            except sqlite3.OperationalError as e:
+                # База заблокирована или диск занят: повтор после паузы
+                self.logger.warning(
+                    f"Ошибка пакетной записи в базу данных "
+                    f"(попытка {attempt} из {self.retry_attempts}): {e}"
+                )
+                if attempt < self.retry_attempts:
+                    time.sleep(delay)
+                    delay *= 2
+            except sqlite3.Error as e:
+                # Ошибка данных (например, нарушение ограничения): повтор
+                # пакета не поможет, нужно найти ошибочные строки
+                self.logger.warning(f"Ошибка пакетной записи в базу данных: {e}")
+                break
+        self._write_rows(conn, items)
+
+    def _write_rows(self, conn: sqlite3.Connection, items: list):
+        """
+        Запись запросов по одному (каждый в своей транзакции).
+
+        Запросы, которые не удалось выполнить, записываются в лог
+        и учитываются в счетчике dropped.
+        """
+        for query, params in items:
+            try:
+                with conn:
+                    conn.execute(query, params)
+            except sqlite3.Error as e:
+                self.dropped += 1
+                self.logger.error(
+                    f"Запрос не записан в базу данных: {e}; "
+                    f"запрос: {' '.join(query.split())}; параметры: {params!r}"
+                )
 
 
 class AppCache:
@@ -19,18 +647,18 @@ class AppCache:
         Инициализация системы кэширования.
         Создает:
         - Файл базы данных SQLite
-        - Потокобезопасное хранилище соединений
-        - Необходимые таблицы в базе данных
+        - Общий для процесса менеджер соединений
+        - Необходимые таблицы в базе данных (один раз за процесс)
         """
         self.db_name = "app_cache.db"  # Имя файла базы данных
-        self.local = threading.local()  # Потокобезопасное хранилище соединений
-        self.create_tables()  # Создание таблиц при инициализации
+        self.connections = ConnectionManager.get(self.db_name)  # Соединения по потокам
+        self.connections.ensure_schema(self.create_tables)  # Создание таблиц
 
     def create_tables(self):
         """
         Создает таблицы в базе данных, если они не существуют.
         """
-        conn = sqlite3.connect(self.db_name)
+        conn = self.get_connection()
         cursor = conn.cursor()
 
         # SQL запросы для создания таблиц
@@ -73,8 +701,76 @@ class AppCache:
         """
         )
 
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS model_catalog (
+                id INTEGER PRIMARY KEY CHECK (id = 1),  -- Единственная запись
+                models TEXT NOT NULL,                   -- Список моделей (JSON)
+                etag TEXT,                              -- ETag ответа /models
+                last_modified TEXT,                     -- Last-Modified ответа
+                fetched_at REAL NOT NULL                -- Время последней проверки
+            )
+        """
+        )
+
         conn.commit()
-        conn.close()
+
+        # Применение миграций схемы
+        self.migrate()
+
+    def migrate(self):
+        """
+        Применение недостающих миграций схемы.
+
+        Каждая миграция выполняется в отдельной транзакции вместе с
+        обновлением PRAGMA user_version: при ошибке откатываются и DDL,
+        и данные, и номер версии, а следующий запуск повторяет миграцию.
+
+        Raises:
+            sqlite3.Error: Если миграция не применена (схема не изменена)
+        """
+        conn = self.get_connection()
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+
+        # Модуль sqlite3 сам открывает транзакцию только перед INSERT/UPDATE/
+        # DELETE, а CREATE/ALTER выполняет в режиме автофиксации. Поэтому
+        # на время миграций транзакции управляются явно (BEGIN/COMMIT)
+        isolation_level = conn.isolation_level
+        conn.isolation_level = None
+        try:
+            for target, statements in MIGRATIONS:
+                if target <= version:
+                    continue
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    for statement in statements:
+                        if callable(statement):
+                            statement(conn)  # Миграция данных в Python
+                        else:
+                            conn.execute(statement)
+                    conn.execute(f"PRAGMA user_version = {target}")
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+        finally:
+            conn.isolation_level = isolation_level
+
+    def explain_query_plan(self, query: str, params: tuple = ()) -> list:
+        """
+        Получение плана выполнения запроса (EXPLAIN QUERY PLAN).
+
+        Args:
+            query (str): SQL запрос
+            params (tuple): Параметры запроса
+
+        Returns:
+            list: Строки описания плана, например
+                 ["SCAN messages USING INDEX idx_messages_timestamp"]
+        """
+        conn = self.get_connection()
+        cursor = conn.execute(f"EXPLAIN QUERY PLAN {query}", params)
+        return [row[3] for row in cursor.fetchall()]
 
     def get_connection(self):
         """
@@ -84,9 +780,7 @@ class AppCache:
         Returns:
             sqlite3.Connection: Соединение с базой данных.
         """
-        if not hasattr(self.local, "connection"):
-            self.local.connection = sqlite3.connect(self.db_name)
-        return self.local.connection
+        return self.connections.connection()
 
     def save_user(self, name: str, family: str, api_key: str, password: str) -> bool:
         """
@@ -145,49 +839,116 @@ class AppCache:
         """
         Сохранение нового сообщения в базу данных.
 
+        Запись выполняется отложенно фоновым потоком (см. WriteBehindQueue).
+
         Args:
             model (str): Идентификатор использованной модели
             user_message (str): Текст сообщения пользователя
             ai_response (str): Ответ AI модели
             tokens_used (int): Количество использованных токенов
         """
-        conn = self.get_connection()  # Получение соединения для текущего потока
-        cursor = conn.cursor()
-
-        # Вставка новой записи в таблицу messages
-        cursor.execute(
+        # Постановка вставки новой записи в очередь записи
+        self.connections.writer.put(
             """
             INSERT INTO messages (model, user_message, ai_response, timestamp, tokens_used)
             VALUES (?, ?, ?, ?, ?)
         """,
             (model, user_message, ai_response, datetime.now(), tokens_used),
         )
-        conn.commit()  # Сохранение изменений
 
-    def get_chat_history(self, limit=50):
+    def flush(self):
+        """
+        Ожидание записи всех отложенных сообщений и данных аналитики.
+        """
+        self.connections.writer.flush()
+
+    def get_chat_history(self, page_size=50, before_id=None):
         """
-        Получение последних сообщений из истории чата.
+        Получение страницы сообщений из истории чата.
+
+        Используется keyset-пагинация: следующая (более старая) страница
+        запрашивается по ID самого старого уже загруженного сообщения,
+        поэтому стоимость запроса не зависит от глубины истории.
 
         Args:
-            limit (int): Максимальное количество возвращаемых сообщений
+            page_size (int): Максимальное количество возвращаемых сообщений
+            before_id (int | None): Вернуть только сообщения с ID меньше
+                указанного (None - самые последние сообщения)
 
         Returns:
             list: Список кортежей с данными сообщений, отсортированных
                  по времени в обратном порядке (новые сначала)
         """
+        self.flush()  # Учет еще не записанных данных
         conn = self.get_connection()  # Получение соединения для текущего потока
         cursor = conn.cursor()
 
-        # Получение последних сообщений с ограничением по количеству
+        # ID растут в порядке записи, поэтому сортировка по первичному ключу
+        # совпадает с хронологией и не требует отдельной сортировки
+        if before_id is None:
+            cursor.execute(HISTORY_LATEST_QUERY, (page_size,))
+        else:
+            cursor.execute(HISTORY_PAGE_QUERY, (before_id, page_size))
+        return cursor.fetchall()  # Возврат всех найденных записей
+
+    def search_history(self, query: str, limit: int = 20, offset: int = 0) -> list:
+        """
+        Полнотекстовый поиск по истории чата.
+
+        Каждое слово запроса ищется как префикс (например, "прогр" найдет
+        "программа"), результаты упорядочены по релевантности (BM25).
+
+        Args:
+            query (str): Текст поискового запроса
+            limit (int): Максимальное количество результатов
+            offset (int): Смещение (для постраничного вывода)
+
+        Returns:
+            list: Список словарей с данными сообщений, как в
+                 get_formatted_history, и дополнительным ключом
+                 "snippet" - фрагментом текста с найденными словами в [скобках]
+        """
+        # Каждое слово - отдельная фраза в кавычках с поиском по префиксу,
+        # чтобы спецсимволы запроса не нарушали синтаксис FTS5
+        words = re.findall(r"\w+", query)
+        if not words:
+            return []
+        match = " ".join(f'"{word}"*' for word in words)
+
+        self.flush()  # Учет еще не записанных данных
+        conn = self.get_connection()
+        cursor = conn.cursor()
         cursor.execute(
             """
-            SELECT * FROM messages 
-            ORDER BY timestamp DESC 
-            LIMIT ?
+            SELECT
+                m.id,
+                m.model,
+                m.user_message,
+                m.ai_response,
+                m.timestamp,
+                m.tokens_used,
+                snippet(messages_fts, -1, '[', ']', '...', 16)
+            FROM messages_fts
+            JOIN messages AS m ON m.id = messages_fts.rowid
+            WHERE messages_fts MATCH ?
+            ORDER BY bm25(messages_fts)
+            LIMIT ? OFFSET ?
         """,
-            (limit,),
+            (match, limit, offset),
         )
-        return cursor.fetchall()  # Возврат всех найденных записей
+
+        return [
+            {
+                "id": row[0],  # ID сообщения
+                "model": row[1],  # Использованная модель
+                "user_message": row[2],  # Сообщение пользователя
+                "ai_response": row[3],  # Ответ AI
+                "timestamp": row[4],  # Временная метка
+                "tokens_used": row[5],  # Использовано токенов
+                "snippet": row[6],  # Фрагмент с найденными словами
+            }
+            for row in cursor.fetchall()
+        ]
 
     def save_analytics(
         self, timestamp, model, message_length, response_time, tokens_used
@@ -195,6 +956,8 @@ class AppCache:
         """
         Сохранение данных аналитики в базу данных.
 
+        Запись выполняется отложенно фоновым потоком (см. WriteBehindQueue).
+
         Args:
             timestamp (datetime): Время создания записи
             model (str): Идентификатор использованной модели
@@ -202,18 +965,22 @@ class AppCache:
             response_time (float): Время ответа
             tokens_used (int): Количество использованных токенов
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
+        self.connections.writer.put(
             """
             INSERT INTO analytics_messages 
-            (timestamp, model, message_length, response_time, tokens_used)
-            VALUES (?, ?, ?, ?, ?)
+            (timestamp, model, message_length, response_time, tokens_used,
+             latency_bucket)
+            VALUES (?, ?, ?, ?, ?, ?)
         """,
-            (timestamp, model, message_length, response_time, tokens_used),
+            (
+                timestamp,
+                model,
+                message_length,
+                response_time,
+                tokens_used,
+                LATENCY_BUCKETS.bucket_index(response_time),  # Корзина гистограммы
+            ),
         )
-        conn.commit()
 
     def get_analytics_history(self):
         """
@@ -222,28 +989,222 @@ class AppCache:
         Returns:
             list: Список записей аналитики
         """
+        self.flush()  # Учет еще не записанных данных
         conn = self.get_connection()
         cursor = conn.cursor()
 
+        cursor.execute(ANALYTICS_HISTORY_QUERY)
+        return cursor.fetchall()
+
+    def get_model_rollups(self) -> list:
+        """
+        Получение накопленной статистики по моделям.
+
+        Returns:
+            list: Список кортежей (model, messages, tokens_used,
+                 response_time_sum, message_length_sum)
+        """
+        self.flush()  # Учет еще не записанных данных
+        conn = self.get_connection()
+        cursor = conn.cursor()
         cursor.execute(
             """
-            SELECT timestamp, model, message_length, response_time, tokens_used
-            FROM analytics_messages
-            ORDER BY timestamp ASC
+            SELECT model, messages, tokens_used, response_time_sum, message_length_sum
+            FROM analytics_rollup_model
+        """
+        )
+        return cursor.fetchall()
+
+    def get_latency_histograms(self) -> list:
+        """
+        Получение гистограмм времени ответа по моделям.
+
+        Returns:
+            list: Список кортежей (model, bucket, count), где bucket - номер
+                 корзины LatencySketch
+        """
+        self.flush()  # Учет еще не записанных данных
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT model, bucket, count FROM analytics_latency_histogram")
+        return cursor.fetchall()
+
+    def get_period_rollups(self, period: str = "hour", since: str | None = None) -> list:
+        """
+        Получение статистики по моделям с разбивкой по часам или дням.
+
+        Args:
+            period (str): "hour" - по часам, "day" - по дням
+            since (str | None): Начальный интервал включительно
+                 ("YYYY-MM-DD HH:00" для часов, "YYYY-MM-DD" для дней)
+
+        Returns:
+            list: Список кортежей (bucket, model, messages, tokens_used,
+                 response_time_sum, message_length_sum) по возрастанию интервала
+        """
+        tables = {"hour": "analytics_rollup_hourly", "day": "analytics_rollup_daily"}
+        if period not in tables:
+            raise ValueError(f"Неизвестный период агрегации: {period}")
+
+        self.flush()  # Учет еще не записанных данных
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            f"""
+            SELECT bucket, model, messages, tokens_used,
+                   response_time_sum, message_length_sum
+            FROM {tables[period]}
+            WHERE bucket >= ?
+            ORDER BY bucket ASC
+        """,
+            (since or "",),
+        )
+        return cursor.fetchall()
+
+    def get_window_statistics(self, since: datetime | None = None) -> list:
         """
+        Статистика по моделям за окно времени от since до текущего момента.
+
+        Окно делится на две части, каждая из которых читается по индексу:
+        - неполный первый час [since, начало следующего часа) - из
+          analytics_messages диапазонным поиском по покрывающему индексу
+          idx_analytics_timestamp_model (не более часа записей);
+        - полные часы - из агрегатов analytics_rollup_hourly
+          (не более 24 * 7 строк на модель за неделю).
+        Без окна (since=None) используются агрегаты analytics_rollup_model.
+        Поэтому время запроса не зависит от общего количества записей.
+
+        Args:
+            since (datetime | None): Начало окна; None - за все время
+
+        Returns:
+            list: Список кортежей (model, messages, tokens_used,
+                 response_time_sum, message_length_sum), отсортированный
+                 по убыванию количества сообщений
+        """
+        self.flush()  # Учет еще не записанных данных
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        if since is None:
+            cursor.execute(
+                """
+                SELECT model, messages, tokens_used,
+                       response_time_sum, message_length_sum
+                FROM analytics_rollup_model
+                ORDER BY messages DESC
+            """
+            )
+            return cursor.fetchall()
+
+        # Граница между сырыми записями и почасовыми агрегатами
+        boundary = since.replace(minute=0, second=0, microsecond=0)
+        if boundary < since:
+            boundary += timedelta(hours=1)
+
+        cursor.execute(
+            WINDOW_STATISTICS_QUERY,
+            (
+                since.isoformat(" "),  # Формат хранения временных меток
+                boundary.isoformat(" "),
+                boundary.strftime("%Y-%m-%d %H:00"),  # Формат почасовых интервалов
+            ),
         )
         return cursor.fetchall()
 
-    def __del__(self):
+    def get_first_analytics_timestamp(self) -> datetime | None:
         """
-        Деструктор класса.
+        Время первой записи аналитики (читается по индексу за O(log n)).
+
+        Returns:
+            datetime | None: Временная метка или None, если записей нет
+        """
+        self.flush()  # Учет еще не записанных данных
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT MIN(timestamp) FROM analytics_messages")
+        row = cursor.fetchone()
+        return datetime.fromisoformat(row[0]) if row and row[0] else None
 
-        Закрывает соединения с базой данных при уничтожении объекта,
-        предотвращая утечки ресурсов.
+    def get_model_catalog(self) -> dict | None:
         """
-        # Проверка наличия соединения в текущем потоке
-        if hasattr(self.local, "connection"):
-            self.local.connection.close()  # Закрытие соединения
+        Получение сохраненного каталога моделей.
+
+        Returns:
+            dict | None: Словарь с ключами "models" (список моделей),
+                "etag", "last_modified" и "fetched_at" (время последней
+                проверки, секунды epoch) или None, если каталог не сохранялся
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT models, etag, last_modified, fetched_at
+            FROM model_catalog WHERE id = 1
+        """
+        )
+        row = cursor.fetchone()
+        if not row:
+            return None
+        return {
+            "models": json.loads(row[0]),  # Список моделей
+            "etag": row[1],  # ETag для условного запроса
+            "last_modified": row[2],  # Last-Modified для условного запроса
+            "fetched_at": row[3],  # Время последней проверки
+        }
+
+    def save_model_catalog(
+        self, models: list, etag: str | None = None, last_modified: str | None = None
+    ):
+        """
+        Сохранение каталога моделей, полученного из API.
+
+        Args:
+            models (list): Список моделей [{"id": ..., "name": ...}, ...]
+            etag (str | None): Значение заголовка ETag ответа
+            last_modified (str | None): Значение заголовка Last-Modified ответа
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            INSERT OR REPLACE INTO model_catalog
+            (id, models, etag, last_modified, fetched_at)
+            VALUES (1, ?, ?, ?, ?)
+        """,
+            (json.dumps(models, ensure_ascii=False), etag, last_modified, time.time()),
+        )
+        conn.commit()
+
+    def touch_model_catalog(self):
+        """
+        Продление срока жизни каталога моделей.
+
+        Вызывается, когда сервер ответил 304 Not Modified.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE model_catalog SET fetched_at = ? WHERE id = 1", (time.time(),)
+        )
+        conn.commit()
+
+    def close(self):
+        """
+        Закрытие всех соединений с базой данных.
+
+        Соединения общие для всех экземпляров AppCache, поэтому метод
+        вызывается только при завершении работы (также выполняется
+        автоматически при выходе из процесса).
+        """
+        self.connections.close()
+
+    def release_connection(self):
+        """
+        Закрытие соединения текущего потока (для фоновых потоков,
+        которые завершаются раньше процесса).
+        """
+        self.connections.release()
 
     def clear_history(self):
         """
@@ -252,6 +1213,7 @@ class AppCache:
         Удаляет все записи из таблицы messages,
         эффективно очищая всю историю чата.
         """
+        self.flush()  # Учет еще не записанных данных
         conn = self.get_connection()  # Получение соединения
         cursor = conn.cursor()
         cursor.execute("DELETE FROM messages")  # Удаление всех записей
@@ -272,23 +1234,12 @@ class AppCache:
                     "tokens_used": int      # Использовано токенов
                 }
         """
+        self.flush()  # Учет еще не записанных данных
         conn = self.get_connection()  # Получение соединения
         cursor = conn.cursor()
 
         # Получение всех сообщений, отсортированных по времени
-        cursor.execute(
-            """
-            SELECT 
-                id,
-                model,
-                user_message,
-                ai_response,
-                timestamp,
-                tokens_used
-            FROM messages 
-            ORDER BY timestamp ASC
-        """
-        )
+        cursor.execute(FORMATTED_HISTORY_QUERY)
 
         # Формирование списка словарей с данными сообщений
         history = []
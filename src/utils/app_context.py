@@ -0,0 +1,141 @@
+# Импорт необходимых библиотек
+from collections import deque  # Очередь с быстрым удалением с обоих концов
+from itertools import islice  # Итерация по части очереди без копирования
+
+# Бюджет токенов на историю диалога по умолчанию
+DEFAULT_CONTEXT_TOKENS = 4000
+
+# Служебные токены на одно сообщение (роль, разделители)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Количество последних записей, читаемых из кэша при первой загрузке
+HISTORY_PRELOAD_LIMIT = 200
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Быстрая локальная оценка количества токенов в тексте.
+
+    Латиница в среднем занимает ~4 символа на токен, кириллица и прочие
+    не-ASCII символы - ~2.5 символа на токен. Оценка не требует токенизатора
+    и выполняется за один проход по строке.
+
+    Args:
+        text (str): Текст сообщения
+
+    Returns:
+        int: Оценка количества токенов (с учетом служебных токенов сообщения)
+    """
+    if not text:
+        return MESSAGE_OVERHEAD_TOKENS
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    other_chars = len(text) - ascii_chars
+    return int(ascii_chars / 4 + other_chars / 2.5) + 1 + MESSAGE_OVERHEAD_TOKENS
+
+
+class AppContext:
+    """
+    Класс для сборки контекста диалога в пределах бюджета токенов.
+
+    Хранит окно последних пар "вопрос - ответ" вместе с оценкой их размера.
+    Окно поддерживается инкрементально: новая пара добавляется в конец,
+    самые старые пары вытесняются из начала, поэтому на каждом шаге
+    история из базы данных повторно не читается.
+    """
+
+    def __init__(self, cache, max_tokens: int = DEFAULT_CONTEXT_TOKENS):
+        """
+        Инициализация контекста диалога.
+
+        Args:
+            cache (AppCache): Экземпляр класса для работы с базой данных
+            max_tokens (int): Бюджет токенов на историю и новое сообщение
+        """
+        self.cache = cache
+        self.max_tokens = max_tokens
+        self.turns = deque()  # Пары (сообщение, ответ, оценка токенов)
+        self.total_tokens = 0  # Суммарная оценка токенов в окне
+
+        # Загрузка последних сообщений из базы
+        self._load_history()
+
+    def _load_history(self):
+        """
+        Заполнение окна последними сообщениями из базы данных.
+
+        Записи читаются от новых к старым, пока не будет исчерпан бюджет.
+        """
+        history = self.cache.get_chat_history(HISTORY_PRELOAD_LIMIT)
+
+        turns = []
+        total = 0
+        for record in history:  # Новые сообщения идут первыми
+            _, _, user_message, ai_response, _, tokens_used = record
+            if self._is_error_response(ai_response, tokens_used):
+                continue
+            tokens = estimate_tokens(user_message) + estimate_tokens(ai_response)
+            if total + tokens > self.max_tokens:
+                break
+            turns.append((user_message, ai_response, tokens))
+            total += tokens
+
+        self.turns.extend(reversed(turns))  # Хронологический порядок
+        self.total_tokens = total
+
+    @staticmethod
+    def _is_error_response(ai_response: str, tokens_used: int) -> bool:
+        """
+        Проверка, что сохраненный ответ является сообщением об ошибке API.
+        """
+        return not ai_response or (not tokens_used and "Ошибка:" in ai_response)
+
+    def add_turn(self, user_message: str, ai_response: str):
+        """
+        Добавление завершенной пары "вопрос - ответ" в окно.
+
+        Args:
+            user_message (str): Сообщение пользователя
+            ai_response (str): Ответ модели
+        """
+        tokens = estimate_tokens(user_message) + estimate_tokens(ai_response)
+        self.turns.append((user_message, ai_response, tokens))
+        self.total_tokens += tokens
+
+        # Вытеснение самых старых пар при превышении бюджета
+        while self.turns and self.total_tokens > self.max_tokens:
+            self.total_tokens -= self.turns.popleft()[2]
+
+    def get_history(self, user_message: str) -> list:
+        """
+        Получение истории диалога для отправки вместе с новым сообщением.
+
+        Args:
+            user_message (str): Новое сообщение пользователя
+
+        Returns:
+            list: Список сообщений в формате API
+                 [{"role": "user", "content": ...},
+                  {"role": "assistant", "content": ...}, ...]
+                 в хронологическом порядке, без нового сообщения
+        """
+        budget = self.max_tokens - estimate_tokens(user_message)
+
+        # Пропуск самых старых пар, не помещающихся вместе с новым сообщением
+        skip = 0
+        excess = self.total_tokens - budget
+        while excess > 0 and skip < len(self.turns):
+            excess -= self.turns[skip][2]
+            skip += 1
+
+        messages = []
+        for question, answer, _ in islice(self.turns, skip, None):
+            messages.append({"role": "user", "content": question})
+            messages.append({"role": "assistant", "content": answer})
+        return messages
+
+    def clear(self):
+        """
+        Очистка окна контекста (например, после очистки истории чата).
+        """
+        self.turns.clear()
+        self.total_tokens = 0
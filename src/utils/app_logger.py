@@ -1,7 +1,255 @@
 # Импорт необходимых библиотек
+import atexit  # Остановка фонового потока логирования при завершении
+import copy  # Копирование записи перед помещением в очередь
+import contextvars  # Идентификатор запроса в контексте потока или задачи
+import gzip  # Сжатие файлов логов после ротации
+import json  # Формирование структурированных записей JSONL
 import logging  # Стандартная библиотека Python для логирования
+import logging.handlers  # Обработчики QueueHandler, QueueListener и ротации
 import os  # Библиотека для работы с операционной системой и файлами
-from datetime import datetime  # Библиотека для работы с датой и временем
+import queue  # Очередь записей лога между потоками
+import shutil  # Потоковое копирование при сжатии
+import threading  # Блокировка для однократной настройки и поток сжатия
+import uuid  # Генерация идентификаторов запросов
+from contextlib import contextmanager  # Временная установка идентификатора запроса
+from datetime import date, datetime  # Библиотека для работы с датой и временем
+
+# Максимальный размер файла лога до ротации (байты)
+LOG_MAX_BYTES = 5 * 1024 * 1024
+
+# Количество хранимых сжатых файлов после ротации
+LOG_BACKUP_COUNT = 10
+
+# Уровень логирования по умолчанию
+LOG_LEVEL = logging.INFO
+
+# Переменная окружения с уровнем логирования при запуске (DEBUG, INFO, ...)
+LOG_LEVEL_ENV = "CHAT_APP_LOG_LEVEL"
+
+# Переменная окружения, включающая структурированный лог logs/chat_app.jsonl
+LOG_JSON_ENV = "CHAT_APP_LOG_JSON"
+
+# Уровни, доступные для переключения во время работы
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+
+# Идентификатор текущего запроса (наследуется задачами asyncio)
+request_id_var = contextvars.ContextVar("request_id", default=None)
+
+# Стандартные атрибуты записи лога; все остальные атрибуты являются
+# структурированными полями, переданными через AppLogger.info(..., **fields)
+_RECORD_ATTRIBUTES = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", None, None))
+) | {"message", "asctime", "taskName"}
+
+
+def new_request_id() -> str:
+    """
+    Генерация короткого идентификатора запроса.
+
+    Returns:
+        str: Случайный идентификатор из 12 шестнадцатеричных символов
+    """
+    return uuid.uuid4().hex[:12]
+
+
+@contextmanager
+def request_context(request_id: str | None = None):
+    """
+    Установка идентификатора запроса для всех записей лога внутри блока.
+
+    Args:
+        request_id (str | None): Идентификатор; None - сгенерировать новый
+
+    Yields:
+        str: Действующий идентификатор запроса
+    """
+    request_id = request_id or new_request_id()
+    token = request_id_var.set(request_id)
+    try:
+        yield request_id
+    finally:
+        request_id_var.reset(token)
+
+
+class RequestIdFilter(logging.Filter):
+    """
+    Добавление идентификатора текущего запроса в запись лога.
+
+    Выполняется в вызывающем потоке (до помещения записи в очередь),
+    поэтому видит контекст запроса, в котором запись была создана.
+    """
+
+    def filter(self, record) -> bool:
+        if getattr(record, "request_id", None) is None:
+            request_id = request_id_var.get()
+            if request_id is not None:
+                record.request_id = request_id
+        return True
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Обработчик очереди, сохраняющий стек исключения отдельно от сообщения.
+
+    Стандартный QueueHandler дописывает стек вызовов в текст сообщения;
+    здесь стек переносится в exc_text, чтобы текстовый формат выводил его
+    как обычно, а JSONL - отдельным полем.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()  # Подстановка аргументов в вызывающем потоке
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None  # Объект исключения не передается между потоками
+        return record
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Форматирование записей лога в JSON Lines (один объект JSON на строку).
+
+    Обязательные поля: ts, level, message. Структурированные поля
+    (request_id, event, model, latency_ms, tokens, status и любые другие,
+    переданные через **fields) добавляются как есть, что позволяет считать
+    задержки и долю ошибок без разбора текста сообщений.
+    """
+
+    def format(self, record) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(
+                timespec="milliseconds"
+            ),  # Время записи
+            "level": record.levelname,  # Уровень
+            "message": record.getMessage(),  # Текст сообщения
+        }
+        entry.update(
+            (key, value)
+            for key, value in vars(record).items()
+            if key not in _RECORD_ATTRIBUTES
+        )
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class CompressedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Обработчик файла лога с ротацией по размеру и по смене даты.
+
+    Ротированные файлы нумеруются (chat_app.log.1.gz - самый новый) и
+    сжимаются gzip в отдельном потоке, поэтому ни поток интерфейса, ни поток
+    записи логов не ждут сжатия. Хранится не более backup_count файлов,
+    более старые удаляются при очередной ротации.
+    """
+
+    def __init__(self, filename: str, max_bytes: int, backup_count: int):
+        """
+        Args:
+            filename (str): Путь к текущему файлу лога
+            max_bytes (int): Размер файла, после которого выполняется ротация
+            backup_count (int): Количество хранимых ротированных файлов
+        """
+        super().__init__(
+            filename,
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding="utf-8",  # Кодировка для поддержки Unicode
+            delay=True,  # Файл открывается при первой записи
+        )
+        self.namer = lambda name: f"{name}.gz"  # Имена ротированных файлов
+        self.rotator = self._compress_in_background
+        self.current_date = date.today()  # Дата записей в текущем файле
+        self._compression = None  # Поток сжатия последнего ротированного файла
+
+    def shouldRollover(self, record) -> bool:
+        """
+        Ротация при превышении размера или при наступлении нового дня.
+        """
+        if date.today() != self.current_date and self.backupCount > 0:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self):
+        """
+        Ротация файлов с ожиданием завершения предыдущего сжатия.
+
+        Сжатие выполняется быстрее, чем заполняется файл лога, поэтому
+        ожидание на практике не происходит; оно нужно лишь для того, чтобы
+        сдвиг нумерации не затронул еще не сжатый файл.
+        """
+        self.wait_for_compression()
+        self.current_date = date.today()
+        super().doRollover()
+
+    def _compress_in_background(self, source: str, dest: str):
+        """
+        Переименование текущего файла и его сжатие в фоновом потоке.
+
+        Args:
+            source (str): Путь к текущему файлу лога
+            dest (str): Путь к сжатому ротированному файлу (*.gz)
+        """
+        if not os.path.exists(source):
+            return
+        pending = dest[: -len(".gz")]  # Несжатая копия на время сжатия
+        os.replace(source, pending)  # Быстрое переименование в потоке записи
+        self._compression = threading.Thread(
+            target=self._compress, args=(pending, dest), daemon=True
+        )
+        self._compression.start()
+
+    @staticmethod
+    def _compress(source: str, dest: str):
+        """
+        Сжатие файла gzip с атомарной заменой результата.
+
+        Если сжатие не удалось, несжатый файл переименовывается в имя
+        с отметкой времени (chat_app.log.20260101-120000.failed): иначе
+        следующая ротация записала бы новый файл по тому же пути поверх
+        него. Ошибка выводится резервным обработчиком logging.lastResort
+        (stderr), а не в лог, файл которого не удалось обработать.
+        """
+        try:
+            with open(source, "rb") as src, gzip.open(f"{dest}.tmp", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(f"{dest}.tmp", dest)
+            os.remove(source)
+            return
+        except OSError as e:
+            error = e
+
+        kept = f"{source}.{datetime.now():%Y%m%d-%H%M%S}.failed"
+        try:
+            os.replace(source, kept)
+        except OSError:
+            kept = source  # Файл не удалось даже переименовать
+        try:
+            os.remove(f"{dest}.tmp")  # Неполный архив
+        except OSError:
+            pass
+        logging.lastResort.handle(
+            logging.makeLogRecord(
+                {
+                    "name": "ChatApp",
+                    "levelno": logging.ERROR,
+                    "levelname": "ERROR",
+                    "msg": f"Ошибка сжатия файла лога {source}: {error}; "
+                    f"несжатый файл сохранен как {kept}",
+                }
+            )
+        )
+
+    def wait_for_compression(self):
+        """
+        Ожидание завершения фонового сжатия (при ротации и завершении работы).
+        """
+        if self._compression is not None:
+            self._compression.join()
+            self._compression = None
 
 
 class AppLogger:
@@ -9,31 +257,63 @@ class AppLogger:
     Класс для логирования работы приложения.
 
     Обеспечивает:
-    - Сохранение логов в файлы с датой в имени
+    - Сохранение логов в файл с ротацией по размеру и дате и сжатием архивов
     - Вывод логов в консоль
     - Различные уровни логирования (debug, info, warning, error)
+      с изменением уровня во время работы
     - Форматирование сообщений с временными метками
+
+    Класс является синглтоном: все вызовы AppLogger() возвращают один
+    объект, а обработчики логгера "ChatApp" настраиваются один раз за время
+    работы процесса. Вызывающий поток только помещает запись в очередь
+    (QueueHandler); запись в файл и консоль выполняет фоновый поток
+    QueueListener, поэтому поток интерфейса не блокируется на вводе-выводе.
     """
 
-    def __init__(self):
+    _instance = None  # Единственный экземпляр логгера
+    _lock = threading.Lock()  # Защита от одновременной настройки
+    _listener = None  # Фоновый поток записи логов
+    _file_handler = None  # Обработчик файла с ротацией
+    _json_handler = None  # Обработчик структурированного файла JSONL
+    _handlers = ()  # Обработчики, обслуживаемые фоновым потоком
+    _queue = None  # Очередь записей лога
+
+    # Параметры, применяемые при настройке (см. configure)
+    _settings = {
+        "level": LOG_LEVEL,
+        "max_bytes": LOG_MAX_BYTES,
+        "backup_count": LOG_BACKUP_COUNT,
+        "structured": False,  # Дополнительный файл chat_app.jsonl
+    }
+
+    def __new__(cls):
         """
-        Инициализация системы логирования.
+        Возврат единственного экземпляра логгера.
+        """
+        with cls._lock:
+            if cls._instance is None:
+                instance = super().__new__(cls)
+                instance._configure()
+                cls._instance = instance
+        return cls._instance
+
+    def _configure(self):
+        """
+        Однократная настройка системы логирования.
 
         Настраивает:
         - Директорию для хранения логов
         - Форматирование сообщений
-        - Обработчики для файла и консоли
-        - Уровни логирования
+        - Обработчики для файла и консоли в фоновом потоке
+        - Неблокирующую очередь записей для логгера приложения
         """
         # Создание директории для хранения файлов логов
         self.logs_dir = "logs"
         if not os.path.exists(self.logs_dir):
             os.makedirs(self.logs_dir)
 
-        # Формирование имени файла лога с текущей датой
-        # Формат: chat_app_YYYY-MM-DD.log
-        current_date = datetime.now().strftime("%Y-%m-%d")
-        log_file = os.path.join(self.logs_dir, f"chat_app_{current_date}.log")
+        # Текущий файл лога; ротированные файлы: chat_app.log.N.gz
+        log_file = os.path.join(self.logs_dir, "chat_app.log")
 
         # Настройка формата сообщений лога
         # Формат: YYYY-MM-DD HH:MM:SS - LEVEL - Message
@@ -42,24 +322,212 @@ class AppLogger:
             datefmt="%Y-%m-%d %H:%M:%S",  # Формат даты и времени
         )
 
-        # Создание и настройка обработчика для записи в файл
-        file_handler = logging.FileHandler(
+        # Создание и настройка обработчика для записи в файл с ротацией
+        file_handler = CompressedRotatingFileHandler(
             log_file,  # Путь к файлу лога
-            encoding="utf-8",  # Кодировка для поддержки Unicode
+            max_bytes=self._settings["max_bytes"],  # Размер до ротации
+            backup_count=self._settings["backup_count"],  # Хранимые архивы
         )
         file_handler.setFormatter(formatter)  # Установка форматирования
+        AppLogger._file_handler = file_handler
 
         # Создание и настройка обработчика для вывода в консоль
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(formatter)  # Установка того же форматирования
 
+        # Неограниченная очередь: put_nowait никогда не блокирует вызывающий поток
+        log_queue = queue.SimpleQueue()
+        AppLogger._queue = log_queue
+        AppLogger._handlers = (file_handler, console_handler)
+
+        # Структурированный файл JSONL (если включен)
+        if self._settings["structured"]:
+            AppLogger._handlers += (self._create_json_handler(),)
+
+        # Фоновый поток, передающий записи из очереди в файл и консоль
+        self._start_listener()
+        atexit.register(AppLogger.shutdown)  # Запись оставшихся логов при выходе
+
         # Настройка основного логгера приложения
         self.logger = logging.getLogger("ChatApp")  # Создание логгера с именем
-        self.logger.setLevel(logging.DEBUG)  # Установка уровня логирования
-        self.logger.addHandler(file_handler)  # Добавление файлового обработчика
-        self.logger.addHandler(console_handler)  # Добавление консольного обработчика
+        self.logger.setLevel(self._settings["level"])  # Установка уровня логирования
+        for handler in list(self.logger.handlers):  # Удаление старых обработчиков
+            self.logger.removeHandler(handler)
+            handler.close()
+        self.logger.addHandler(StructuredQueueHandler(log_queue))
+        self.logger.propagate = False  # Без повторного вывода корневым логгером
+
+        # Идентификатор запроса добавляется до помещения записи в очередь
+        for log_filter in list(self.logger.filters):
+            self.logger.removeFilter(log_filter)
+        self.logger.addFilter(RequestIdFilter())
+
+    @classmethod
+    def _create_json_handler(cls) -> logging.Handler:
+        """
+        Создание обработчика структурированного файла logs/chat_app.jsonl.
+
+        Файл ротируется и сжимается по тем же правилам, что и текстовый лог.
+        """
+        handler = CompressedRotatingFileHandler(
+            os.path.join("logs", "chat_app.jsonl"),
+            max_bytes=cls._settings["max_bytes"],
+            backup_count=cls._settings["backup_count"],
+        )
+        handler.setFormatter(JsonLinesFormatter())
+        cls._json_handler = handler
+        return handler
+
+    @classmethod
+    def _start_listener(cls):
+        """
+        Запуск фонового потока записи с текущим набором обработчиков.
+        """
+        cls._listener = logging.handlers.QueueListener(
+            cls._queue,
+            *cls._handlers,
+            respect_handler_level=True,  # Учет уровней отдельных обработчиков
+        )
+        cls._listener.start()
+
+    @classmethod
+    def _set_structured(cls, enabled: bool):
+        """
+        Включение или отключение файла JSONL во время работы.
+
+        Фоновый поток перезапускается: старый поток записывает все
+        накопленные записи, новый продолжает чтение той же очереди.
+        """
+        cls._settings["structured"] = enabled
+        if cls._listener is None or enabled == (cls._json_handler is not None):
+            return
+
+        cls._listener.stop()
+        if enabled:
+            cls._handlers += (cls._create_json_handler(),)
+        else:
+            cls._handlers = tuple(h for h in cls._handlers if h is not cls._json_handler)
+            cls._json_handler.close()
+            cls._json_handler = None
+        cls._start_listener()
+
+    @classmethod
+    def configure(
+        cls,
+        level: int | str | None = None,
+        max_bytes: int | None = None,
+        backup_count: int | None = None,
+        structured: bool | None = None,
+    ):
+        """
+        Изменение параметров логирования.
+
+        Может вызываться как до первого создания AppLogger, так и во время
+        работы: новые значения сразу применяются к действующим обработчикам.
+
+        Args:
+            level (int | str | None): Уровень логирования ("DEBUG", "INFO", ...)
+            max_bytes (int | None): Размер файла лога до ротации (0 - без ротации
+                по размеру)
+            backup_count (int | None): Количество хранимых сжатых файлов
+            structured (bool | None): Запись структурированного лога
+                logs/chat_app.jsonl (см. JsonLinesFormatter)
+        """
+        with cls._lock:
+            if max_bytes is not None:
+                cls._settings["max_bytes"] = max_bytes
+            if backup_count is not None:
+                cls._settings["backup_count"] = backup_count
+            for handler in (cls._file_handler, cls._json_handler):
+                if handler is None:
+                    continue
+                handler.maxBytes = cls._settings["max_bytes"]
+                handler.backupCount = cls._settings["backup_count"]
+            if structured is not None:
+                cls._set_structured(structured)
+        if level is not None:
+            cls.set_level(level)
+
+    @classmethod
+    def configure_from_env(cls, environ=None):
+        """
+        Настройка логирования по переменным окружения при запуске.
+
+        Переменные:
+        - CHAT_APP_LOG_LEVEL: уровень логирования (по умолчанию INFO)
+        - CHAT_APP_LOG_JSON: 1/true/yes/on - дополнительно писать
+          структурированный лог logs/chat_app.jsonl
+
+        Неизвестный уровень не прерывает запуск: остается уровень
+        по умолчанию, а в лог записывается предупреждение.
+
+        Args:
+            environ (Mapping | None): Переменные окружения (по умолчанию os.environ)
+        """
+        environ = os.environ if environ is None else environ
+        structured = environ.get(LOG_JSON_ENV, "").strip().lower()
+        if structured:
+            cls.configure(structured=structured in ("1", "true", "yes", "on"))
+
+        level = environ.get(LOG_LEVEL_ENV, "").strip()
+        if not level:
+            return
+        try:
+            cls.configure(level=level)
+        except ValueError:
+            logger = cls()
+            logger.warning(
+                f"Неизвестный уровень логирования в {LOG_LEVEL_ENV}: {level!r}, "
+                f"используется {cls.get_level()}"
+            )
+
+    @classmethod
+    def set_level(cls, level: int | str):
+        """
+        Изменение уровня логирования без перезапуска приложения.
+
+        Args:
+            level (int | str): Уровень логирования, например logging.INFO или "INFO"
+
+        Raises:
+            ValueError: Если передано неизвестное имя уровня
+        """
+        if isinstance(level, str):
+            name = level.upper()
+            level = logging.getLevelName(name)
+            if not isinstance(level, int):
+                raise ValueError(f"Неизвестный уровень логирования: {name}")
+        cls._settings["level"] = level
+        logging.getLogger("ChatApp").setLevel(level)
+
+    @classmethod
+    def get_level(cls) -> str:
+        """
+        Текущий уровень логирования.
+
+        Returns:
+            str: Имя уровня ("DEBUG", "INFO", ...)
+        """
+        return logging.getLevelName(logging.getLogger("ChatApp").getEffectiveLevel())
+
+    @classmethod
+    def shutdown(cls):
+        """
+        Остановка фонового потока с записью всех оставшихся в очереди логов.
+
+        Вызывается автоматически при завершении процесса.
+        """
+        with cls._lock:
+            listener, cls._listener = cls._listener, None
+        if listener is not None:
+            listener.stop()  # Обработка оставшихся записей и остановка потока
+            for handler in listener.handlers:
+                handler.close()  # Освобождение файловых дескрипторов
+        for handler in (cls._file_handler, cls._json_handler):
+            if handler is not None:
+                handler.wait_for_compression()  # Завершение сжатия архива
 
-    def info(self, message: str):
+    def info(self, message: str, **fields):
         """
         Логирование информационного сообщения.
 
@@ -70,10 +538,12 @@ class AppLogger:
 
         Args:
             message (str): Текст информационного сообщения
+            **fields: Структурированные поля записи (request_id, model,
+                     latency_ms, tokens, status, ...) для лога JSONL
         """
-        self.logger.info(message)
+        self.logger.info(message, extra=fields)
 
-    def error(self, message: str, exc_info=None):
+    def error(self, message: str, exc_info=None, **fields):
         """
         Логирование ошибки.
 
@@ -86,10 +556,12 @@ class AppLogger:
             message (str): Текст сообщения об ошибке
             exc_info: Информация об исключении (по умолчанию None)
                      Если передано True, автоматически добавляет стек вызовов
+            **fields: Структурированные поля записи (request_id, model,
+                     latency_ms, tokens, status, ...) для лога JSONL
         """
-        self.logger.error(message, exc_info=exc_info)
+        self.logger.error(message, exc_info=exc_info, extra=fields)
 
-    def debug(self, message: str):
+    def debug(self, message: str, **fields):
         """
         Логирование отладочной информации.
 
@@ -100,10 +572,12 @@ class AppLogger:
 
         Args:
             message (str): Текст отладочного сообщения
+            **fields: Структурированные поля записи (request_id, model,
+                     latency_ms, tokens, status, ...) для лога JSONL
         """
-        self.logger.debug(message)
+        self.logger.debug(message, extra=fields)
 
-    def warning(self, message: str):
+    def warning(self, message: str, **fields):
         """
         Логирование предупреждения.
 
@@ -114,5 +588,7 @@ class AppLogger:
 
         Args:
             message (str): Текст предупреждения
+            **fields: Структурированные поля записи (request_id, model,
+                     latency_ms, tokens, status, ...) для лога JSONL
         """
-        self.logger.warning(message)
+        self.logger.warning(message, extra=fields)
@@ -0,0 +1,238 @@
+# Импорт необходимых библиотек
+import asyncio  # Измерение задержки цикла событий
+import os  # Информация о процессе и открытых файлах
+import sys  # Определение платформы
+import threading  # Фоновый поток сбора метрик
+import time  # Библиотека для работы с временными метками
+from collections import deque  # Кольцевой буфер истории метрик
+
+try:
+    import psutil  # Точные метрики процесса (необязательная зависимость)
+except ImportError:
+    psutil = None
+
+# Интервал сбора метрик (секунды)
+SAMPLE_INTERVAL = 5.0
+
+# Количество хранимых снимков метрик (10 минут при интервале 5 секунд)
+HISTORY_SIZE = 120
+
+# Интервал проверки задержки цикла событий (секунды)
+LOOP_LAG_INTERVAL = 0.5
+
+# Задержка цикла событий, начиная с которой интерфейс заметно "подвисает" (мс)
+LOOP_LAG_WARNING_MS = 200
+
+
+class AppMonitor:
+    """
+    Класс для мониторинга производительности приложения.
+
+    Отслеживает:
+    - Загрузку процессора процессом (%)
+    - Используемую память (RSS, МБ)
+    - Количество потоков
+    - Количество открытых файлов и соединений
+    - Задержку цикла событий asyncio (насколько позже запланированного
+      просыпается задача - показатель блокировки интерфейса)
+
+    Метрики собираются фоновым потоком с заданным интервалом; снимки
+    хранятся в кольцевом буфере фиксированного размера. При наличии psutil
+    используются его данные, иначе - стандартная библиотека и /proc.
+    """
+
+    def __init__(
+        self, interval: float = SAMPLE_INTERVAL, history_size: int = HISTORY_SIZE
+    ):
+        """
+        Инициализация системы мониторинга.
+
+        Args:
+            interval (float): Интервал сбора метрик в секундах
+            history_size (int): Количество хранимых снимков метрик
+        """
+        self.interval = interval
+        self.history = deque(maxlen=history_size)  # Кольцевой буфер снимков
+        self.process = psutil.Process() if psutil else None
+
+        # Состояние для расчета загрузки процессора между снимками
+        self._last_cpu_time = time.process_time()
+        self._last_wall_time = time.monotonic()
+
+        # Задержка цикла событий (обновляется задачей watch_event_loop)
+        self._loop_lag_ms = 0.0  # Последнее измерение
+        self._loop_lag_max_ms = 0.0  # Максимум с последнего снимка
+
+        self._lock = threading.Lock()  # Защита истории и счетчиков задержки
+        self._stop = threading.Event()  # Сигнал остановки фонового потока
+        self._thread = None  # Фоновый поток сбора метрик
+
+    def start(self):
+        """
+        Запуск фонового сбора метрик (повторный вызов игнорируется).
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="AppMonitor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """
+        Остановка фонового сбора метрик.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+            self._thread = None
+
+    def _run(self):
+        """
+        Основной цикл фонового потока: снимок метрик раз в интервал.
+        """
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    async def watch_event_loop(self, interval: float = LOOP_LAG_INTERVAL):
+        """
+        Задача измерения задержки цикла событий.
+
+        Задача засыпает на interval и измеряет, насколько позже она
+        проснулась. Запускается в цикле событий интерфейса, например
+        через page.run_task(monitor.watch_event_loop).
+
+        Args:
+            interval (float): Интервал проверки в секундах
+        """
+        loop = asyncio.get_running_loop()
+        while not self._stop.is_set():
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            lag_ms = max(0.0, (loop.time() - expected) * 1000)
+            with self._lock:
+                self._loop_lag_ms = lag_ms
+                self._loop_lag_max_ms = max(self._loop_lag_max_ms, lag_ms)
+
+    def sample(self) -> dict:
+        """
+        Снимок текущих метрик с добавлением в историю.
+
+        Returns:
+            dict: Снимок метрик (см. get_metrics)
+        """
+        # Загрузка процессора как доля процессорного времени за интервал
+        cpu_time = time.process_time()
+        wall_time = time.monotonic()
+        elapsed = wall_time - self._last_wall_time
+        cpu_percent = (
+            (cpu_time - self._last_cpu_time) / elapsed * 100 if elapsed > 0 else 0.0
+        )
+        self._last_cpu_time, self._last_wall_time = cpu_time, wall_time
+
+        with self._lock:
+            loop_lag_ms = self._loop_lag_ms
+            loop_lag_max_ms = self._loop_lag_max_ms
+            self._loop_lag_max_ms = loop_lag_ms  # Новый интервал наблюдения
+
+        snapshot = {
+            "timestamp": time.time(),  # Время снимка
+            "cpu_percent": round(cpu_percent, 1),  # Загрузка процессора
+            "memory_mb": round(self._memory_rss() / (1024 * 1024), 1),  # Память
+            "threads": self._thread_count(),  # Количество потоков
+            "open_files": self._open_files(),  # Открытые файлы и сокеты
+            "loop_lag_ms": round(loop_lag_ms, 1),  # Задержка цикла событий
+            "loop_lag_max_ms": round(loop_lag_max_ms, 1),  # Максимум за интервал
+        }
+
+        with self._lock:
+            self.history.append(snapshot)
+        return snapshot
+
+    def get_metrics(self) -> dict:
+        """
+        Последний снимок метрик (при отсутствии - снимается немедленно).
+
+        Returns:
+            dict: Словарь с ключами timestamp, cpu_percent, memory_mb,
+                 threads, open_files (None, если недоступно), loop_lag_ms,
+                 loop_lag_max_ms
+        """
+        with self._lock:
+            if self.history:
+                return dict(self.history[-1])
+        return self.sample()
+
+    def get_history(self) -> list:
+        """
+        История снимков метрик от старых к новым.
+
+        Returns:
+            list: Список словарей в формате get_metrics
+        """
+        with self._lock:
+            return list(self.history)
+
+    def log_metrics(self, logger):
+        """
+        Запись текущих метрик в лог.
+
+        Args:
+            logger (AppLogger): Логгер приложения
+        """
+        metrics = self.get_metrics()
+        message = (
+            f"CPU: {metrics['cpu_percent']}%, "
+            f"память: {metrics['memory_mb']} МБ, "
+            f"потоки: {metrics['threads']}, "
+            f"файлы: {metrics['open_files']}, "
+            f"задержка цикла: {metrics['loop_lag_ms']} мс"
+        )
+        if metrics["loop_lag_max_ms"] >= LOOP_LAG_WARNING_MS:
+            logger.warning(f"Интерфейс блокировался. {message}", event="metrics", **metrics)
+        else:
+            logger.debug(f"Метрики: {message}", event="metrics", **metrics)
+
+    def _memory_rss(self) -> int:
+        """
+        Текущий объем резидентной памяти процесса в байтах.
+        """
+        if self.process is not None:
+            return self.process.memory_info().rss
+        try:
+            with open("/proc/self/statm") as f:  # Linux: размер в страницах
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            pass
+        try:
+            import resource  # Пиковая память (Unix), если текущая недоступна
+
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak if sys.platform == "darwin" else peak * 1024
+        except ImportError:
+            return 0
+
+    def _thread_count(self) -> int:
+        """
+        Количество потоков процесса (включая потоки вне Python).
+        """
+        if self.process is not None:
+            return self.process.num_threads()
+        try:
+            return len(os.listdir("/proc/self/task"))
+        except OSError:
+            return threading.active_count()
+
+    def _open_files(self) -> int | None:
+        """
+        Количество открытых файловых дескрипторов (дескрипторов в Windows).
+        """
+        if self.process is not None:
+            if sys.platform == "win32":
+                return self.process.num_handles()
+            return self.process.num_fds()
+        try:
+            return len(os.listdir("/proc/self/fd"))
+        except OSError:
+            return None
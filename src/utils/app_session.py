@@ -0,0 +1,185 @@
+# Импорт необходимых библиотек
+import threading  # Защита реестра сессий
+import time  # Библиотека для работы с временными метками
+
+from src.api.async_openrouter import (
+    AsyncOpenRouterClient,
+)  # Асинхронный клиент OpenRouter для обработчиков событий
+from src.api.openrouter import OpenRouterClient  # Синхронный клиент OpenRouter
+from src.ui.model_search import ModelSearchIndex  # Индекс поиска моделей
+from src.utils.app_analytics import AppAnalytics  # Статистика использования
+from src.utils.app_balance import AppBalance  # Фоновое обновление баланса
+from src.utils.app_cache import AppCache  # Кэш истории чата и каталога моделей
+from src.utils.app_context import AppContext  # Контекст диалога
+from src.utils.app_logger import AppLogger  # Логгер приложения
+from src.utils.app_monitor import AppMonitor  # Мониторинг производительности
+
+
+class AppSession:
+    """
+    Службы приложения для одного вошедшего пользователя.
+
+    Создается один раз на ключ API и живет вне представлений страниц:
+    клиенты API (с загруженным каталогом моделей), кэш, логгер, аналитика
+    (с восстановленной историей), контекст диалога и монитор переживают
+    переходы между страницами. Повторное открытие чата берет готовую
+    сессию и не повторяет сетевые запросы и чтение базы.
+
+    Фоновые задачи, которые должны существовать в одном экземпляре
+    (поток монитора, задача задержки цикла событий, обновление баланса),
+    запускаются сессией один раз. Задачи конкретного представления
+    проверяют view_generation и завершаются, когда представление заменено
+    новым.
+
+    Одновременно активна только сессия последнего вошедшего пользователя:
+    при входе с другим ключом API предыдущая сессия закрывается.
+    """
+
+    _sessions = {}  # Ключ API -> сессия
+    _lock = threading.Lock()  # Защита реестра от одновременного создания
+    current = None  # Сессия последнего вошедшего пользователя
+
+    def __init__(self, api_key: str):
+        """
+        Создание служб сессии.
+
+        Args:
+            api_key (str): Ключ API OpenRouter пользователя
+        """
+        self.api_key = api_key
+        self.created_at = time.time()
+        self.logger = AppLogger()  # Логгер приложения (синглтон)
+        self.cache = AppCache()  # Кэш истории и каталога моделей
+        self.api_client = OpenRouterClient(
+            api_key, cache=self.cache
+        )  # Клиент API (каталог моделей из кэша)
+        self.async_client = AsyncOpenRouterClient(
+            api_key, cache=self.cache
+        )  # Клиент для асинхронных обработчиков
+        self.context = AppContext(self.cache)  # Окно истории диалога
+        self.analytics = AppAnalytics(self.cache)  # Аналитика с историей из базы
+        self.monitor = AppMonitor()  # Мониторинг производительности
+        self.balance = AppBalance(
+            self.async_client, logger=self.logger
+        )  # Баланс аккаунта (последнее значение сохраняется между переходами)
+
+        self._search_index = None  # Индекс поиска по текущему каталогу моделей
+
+        self.view_generation = 0  # Номер текущего представления чата
+        self._loop_tasks_started = False  # Задачи цикла событий запущены
+
+    @classmethod
+    def get(cls, api_key: str | None = None) -> "AppSession":
+        """
+        Сессия пользователя: существующая или новая.
+
+        Если ключ принадлежит другому пользователю, чем текущая сессия,
+        текущая сессия закрывается (см. close).
+
+        Args:
+            api_key (str | None): Ключ API; без ключа возвращается сессия
+                последнего вошедшего пользователя
+
+        Returns:
+            AppSession: Сессия пользователя
+
+        Raises:
+            ValueError: Если ключ не передан и сессии еще нет
+        """
+        with cls._lock:
+            if api_key is None:
+                if cls.current is None:
+                    raise ValueError("Ключ API OpenRouter не найден.")
+                return cls.current
+
+            previous = cls.current
+            if previous is not None and previous.api_key != api_key:
+                # Вход другого пользователя: службы прежней сессии не нужны
+                cls._sessions.pop(previous.api_key, None)
+                previous._stop()
+                previous.logger.info("Сессия пользователя закрыта")
+
+            session = cls._sessions.get(api_key)
+            if session is None:
+                session = cls._sessions[api_key] = cls(api_key)
+                session.logger.info("Сессия пользователя создана")
+            cls.current = session
+            return session
+
+    def get_search_index(self, models: list) -> ModelSearchIndex:
+        """
+        Индекс поиска по каталогу моделей.
+
+        Построение индекса занимает десятки миллисекунд, поэтому он
+        строится один раз на каталог: повторное открытие чата с тем же
+        списком моделей берет готовый индекс, новый список (каталог
+        обновлен) строит индекс заново.
+
+        Args:
+            models (list): Список моделей (api_client.available_models)
+
+        Returns:
+            ModelSearchIndex: Индекс поиска по этому списку
+        """
+        index = self._search_index
+        if index is None or index.models is not models:
+            index = self._search_index = ModelSearchIndex(models)
+        return index
+
+    def begin_view(self, page) -> int:
+        """
+        Регистрация нового представления чата.
+
+        При первом вызове запускает фоновые службы сессии: поток монитора,
+        задачу измерения задержки цикла событий страницы и обновление баланса.
+
+        Args:
+            page (ft.Page): Страница Flet, на которой строится представление
+
+        Returns:
+            int: Номер представления (задачи представления работают,
+                 пока он совпадает с view_generation)
+        """
+        self.view_generation += 1
+        self.monitor.start()  # Повторный запуск игнорируется
+        if not self._loop_tasks_started:
+            page.run_task(self.monitor.watch_event_loop)
+            self._loop_tasks_started = True
+        self.balance.start(page)  # Повторный запуск игнорируется
+        return self.view_generation
+
+    def end_view(self):
+        """
+        Закрытие текущего представления чата (переход на другую страницу).
+
+        Задачи представления завершаются при следующей проверке
+        is_current_view, обновление баланса останавливается;
+        begin_view запускает его снова.
+        """
+        self.view_generation += 1
+        self.balance.stop()
+
+    def is_current_view(self, generation: int) -> bool:
+        """
+        Проверка, что представление с данным номером еще актуально.
+        """
+        return generation == self.view_generation
+
+    def close(self):
+        """
+        Завершение сессии (например, при выходе пользователя):
+        остановка фоновых служб и удаление из реестра.
+        """
+        with AppSession._lock:
+            AppSession._sessions.pop(self.api_key, None)
+            if AppSession.current is self:
+                AppSession.current = None
+        self._stop()
+
+    def _stop(self):
+        """
+        Остановка фоновых служб сессии и задач ее представлений.
+        """
+        self.view_generation += 1  # Задачи открытого представления завершаются
+        self.monitor.stop()
+        self.balance.stop()
@@ -0,0 +1,123 @@
+# Импорт необходимых библиотек
+import math  # Логарифмы для вычисления номера корзины
+
+# Относительная точность оценки квантилей (2%)
+DEFAULT_RELATIVE_ACCURACY = 0.02
+
+# Диапазон учитываемых значений времени ответа (секунды); значения вне
+# диапазона попадают в крайние корзины, поэтому число корзин ограничено
+MIN_LATENCY = 0.001
+MAX_LATENCY = 3600.0
+
+# Границы корзин гистограммы для отображения (секунды)
+DISPLAY_EDGES = (0.5, 1, 2, 5, 10, 30)
+
+
+class LatencySketch:
+    """
+    Потоковый скетч квантилей времени ответа (по принципу DDSketch).
+
+    Значения раскладываются по логарифмическим корзинам: корзина i содержит
+    значения из (gamma^(i-1), gamma^i], где gamma = (1 + a) / (1 - a).
+    Квантиль оценивается с относительной ошибкой не более a.
+
+    Свойства:
+    - Ограниченная память: не более ~400 корзин при точности 2%
+    - Слияние скетчей (между моделями и сессиями) - сложение счетчиков
+    - Корзины являются гистограммой и хранятся в базе данных как есть
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        """
+        Args:
+            relative_accuracy (float): Допустимая относительная ошибка квантилей
+        """
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}  # Количество значений по номеру корзины
+        self.count = 0  # Общее количество значений
+
+    def bucket_index(self, value: float) -> int:
+        """
+        Номер корзины для значения (с учетом допустимого диапазона).
+
+        Args:
+            value (float): Время ответа в секундах
+
+        Returns:
+            int: Номер корзины
+        """
+        value = min(max(value, MIN_LATENCY), MAX_LATENCY)
+        return math.ceil(math.log(value) / self.log_gamma)
+
+    def bucket_value(self, index: int) -> float:
+        """
+        Представительное значение корзины (с минимальной относительной ошибкой).
+        """
+        return 2 * self.gamma**index / (self.gamma + 1)
+
+    def add(self, value: float, count: int = 1):
+        """
+        Добавление значения в скетч.
+
+        Args:
+            value (float): Время ответа в секундах
+            count (int): Количество одинаковых значений
+        """
+        self.add_bucket(self.bucket_index(value), count)
+
+    def add_bucket(self, index: int, count: int):
+        """
+        Добавление счетчика корзины (например, загруженного из базы данных).
+        """
+        self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += count
+
+    def merge(self, other: "LatencySketch"):
+        """
+        Слияние с другим скетчем той же точности.
+        """
+        for index, count in other.buckets.items():
+            self.add_bucket(index, count)
+
+    def quantile(self, q: float) -> float:
+        """
+        Оценка квантиля.
+
+        Args:
+            q (float): Уровень квантиля от 0 до 1 (например, 0.9 для p90)
+
+        Returns:
+            float: Оценка значения в секундах (0, если скетч пуст)
+        """
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                return self.bucket_value(index)
+        return self.bucket_value(max(self.buckets))
+
+    def histogram(self, edges: tuple = DISPLAY_EDGES) -> list:
+        """
+        Свертка корзин в гистограмму с заданными границами.
+
+        Args:
+            edges (tuple): Возрастающие границы интервалов в секундах
+
+        Returns:
+            list: Список пар (подпись интервала, количество значений)
+        """
+        labels = [f"< {edges[0]} с"]
+        labels += [f"{low}-{high} с" for low, high in zip(edges, edges[1:])]
+        labels.append(f"> {edges[-1]} с")
+
+        counts = [0] * len(labels)
+        for index, count in self.buckets.items():
+            value = self.bucket_value(index)
+            position = sum(1 for edge in edges if value >= edge)
+            counts[position] += count
+        return list(zip(labels, counts))
@@ -0,0 +1,166 @@
+# Импорт необходимых библиотек
+import builtins  # Перехват оператора import для замера времени загрузки модулей
+import importlib  # Загрузка модулей по имени
+import sys  # Список уже загруженных модулей
+import threading  # Замер только в потоке, начавшем запуск
+import time  # Библиотека для измерения интервалов
+
+# Количество самых медленных модулей в отчете
+REPORT_TOP_MODULES = 15
+
+
+class AppStartup:
+    """
+    Класс для замера времени холодного запуска приложения.
+
+    На время запуска оператор import оборачивается функцией, которая для
+    каждого впервые загружаемого модуля измеряет собственное время
+    загрузки (без вложенных импортов) и полное время (с вложенными), как
+    это делает `python -X importtime`. Загрузчики модулей не меняются,
+    поэтому замер работает и в собранном PyInstaller приложении.
+    Дополнительно отмечаются этапы запуска (mark), например первый кадр.
+
+    Все методы - методы класса: состояние замера общее для процесса.
+    """
+
+    started_at = None  # Начало замера (time.perf_counter)
+    imports = {}  # Модуль -> (собственное время, полное время) в секундах
+    marks = []  # Этапы запуска: (название, секунды от начала)
+    _original_import = None  # Исходная функция builtins.__import__
+    _stack = []  # Время вложенных импортов для текущих уровней вложенности
+    _thread_id = None  # Поток, в котором ведется замер
+
+    @classmethod
+    def begin(cls):
+        """
+        Начало замера. Вызывается как можно раньше - до импорта flet.
+        """
+        if cls._original_import is not None:
+            return
+        cls.started_at = time.perf_counter()
+        cls._thread_id = threading.get_ident()
+        cls._original_import = builtins.__import__
+        builtins.__import__ = cls._timed_import
+
+    @classmethod
+    def _timed_import(cls, name, globals=None, locals=None, fromlist=(), level=0):
+        """
+        Оператор import с замером времени загрузки новых модулей.
+        """
+        original = cls._original_import
+        if (
+            level
+            or name in sys.modules
+            or threading.get_ident() != cls._thread_id
+        ):
+            # Относительный, повторный или фоновый импорт - без замера
+            return original(name, globals, locals, fromlist, level)
+        return cls._measure(name, original, name, globals, locals, fromlist, level)
+
+    @classmethod
+    def _measure(cls, name: str, load, *args):
+        """
+        Загрузка модуля с учетом собственного и полного времени.
+
+        Args:
+            name (str): Имя модуля
+            load (callable): Функция загрузки
+            *args: Аргументы функции загрузки
+        """
+        cls._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return load(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = cls._stack.pop()
+            if cls._stack:
+                cls._stack[-1] += elapsed
+            if name in sys.modules:
+                cls.imports[name] = (elapsed - nested, elapsed)
+
+    @classmethod
+    def import_module(cls, name: str):
+        """
+        Загрузка модуля по имени с замером времени (importlib.import_module
+        не проходит через оператор import и иначе не был бы учтен).
+
+        Args:
+            name (str): Полное имя модуля
+
+        Returns:
+            module: Загруженный модуль
+        """
+        if (
+            cls._original_import is None
+            or name in sys.modules
+            or threading.get_ident() != cls._thread_id
+        ):
+            return importlib.import_module(name)
+        return cls._measure(name, importlib.import_module, name)
+
+    @classmethod
+    def mark(cls, name: str):
+        """
+        Отметка этапа запуска.
+
+        Args:
+            name (str): Название этапа (например, "first_view")
+        """
+        if cls.started_at is not None:
+            cls.marks.append((name, time.perf_counter() - cls.started_at))
+
+    @classmethod
+    def finish(cls):
+        """
+        Завершение замера импортов (оператор import восстанавливается).
+        """
+        if cls._original_import is not None:
+            builtins.__import__ = cls._original_import
+            cls._original_import = None
+
+    @classmethod
+    def get_report(cls, top: int = REPORT_TOP_MODULES) -> dict:
+        """
+        Отчет о времени запуска.
+
+        Args:
+            top (int): Количество самых медленных модулей в отчете
+
+        Returns:
+            dict: Словарь с ключами:
+                - marks: {этап: миллисекунды от начала}
+                - imports_ms: суммарное собственное время импортов
+                - modules: количество загруженных модулей
+                - slowest: список (модуль, собственное мс, полное мс)
+        """
+        slowest = sorted(cls.imports.items(), key=lambda item: -item[1][0])[:top]
+        return {
+            "marks": {name: round(seconds * 1000, 1) for name, seconds in cls.marks},
+            "imports_ms": round(sum(own for own, _ in cls.imports.values()) * 1000, 1),
+            "modules": len(cls.imports),
+            "slowest": [
+                (name, round(own * 1000, 1), round(total * 1000, 1))
+                for name, (own, total) in slowest
+            ],
+        }
+
+    @classmethod
+    def log_report(cls, logger, top: int = REPORT_TOP_MODULES):
+        """
+        Запись отчета о запуске в лог.
+
+        Args:
+            logger (AppLogger): Логгер приложения
+            top (int): Количество самых медленных модулей в отчете
+        """
+        report = cls.get_report(top)
+        marks = ", ".join(f"{name}: {ms} мс" for name, ms in report["marks"].items())
+        logger.info(
+            f"Запуск: {marks}; импорт {report['modules']} модулей - "
+            f"{report['imports_ms']} мс",
+            event="startup",
+            **report,
+        )
+        for name, own, total in report["slowest"]:
+            logger.debug(f"Импорт {name}: {own} мс (с зависимостями {total} мс)")
@@ -0,0 +1,321 @@
+"""
+Общие данные тестов: каталог моделей размера реального каталога OpenRouter.
+"""
+
+import pytest
+
+# Провайдер -> (подпись в названии, модели провайдера)
+PROVIDERS = {
+    "openai": (
+        "OpenAI",
+        [
+            "gpt-4o",
+            "gpt-4o-mini",
+            "gpt-4-turbo",
+            "gpt-4.1",
+            "gpt-4.1-mini",
+            "gpt-4.1-nano",
+            "gpt-3.5-turbo",
+            "o1",
+            "o1-mini",
+            "o3-mini",
+            "o4-mini",
+            "chatgpt-4o-latest",
+            "gpt-5",
+            "gpt-5-mini",
+            "gpt-oss-120b",
+            "gpt-oss-20b",
+        ],
+    ),
+    "anthropic": (
+        "Anthropic",
+        [
+            "claude-3-haiku",
+            "claude-3-opus",
+            "claude-3.5-sonnet",
+            "claude-3.5-haiku",
+            "claude-3.7-sonnet",
+            "claude-sonnet-4",
+            "claude-opus-4",
+            "claude-opus-4.1",
+            "claude-3-sonnet",
+        ],
+    ),
+    "google": (
+        "Google",
+        [
+            "gemini-pro-1.5",
+            "gemini-flash-1.5",
+            "gemini-flash-1.5-8b",
+            "gemini-2.0-flash-001",
+            "gemini-2.0-flash-lite-001",
+            "gemini-2.5-pro",
+            "gemini-2.5-flash",
+            "gemini-2.5-flash-lite",
+            "gemma-2-9b-it",
+            "gemma-2-27b-it",
+            "gemma-3-4b-it",
+            "gemma-3-12b-it",
+            "gemma-3-27b-it",
+            "gemma-3n-e4b-it",
+        ],
+    ),
+    "meta-llama": (
+        "Meta",
+        [
+            "llama-3-8b-instruct",
+            "llama-3-70b-instruct",
+            "llama-3.1-8b-instruct",
+            "llama-3.1-70b-instruct",
+            "llama-3.1-405b-instruct",
+            "llama-3.2-1b-instruct",
+            "llama-3.2-3b-instruct",
+            "llama-3.2-11b-vision-instruct",
+            "llama-3.2-90b-vision-instruct",
+            "llama-3.3-70b-instruct",
+            "llama-4-scout",
+            "llama-4-maverick",
+            "llama-guard-3-8b",
+            "llama-guard-4-12b",
+        ],
+    ),
+    "mistralai": (
+        "Mistral",
+        [
+            "mistral-7b-instruct",
+            "mistral-nemo",
+            "mistral-small",
+            "mistral-small-3.1-24b-instruct",
+            "mistral-small-3.2-24b-instruct",
+            "mistral-medium-3",
+            "mistral-large",
+            "mistral-large-2411",
+            "mixtral-8x7b-instruct",
+            "mixtral-8x22b-instruct",
+            "codestral-2501",
+            "codestral-2508",
+            "devstral-small",
+            "devstral-medium",
+            "ministral-3b",
+            "ministral-8b",
+            "pixtral-12b",
+            "pixtral-large-2411",
+            "magistral-small-2506",
+            "magistral-medium-2506",
+            "mistral-saba",
+        ],
+    ),
+    "deepseek": (
+        "DeepSeek",
+        [
+            "deepseek-chat",
+            "deepseek-chat-v3-0324",
+            "deepseek-chat-v3.1",
+            "deepseek-r1",
+            "deepseek-r1-0528",
+            "deepseek-r1-distill-llama-70b",
+            "deepseek-r1-distill-qwen-32b",
+            "deepseek-r1-distill-qwen-14b",
+            "deepseek-prover-v2",
+            "deepseek-coder",
+            "deepseek-v3.1-terminus",
+        ],
+    ),
+    "qwen": (
+        "Qwen",
+        [
+            "qwen-2.5-7b-instruct",
+            "qwen-2.5-72b-instruct",
+            "qwen-2.5-coder-32b-instruct",
+            "qwen-2.5-vl-7b-instruct",
+            "qwen2.5-vl-32b-instruct",
+            "qwen2.5-vl-72b-instruct",
+            "qwen-max",
+            "qwen-plus",
+            "qwen-turbo",
+            "qwq-32b",
+            "qwen3-8b",
+            "qwen3-14b",
+            "qwen3-32b",
+            "qwen3-30b-a3b",
+            "qwen3-235b-a22b",
+            "qwen3-coder",
+            "qwen3-coder-30b-a3b-instruct",
+            "qwen3-max",
+            "qwen3-next-80b-a3b-instruct",
+            "qwen3-vl-235b-a22b-instruct",
+        ],
+    ),
+    "x-ai": (
+        "xAI",
+        [
+            "grok-2-1212",
+            "grok-2-vision-1212",
+            "grok-3",
+            "grok-3-mini",
+            "grok-4",
+            "grok-code-fast-1",
+            "grok-4-fast",
+        ],
+    ),
+    "cohere": (
+        "Cohere",
+        [
+            "command-r",
+            "command-r-plus",
+            "command-r7b-12-2024",
+            "command-a",
+            "command-r-08-2024",
+            "command-r-plus-08-2024",
+        ],
+    ),
+    "microsoft": (
+        "Microsoft",
+        [
+            "phi-3-mini-128k-instruct",
+            "phi-3-medium-128k-instruct",
+            "phi-3.5-mini-128k-instruct",
+            "phi-4",
+            "phi-4-multimodal-instruct",
+            "phi-4-reasoning-plus",
+            "wizardlm-2-8x22b",
+            "mai-ds-r1",
+        ],
+    ),
+    "nvidia": (
+        "NVIDIA",
+        [
+            "llama-3.1-nemotron-70b-instruct",
+            "llama-3.1-nemotron-ultra-253b-v1",
+            "llama-3.3-nemotron-super-49b-v1",
+            "nemotron-nano-9b-v2",
+        ],
+    ),
+    "amazon": ("Amazon", ["nova-lite-v1", "nova-micro-v1", "nova-pro-v1"]),
+    "perplexity": (
+        "Perplexity",
+        [
+            "sonar",
+            "sonar-pro",
+            "sonar-reasoning",
+            "sonar-reasoning-pro",
+            "sonar-deep-research",
+            "r1-1776",
+        ],
+    ),
+    "nousresearch": (
+        "Nous",
+        [
+            "hermes-2-pro-llama-3-8b",
+            "hermes-3-llama-3.1-70b",
+            "hermes-3-llama-3.1-405b",
+            "deephermes-3-llama-3-8b-preview",
+            "hermes-4-70b",
+            "hermes-4-405b",
+        ],
+    ),
+    "ai21": (
+        "AI21",
+        ["jamba-1.6-large", "jamba-1.6-mini", "jamba-large-1.7", "jamba-mini-1.7"],
+    ),
+    "inflection": ("Inflection", ["inflection-3-pi", "inflection-3-productivity"]),
+    "liquid": ("Liquid", ["lfm-3b", "lfm-7b", "lfm-40b"]),
+    "moonshotai": (
+        "MoonshotAI",
+        ["kimi-k2", "kimi-k2-0905", "kimi-vl-a3b-thinking", "kimi-dev-72b"],
+    ),
+    "z-ai": ("Z.AI", ["glm-4-32b", "glm-4.5", "glm-4.5-air", "glm-4.5v", "glm-4.6"]),
+    "thudm": ("THUDM", ["glm-z1-32b", "glm-4.1v-9b-thinking"]),
+    "minimax": ("MiniMax", ["minimax-01", "minimax-m1"]),
+    "baidu": (
+        "Baidu",
+        ["ernie-4.5-300b-a47b", "ernie-4.5-21b-a3b", "ernie-4.5-vl-424b-a47b"],
+    ),
+    "tencent": ("Tencent", ["hunyuan-a13b-instruct"]),
+    "bytedance": ("ByteDance", ["ui-tars-1.5-7b", "seed-oss-36b-instruct"]),
+    "arcee-ai": (
+        "Arcee AI",
+        ["virtuoso-large", "coder-large", "maestro-reasoning", "spotlight", "afm-4.5b"],
+    ),
+    "sao10k": (
+        "Sao10K",
+        [
+            "l3-euryale-70b",
+            "l3.1-euryale-70b",
+            "l3.3-euryale-70b",
+            "l3-lunaris-8b",
+            "l3.1-70b-hanami-x1",
+        ],
+    ),
+    "gryphe": ("MythoMax", ["mythomax-l2-13b"]),
+    "thedrummer": (
+        "TheDrummer",
+        [
+            "rocinante-12b",
+            "unslopnemo-12b",
+            "anubis-70b-v1.1",
+            "skyfall-36b-v2",
+            "cydonia-24b-v4.1",
+        ],
+    ),
+    "neversleep": ("NeverSleep", ["llama-3.1-lumimaid-8b", "noromaid-20b"]),
+    "alpindale": ("Goliath", ["goliath-120b"]),
+    "anthracite-org": ("Magnum", ["magnum-v2-72b", "magnum-v4-72b"]),
+    "cognitivecomputations": (
+        "Dolphin",
+        [
+            "dolphin-mixtral-8x22b",
+            "dolphin3.0-mistral-24b",
+            "dolphin3.0-r1-mistral-24b",
+        ],
+    ),
+    "eleutherai": ("EleutherAI", ["llemma_7b"]),
+    "allenai": (
+        "AllenAI",
+        ["olmo-2-0325-32b-instruct", "molmo-7b-d", "olmo-7b-instruct"],
+    ),
+    "inception": ("Inception", ["mercury", "mercury-coder"]),
+    "openrouter": ("OpenRouter", ["auto"]),
+    "switchpoint": ("Switchpoint", ["router"]),
+    "morph": ("Morph", ["morph-v3-fast", "morph-v3-large"]),
+    "relace": ("Relace", ["relace-apply-3"]),
+    "mancer": ("Mancer", ["weaver"]),
+    "undi95": ("ReMM", ["remm-slerp-l2-13b"]),
+    "aion-labs": ("AionLabs", ["aion-1.0", "aion-1.0-mini", "aion-rp-llama-3.1-8b"]),
+    "opengvlab": ("OpenGVLab", ["internvl3-14b", "internvl3-78b"]),
+    "tngtech": ("TNG", ["deepseek-r1t-chimera", "deepseek-r1t2-chimera"]),
+    "shisa-ai": ("Shisa AI", ["shisa-v2-llama3.3-70b"]),
+    "stepfun-ai": ("StepFun", ["step3"]),
+}
+
+
+def _title(slug: str) -> str:
+    """Название модели из идентификатора: "gpt-4o-mini" -> "GPT 4O Mini"."""
+    return " ".join(
+        part.upper() if any(ch.isdigit() for ch in part) else part.capitalize()
+        for part in slug.replace("-", " ").split()
+    )
+
+
+@pytest.fixture(scope="session")
+def model_catalog() -> list:
+    """
+    Каталог моделей в формате OpenRouterClient.available_models.
+
+    Бесплатные варианты (":free") повторяют слова основных моделей, как
+    в реальном каталоге, поэтому словарь индекса поиска имеет реальный размер.
+    """
+    models = []
+    for provider, (label, slugs) in PROVIDERS.items():
+        for slug in slugs:
+            models.append(
+                {"id": f"{provider}/{slug}", "name": f"{label}: {_title(slug)}"}
+            )
+            if slug.endswith(("instruct", "b", "it", "chat", "r1", "flash", "mini")):
+                models.append(
+                    {
+                        "id": f"{provider}/{slug}:free",
+                        "name": f"{label}: {_title(slug)} (free)",
+                    }
+                )
+    return models
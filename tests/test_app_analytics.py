@@ -0,0 +1,39 @@
+"""
+Согласованность статистики моделей в памяти и в агрегатах базы.
+"""
+
+import pytest
+
+from src.utils.app_analytics import AppAnalytics
+from src.utils.app_cache import AppCache, ConnectionManager
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """
+    AppCache с новой базой во временной директории.
+    """
+    monkeypatch.chdir(tmp_path)
+    cache = AppCache()
+    yield cache
+    # Менеджер соединений общий для процесса: закрытие и удаление из реестра
+    with ConnectionManager._managers_lock:
+        manager = ConnectionManager._managers.pop(cache.db_name)
+    manager.close()
+
+
+def test_message_without_model_keyed_like_rollups(cache):
+    analytics = AppAnalytics(cache)
+    analytics.track_message(None, 10, 1.5, 100)
+    analytics.track_message("", 20, 0.5, 50)
+    analytics.track_message("openai/gpt-4o", 30, 2.0, 200)
+
+    assert None not in analytics.model_usage
+    assert analytics.model_usage[""]["count"] == 2
+    assert set(analytics.latency) == {"", "openai/gpt-4o"}
+
+    # После перезапуска статистика загружается из агрегатов базы
+    restored = AppAnalytics(cache)
+    assert restored.model_usage == analytics.model_usage
+    assert set(restored.latency) == set(analytics.latency)
+    assert restored.latency[""].count == 2
@@ -0,0 +1,142 @@
+"""
+Проверка планов выполнения запросов истории и аналитики (EXPLAIN QUERY PLAN).
+
+Запросы берутся из констант app_cache, поэтому тесты проверяют ровно те
+планы, которые выполняет приложение.
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from src.utils import app_cache
+from src.utils.app_cache import (
+    ANALYTICS_HISTORY_QUERY,
+    FORMATTED_HISTORY_QUERY,
+    HISTORY_LATEST_QUERY,
+    HISTORY_PAGE_QUERY,
+    WINDOW_STATISTICS_QUERY,
+    AppCache,
+    ConnectionManager,
+    WriteBehindQueue,
+)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """
+    AppCache с новой базой во временной директории.
+    """
+    monkeypatch.chdir(tmp_path)
+    cache = AppCache()
+    yield cache
+    # Менеджер соединений общий для процесса: закрытие и удаление из реестра
+    with ConnectionManager._managers_lock:
+        manager = ConnectionManager._managers.pop(cache.db_name)
+    manager.close()
+
+
+def test_history_page_searches_primary_key(cache):
+    plan = cache.explain_query_plan(HISTORY_PAGE_QUERY, (100, 25))
+    assert plan == ["SEARCH messages USING INTEGER PRIMARY KEY (rowid<?)"]
+
+
+def test_latest_history_page_needs_no_sort(cache):
+    # Обход первичного ключа с конца, остановка на LIMIT: без сортировки
+    plan = cache.explain_query_plan(HISTORY_LATEST_QUERY, (25,))
+    assert plan == ["SCAN messages"]
+    assert not any("TEMP B-TREE" in line for line in plan)
+
+
+def test_formatted_history_uses_timestamp_index(cache):
+    plan = cache.explain_query_plan(FORMATTED_HISTORY_QUERY)
+    assert plan == ["SCAN messages USING INDEX idx_messages_timestamp"]
+
+
+def test_analytics_history_uses_covering_index(cache):
+    plan = cache.explain_query_plan(ANALYTICS_HISTORY_QUERY)
+    assert plan == [
+        "SCAN analytics_messages USING COVERING INDEX idx_analytics_timestamp_model"
+    ]
+
+
+def test_window_statistics_searches_index_ranges(cache):
+    plan = cache.explain_query_plan(
+        WINDOW_STATISTICS_QUERY,
+        ("2026-01-01 10:30:00", "2026-01-01 11:00:00", "2026-01-01 11:00"),
+    )
+    assert (
+        "SEARCH analytics_messages USING COVERING INDEX "
+        "idx_analytics_timestamp_model (timestamp>? AND timestamp<?)"
+    ) in plan
+    assert "SEARCH analytics_rollup_hourly USING PRIMARY KEY (bucket>?)" in plan
+    # Ни одна таблица не читается полным просмотром
+    assert not any(
+        line.startswith(("SCAN analytics_messages", "SCAN analytics_rollup_hourly"))
+        for line in plan
+    )
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def test_failed_migration_rolls_back_schema(cache, monkeypatch):
+    # Миграция с DDL и ошибкой посередине: не остается ни столбца, ни версии
+    def fail(conn):
+        raise sqlite3.OperationalError("сбой миграции")
+
+    conn = cache.get_connection()
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    monkeypatch.setattr(
+        app_cache,
+        "MIGRATIONS",
+        [(version + 1, ["ALTER TABLE messages ADD COLUMN extra TEXT", fail])],
+    )
+
+    with pytest.raises(sqlite3.OperationalError):
+        cache.migrate()
+
+    assert "extra" not in _columns(conn, "messages")
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == version
+    assert not conn.in_transaction
+
+
+def test_latency_column_migration_is_idempotent(cache):
+    # Повтор миграции 4 после сбоя не падает на уже добавленном столбце
+    conn = cache.get_connection()
+    app_cache.add_latency_bucket_column(conn)
+    assert "latency_bucket" in _columns(conn, "analytics_messages")
+
+
+def test_write_behind_falls_back_to_single_rows(tmp_path):
+    # Ошибочная строка не отменяет запись остальных строк пакета
+    manager = ConnectionManager(str(tmp_path / "queue.db"))
+    conn = manager.connection()
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, value TEXT NOT NULL)")
+    writer = WriteBehindQueue(manager, flush_interval=0.01, retry_delay=0)
+    query = "INSERT INTO items (id, value) VALUES (?, ?)"
+    try:
+        writer.put(query, (1, "a"))
+        writer.put(query, (2, None))  # Нарушение NOT NULL
+        writer.put(query, (3, "c"))
+        writer.close()
+        rows = conn.execute("SELECT id FROM items ORDER BY id").fetchall()
+        assert rows == [(1,), (3,)]
+        assert writer.dropped == 1
+    finally:
+        manager.close()
+
+
+def test_release_closes_thread_connection(cache):
+    # Соединение завершившегося фонового потока не остается у менеджера
+    def worker():
+        cache.get_connection().execute("SELECT 1")
+        cache.release_connection()
+
+    before = len(cache.connections.connections)
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    assert len(cache.connections.connections) == before
@@ -0,0 +1,79 @@
+"""
+Окно контекста диалога в пределах бюджета токенов.
+"""
+
+from src.utils.app_context import (
+    DEFAULT_CONTEXT_TOKENS,
+    AppContext,
+    estimate_tokens,
+)
+
+
+class FakeCache:
+    """Кэш с историей в формате AppCache.get_chat_history (новые первыми)."""
+
+    def __init__(self, records: list):
+        self.records = records
+
+    def get_chat_history(self, limit: int) -> list:
+        return self.records[:limit]
+
+
+def _record(number: int, question: str, answer: str, tokens: int = 50) -> tuple:
+    return (number, "model", question, answer, "2026-01-01 00:00:00", tokens)
+
+
+def _history_tokens(messages: list) -> int:
+    return sum(estimate_tokens(message["content"]) for message in messages)
+
+
+def test_estimate_tokens_counts_cyrillic_denser():
+    assert estimate_tokens("a" * 400) < estimate_tokens("я" * 400)
+    assert estimate_tokens("") > 0  # Служебные токены сообщения
+
+
+def test_preloaded_window_fits_budget_and_keeps_newest():
+    # 100 пар по ~260 токенов - в бюджет помещается только часть
+    records = [
+        _record(number, f"вопрос {number} " + "x" * 400, "ответ " + "y" * 600)
+        for number in range(100, 0, -1)
+    ]
+    context = AppContext(FakeCache(records))
+
+    assert 0 < context.total_tokens <= DEFAULT_CONTEXT_TOKENS
+    assert len(context.turns) < len(records)
+    assert context.turns[-1][0].startswith("вопрос 100 ")  # Самая новая пара
+    assert context.total_tokens == sum(tokens for *_, tokens in context.turns)
+
+
+def test_error_turns_are_skipped():
+    records = [
+        _record(3, "третий", "ответ 3"),
+        _record(2, "второй", "Ошибка: 503 Service Unavailable", tokens=0),
+        _record(1, "первый", ""),  # Ответ не получен
+    ]
+    context = AppContext(FakeCache(records))
+    assert [question for question, *_ in context.turns] == ["третий"]
+
+
+def test_history_with_new_message_stays_within_budget():
+    context = AppContext(FakeCache([]))
+    for number in range(200):
+        context.add_turn(f"вопрос {number} " + "x" * 300, "ответ " + "y" * 500)
+        assert context.total_tokens <= DEFAULT_CONTEXT_TOKENS
+
+    new_message = "новый вопрос " + "z" * 2000
+    history = context.get_history(new_message)
+    assert history
+    assert _history_tokens(history) + estimate_tokens(new_message) <= (
+        DEFAULT_CONTEXT_TOKENS
+    )
+    # Хронологический порядок: вопрос, ответ; самая новая пара - последней
+    assert [message["role"] for message in history[:2]] == ["user", "assistant"]
+    assert history[-2]["content"].startswith("вопрос 199 ")
+
+
+def test_oversized_message_leaves_no_history():
+    context = AppContext(FakeCache([]))
+    context.add_turn("вопрос", "ответ")
+    assert context.get_history("x" * 4 * DEFAULT_CONTEXT_TOKENS) == []
@@ -0,0 +1,36 @@
+"""
+Ротация файлов лога: сохранение файла при ошибке сжатия.
+"""
+
+import gzip
+import os
+
+from src.utils.app_logger import CompressedRotatingFileHandler
+
+
+def test_compress_replaces_source_with_archive(tmp_path):
+    source = tmp_path / "chat_app.log.1"
+    source.write_text("строка лога\n", encoding="utf-8")
+    dest = tmp_path / "chat_app.log.1.gz"
+
+    CompressedRotatingFileHandler._compress(str(source), str(dest))
+
+    assert not source.exists()
+    with gzip.open(dest, "rt", encoding="utf-8") as archive:
+        assert archive.read() == "строка лога\n"
+
+
+def test_failed_compression_keeps_file_under_unique_name(tmp_path, capsys):
+    # Следующая ротация пишет в chat_app.log.1 - несжатый файл не должен
+    # остаться по этому пути, иначе он будет перезаписан
+    source = tmp_path / "chat_app.log.1"
+    source.write_text("строка лога\n", encoding="utf-8")
+    dest = tmp_path / "missing" / "chat_app.log.1.gz"  # Запись невозможна
+
+    CompressedRotatingFileHandler._compress(str(source), str(dest))
+
+    assert not source.exists()
+    kept = [name for name in os.listdir(tmp_path) if name.endswith(".failed")]
+    assert len(kept) == 1 and kept[0].startswith("chat_app.log.1.")
+    assert (tmp_path / kept[0]).read_text(encoding="utf-8") == "строка лога\n"
+    assert "Ошибка сжатия файла лога" in capsys.readouterr().err
@@ -0,0 +1,76 @@
+"""
+Точность и слияние скетча квантилей времени ответа.
+"""
+
+import random
+
+import pytest
+
+from src.utils.app_sketch import DEFAULT_RELATIVE_ACCURACY, LatencySketch
+
+QUANTILES = (0.01, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99)
+
+
+def _latencies(seed: int, count: int = 5000) -> list:
+    """Время ответа с длинным хвостом (логнормальное распределение)."""
+    rng = random.Random(seed)
+    return [rng.lognormvariate(0.5, 0.9) for _ in range(count)]
+
+
+def _exact_quantile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+def _sketch(values: list) -> LatencySketch:
+    sketch = LatencySketch()
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+
+@pytest.mark.parametrize("q", QUANTILES)
+def test_quantile_within_relative_accuracy(q):
+    values = _latencies(seed=1)
+    estimate = _sketch(values).quantile(q)
+    exact = _exact_quantile(values, q)
+    assert abs(estimate - exact) <= DEFAULT_RELATIVE_ACCURACY * exact
+
+
+def test_merge_equals_sketch_of_all_values():
+    first, second = _latencies(seed=2), _latencies(seed=3, count=1200)
+    merged = _sketch(first)
+    merged.merge(_sketch(second))
+    combined = _sketch(first + second)
+
+    assert merged.count == combined.count
+    assert merged.buckets == combined.buckets
+    for q in QUANTILES:
+        exact = _exact_quantile(first + second, q)
+        assert abs(merged.quantile(q) - exact) <= DEFAULT_RELATIVE_ACCURACY * exact
+
+
+def test_buckets_restored_from_storage_give_same_quantiles():
+    # Корзины хранятся в базе как есть и загружаются через add_bucket
+    original = _sketch(_latencies(seed=4))
+    restored = LatencySketch()
+    for index, count in original.buckets.items():
+        restored.add_bucket(index, count)
+    assert [restored.quantile(q) for q in QUANTILES] == [
+        original.quantile(q) for q in QUANTILES
+    ]
+
+
+def test_empty_sketch_and_out_of_range_values():
+    sketch = LatencySketch()
+    assert sketch.quantile(0.5) == 0.0
+    sketch.add(0.0)  # Меньше MIN_LATENCY - в крайнюю корзину
+    sketch.add(10**9)  # Больше MAX_LATENCY - в крайнюю корзину
+    assert sketch.count == 2
+    assert len(sketch.buckets) == 2
+
+
+def test_histogram_counts_all_values():
+    values = _latencies(seed=5, count=1000)
+    histogram = _sketch(values).histogram()
+    assert sum(count for _, count in histogram) == len(values)
@@ -0,0 +1,77 @@
+"""
+Сдвиг окна истории чата при прокрутке к краям.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.ui.components import CHAT_SCROLL_THRESHOLD, ChatView
+
+MAX_EXTENT = 5000.0
+
+
+def _scroll(pixels: float):
+    return SimpleNamespace(
+        pixels=pixels, min_scroll_extent=0.0, max_scroll_extent=MAX_EXTENT
+    )
+
+
+TOP = _scroll(0.0)
+MIDDLE = _scroll(MAX_EXTENT / 2)
+BOTTOM = _scroll(MAX_EXTENT)
+
+
+@pytest.fixture
+def chat(monkeypatch):
+    """Окно из 60 последних сообщений с неограниченной подгрузкой старых."""
+    loaded = []
+
+    def load_older():
+        batch = [(f"старое {len(loaded)}-{index}", True) for index in range(50)]
+        loaded.append(batch)
+        return batch
+
+    view = ChatView(load_older=load_older, window_size=60, step=20)
+    monkeypatch.setattr(view, "update", lambda: None)  # Элемент не на странице
+    view.set_messages([(f"сообщение {index}", False) for index in range(100)])
+    view.loaded = loaded
+    return view
+
+
+def test_repeated_events_at_top_shift_window_once(chat):
+    chat._on_scroll(TOP)
+    start = chat.start
+    assert start == 20  # Окно сдвинуто на step сообщений к началу
+    # Позиция прокрутки осталась у края - повторные события не сдвигают окно
+    for _ in range(5):
+        chat._on_scroll(_scroll(CHAT_SCROLL_THRESHOLD / 2))
+    assert chat.start == start
+    assert chat.loaded == []
+
+
+def test_top_shift_again_after_leaving_edge(chat):
+    chat._on_scroll(TOP)
+    chat._on_scroll(MIDDLE)
+    chat._on_scroll(TOP)
+    assert chat.start == 0
+
+
+def test_older_messages_loaded_once_per_approach(chat):
+    for _ in range(3):  # Окно доходит до первого сообщения
+        chat._on_scroll(TOP)
+        chat._on_scroll(MIDDLE)
+    chat._on_scroll(TOP)
+    chat._on_scroll(TOP)
+    assert len(chat.loaded) == 1
+    assert len(chat.messages) == 150
+
+
+def test_bottom_shift_after_scrolling_back(chat):
+    chat._on_scroll(TOP)
+    chat._on_scroll(MIDDLE)
+    chat._on_scroll(TOP)
+    assert chat.end == 60
+    chat._on_scroll(BOTTOM)
+    chat._on_scroll(BOTTOM)
+    assert chat.end == 80  # Один сдвиг к концу
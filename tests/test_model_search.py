@@ -0,0 +1,105 @@
+"""
+Поиск моделей: ранжирование, опечатки и время ответа на полном каталоге.
+"""
+
+import time
+
+import pytest
+
+from src.ui import model_search
+from src.ui.model_search import ModelSearchIndex, edit_distance
+from src.utils.app_session import AppSession
+
+# Запросы, которые доходят до нечеткого поиска (опечатки и отсутствие совпадений)
+FUZZY_QUERIES = ["zzzzzz", "cluade", "sonet", "gemni", "llma", "deepsek", "mistrl"]
+
+
+@pytest.fixture(scope="module")
+def index(model_catalog):
+    return ModelSearchIndex(model_catalog)
+
+
+def _ids(index, query, top=None):
+    return [index.models[number]["id"] for number in index.search(query)[:top]]
+
+
+def test_catalog_has_real_size(model_catalog):
+    assert len(model_catalog) >= 300
+
+
+def test_exact_word_ranks_first(index):
+    ids = _ids(index, "claude sonnet", top=3)
+    assert all("claude" in model_id and "sonnet" in model_id for model_id in ids)
+
+
+def test_provider_prefix_ranks_above_word_prefix(index):
+    # "mistral" - провайдер mistralai, а также слово в названиях моделей
+    ids = _ids(index, "mistralai")
+    assert ids and all(model_id.startswith("mistralai/") for model_id in ids)
+
+
+def test_substring_across_separators(index):
+    assert _ids(index, "gpt4o", top=1) == ["openai/gpt-4o"]
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("sonet", "sonnet"),  # Пропущенная буква
+        ("cluade", "claude"),  # Перестановка соседних букв
+        ("gemni", "gemini"),
+        ("deepsek", "deepseek"),
+    ],
+)
+def test_typo_finds_model(index, query, expected):
+    ids = _ids(index, query, top=3)
+    assert ids and all(expected in model_id for model_id in ids)
+
+
+def test_no_match_returns_nothing(index):
+    assert index.search("zzzzzz") == []
+
+
+def test_prefix_edit_distance():
+    assert edit_distance("sonet", "sonnet", 1, prefix=True) == 1
+    assert edit_distance("sonet", "sonnet", 1) == 1
+    assert edit_distance("sonet", "sonne", 1) == 2  # Больше limit
+    assert edit_distance("cluade", "claude-long", 2, prefix=True) == 1
+
+
+def test_fuzzy_comparisons_are_bounded(index, monkeypatch):
+    # Расстояние вычисляется не более чем для FUZZY_MAX_CANDIDATES слов
+    calls = []
+
+    def counting(a, b, limit, prefix=False):
+        calls.append(b)
+        return edit_distance(a, b, limit, prefix)
+
+    monkeypatch.setattr(model_search, "edit_distance", counting)
+    for query in FUZZY_QUERIES:
+        calls.clear()
+        index._cache.clear()
+        index.search(query)
+        assert len(calls) <= model_search.FUZZY_MAX_CANDIDATES
+
+
+def test_fuzzy_query_is_well_under_a_millisecond(index):
+    rounds = 20
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for query in FUZZY_QUERIES:
+            index._cache.clear()  # Каждый запрос вычисляется заново
+            index.search(query)
+    per_query_ms = (
+        (time.perf_counter() - started) * 1000 / (rounds * len(FUZZY_QUERIES))
+    )
+    assert per_query_ms < 1.0
+
+
+def test_session_reuses_index_for_same_catalog(model_catalog):
+    # Индекс строится заново только для нового списка моделей
+    session = AppSession.__new__(AppSession)  # Без клиентов API и базы
+    session._search_index = None
+    first = session.get_search_index(model_catalog)
+    assert session.get_search_index(model_catalog) is first
+    assert session.get_search_index(list(model_catalog)) is not first
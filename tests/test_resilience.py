@@ -0,0 +1,160 @@
+"""
+Повторы запросов и автоматический выключатель модели.
+"""
+
+import pytest
+
+from src.api.resilience import (
+    ERROR_AUTH,
+    ERROR_CIRCUIT_OPEN,
+    ERROR_RATE_LIMIT,
+    ERROR_SERVER,
+    APIError,
+    CircuitBreaker,
+    RetryPolicy,
+    parse_retry_after,
+)
+
+
+class FakeClock:
+    """Управляемое монотонное время для выключателя."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(failure_threshold=3, reset_timeout=30.0, clock=clock)
+
+
+def _fail(breaker, count=1, retry_after=None):
+    for _ in range(count):
+        breaker.record_failure(APIError(ERROR_SERVER, "503", retry_after=retry_after))
+
+
+# --- RetryPolicy ---
+
+
+def test_retry_delay_is_jittered_within_backoff():
+    policy = RetryPolicy(max_attempts=5, base_delay=1.0, max_delay=20.0)
+    error = APIError(ERROR_SERVER, "503")
+    for attempt, ceiling in [(0, 1.0), (1, 2.0), (2, 4.0), (3, 8.0)]:
+        delays = [policy.get_delay(attempt, error) for _ in range(200)]
+        assert all(0.0 <= delay <= ceiling for delay in delays)
+
+
+def test_retry_delay_respects_retry_after():
+    policy = RetryPolicy(max_attempts=3, base_delay=1.0, max_delay=20.0)
+    error = APIError(ERROR_RATE_LIMIT, "429", retry_after=7.0)
+    assert all(policy.get_delay(0, error) >= 7.0 for _ in range(50))
+
+
+def test_retry_after_above_max_delay_is_not_retried():
+    # Ждать дольше max_delay нет смысла: ошибка сразу возвращается пользователю
+    policy = RetryPolicy(max_attempts=3, base_delay=1.0, max_delay=20.0)
+    error = APIError(ERROR_RATE_LIMIT, "429", retry_after=120.0)
+    assert policy.get_delay(0, error) is None
+
+
+def test_no_retry_for_request_errors_or_last_attempt():
+    policy = RetryPolicy(max_attempts=3)
+    assert policy.get_delay(0, APIError(ERROR_AUTH, "401")) is None
+    assert policy.get_delay(2, APIError(ERROR_SERVER, "503")) is None
+
+
+def test_parse_retry_after_seconds_and_invalid():
+    assert parse_retry_after("12") == 12.0
+    assert parse_retry_after("-5") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("not a date") is None
+
+
+# --- CircuitBreaker ---
+
+
+def test_breaker_opens_after_threshold(breaker):
+    _fail(breaker, 2)
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+    _fail(breaker)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.retry_in() == pytest.approx(30.0)
+
+
+def test_breaker_half_open_allows_single_trial(breaker, clock):
+    _fail(breaker, 3)
+    clock.advance(30.0)
+    assert breaker.allow()  # Пробный запрос
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()  # Второй запрос ждет результата пробного
+
+
+def test_breaker_trial_success_closes(breaker, clock):
+    _fail(breaker, 3)
+    clock.advance(30.0)
+    breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.failures == 0 and breaker.allow()
+
+
+def test_breaker_trial_failure_reopens(breaker, clock):
+    _fail(breaker, 3)
+    clock.advance(30.0)
+    breaker.allow()
+    _fail(breaker)  # Одной ошибки пробного запроса достаточно
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.retry_in() == pytest.approx(30.0)
+
+
+def test_breaker_stuck_trial_is_replaced(breaker, clock):
+    # Пробный запрос, не завершившийся за reset_timeout, не блокирует модель
+    _fail(breaker, 3)
+    clock.advance(30.0)
+    assert breaker.allow()
+    clock.advance(29.0)
+    assert not breaker.allow()
+    clock.advance(1.0)
+    assert breaker.allow()
+
+
+def test_breaker_pause_follows_long_retry_after(breaker):
+    _fail(breaker, 3, retry_after=90.0)
+    assert breaker.retry_in() == pytest.approx(90.0)
+
+
+def test_request_errors_do_not_open_breaker(breaker):
+    for _ in range(10):
+        breaker.record_failure(APIError(ERROR_AUTH, "401"))
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_open_error_reports_remaining_pause(breaker, clock):
+    _fail(breaker, 3)
+    clock.advance(20.0)
+    error = breaker.open_error()
+    assert error.kind == ERROR_CIRCUIT_OPEN
+    assert error.retry_after == pytest.approx(10.0)
+    assert "10 с" in error.message
+
+
+def test_open_error_during_trial_is_never_zero(breaker, clock):
+    _fail(breaker, 3)
+    clock.advance(30.0)
+    breaker.allow()  # Пробный запрос выполняется
+    error = breaker.open_error()
+    assert error.retry_after >= 1.0
+    assert "0 с" not in error.message
+    assert "пробным запросом" in error.message